@@ -1,31 +1,439 @@
-from flask import Flask, request, jsonify, render_template_string
-import sympy as sp
-import threading, webbrowser, time
+import time
+_MODULE_T0 = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, render_template_string, abort, stream_with_context
+import threading, webbrowser
+import os
+import sys
 import logging
 import math
 import io
 import base64
+import re
+import hashlib
+import importlib
+import subprocess
+import gzip
+import ast
+import bisect
+import json
+import itertools
+import multiprocessing
+import random
+from collections import OrderedDict, Counter, deque
+from concurrent.futures import ProcessPoolExecutor, CancelledError, TimeoutError as FutureTimeout, wait as futures_wait
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import brotli # Opsional: kompresi 'br' untuk halaman index
+except ImportError:
+    brotli = None
+
+# =======================
+# LAZY IMPORT (COLD START CEPAT DI SERVERLESS)
+# =======================
+# sympy, numpy dan matplotlib baru di-import saat pertama kali dipakai,
+# jadi GET / dan jalur yang tidak butuh plot tidak ikut membayar biaya import-nya.
+IMPORT_TIMINGS = {}
+_IMPORT_LOCK = threading.RLock()
+_IMPORTED = {}
+
+def lazy_import(name):
+    """Import modul dan catat durasinya (hanya import pertama yang tercatat)"""
+    # Bukan sys.modules: di sana modul sudah muncul saat thread lain masih meng-import-nya
+    module = _IMPORTED.get(name)
+    if module is not None:
+        return module
+    with _IMPORT_LOCK:
+        t0 = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMINGS.setdefault(name, round((time.perf_counter() - t0) * 1000, 2))
+        _IMPORTED[name] = module
+    return module
+
+class LazyModule:
+    """
+    Pengganti 'import x as alias': modul asli di-import pada akses atribut pertama,
+    lalu nama global alias diganti modul asli supaya akses berikutnya tanpa overhead.
+    """
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        module = lazy_import(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+sp = LazyModule('sympy', 'sp')
+np = LazyModule('numpy', 'np')
 
 # =======================
 # MATPLOTLIB SETUP (TERMUX/SERVER SAFE)
 # =======================
-import matplotlib
-matplotlib.use('Agg') # Wajib agar jalan tanpa GUI window (Termux friendly)
-import matplotlib.pyplot as plt
-import numpy as np
+_MATPLOTLIB = None
+
+def load_matplotlib():
+    """Import matplotlib saat plot pertama, kembalikan (Figure, FigureCanvasAgg)"""
+    global _MATPLOTLIB
+    if _MATPLOTLIB is None:
+        with _IMPORT_LOCK:
+            if _MATPLOTLIB is None:
+                matplotlib = lazy_import('matplotlib')
+                matplotlib.use('Agg') # Wajib agar jalan tanpa GUI window (Termux friendly)
+                matplotlib.rcParams['svg.hashsalt'] = 'kalkulator' # id elemen SVG deterministik (aman di-cache)
+                Figure = lazy_import('matplotlib.figure').Figure
+                FigureCanvasAgg = lazy_import('matplotlib.backends.backend_agg').FigureCanvasAgg
+                _MATPLOTLIB = (Figure, FigureCanvasAgg)
+    return _MATPLOTLIB
 
 # =======================
 # CONFIG & LOGGING
 # =======================
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
+logger = logging.getLogger('kalkulator')
 
 app = Flask(__name__)
 
 # =======================
-# SYMPY INIT
+# METRICS (FORMAT PROMETHEUS)
+# =======================
+# Histogram latensi per (module, operation) dan per fase (parse, compute, plot,
+# serialize, queue), counter error per tipe exception, gauge request in-flight.
+# Satu request = satu trace thread-local + satu kali lock saat dicatat, jadi
+# overhead-nya hanya beberapa mikrodetik. Diekspos di /metrics.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_bucket_index = bisect.bisect_left
+
+class Histogram:
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # slot terakhir = +Inf
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[_bucket_index(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+class OperationMetrics:
+    """Histogram total dan per fase, jumlah error dan durasi maksimum untuk satu (module, operation)"""
+    __slots__ = ('duration', 'phases', 'errors', 'max')
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.phases = {}
+        self.errors = 0
+        self.max = 0.0
+
+    def phase(self, name):
+        hist = self.phases.get(name)
+        if hist is None:
+            hist = self.phases[name] = Histogram()
+        return hist
+
+class Trace:
+    """Akumulator waktu per fase dan error selama satu operasi (per thread)"""
+    __slots__ = ('phases', 'errors', 'samples')
+
+    def __init__(self):
+        self.phases = {}
+        self.errors = []
+        self.samples = None  # sample profiler dari proses worker
+
+    def merge(self, phases, errors):
+        for name, seconds in phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        self.errors.extend(errors)
+
+_TRACE = threading.local()
+
+_TRACE.current = None
+
+def trace_begin():
+    trace = _TRACE.current = Trace()
+    return trace
+
+def trace_end():
+    _TRACE.current = None
+
+def trace_phase(name, seconds):
+    try:
+        phases = _TRACE.current.phases
+    except AttributeError:
+        return  # di luar operasi (atau thread lain yang belum pernah memulai trace)
+    phases[name] = phases.get(name, 0.0) + seconds
+
+def trace_error(module, operation, exc):
+    """Error yang ditangani (mis. plot gagal): ikut trace request jika ada, selain itu langsung dihitung"""
+    trace = getattr(_TRACE, 'current', None)
+    if trace is not None:
+        trace.errors.append((module, operation, type(exc).__name__))
+    else:
+        METRICS.count_error(module, operation, type(exc).__name__)
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations = {}  # (module, operation) -> OperationMetrics
+        self.errors = {}      # (module, operation, type) -> int
+        self.in_flight = {}   # endpoint -> int
+
+    def _operation(self, key):
+        op = self.operations.get(key)
+        if op is None:
+            op = self.operations[key] = OperationMetrics()
+        return op
+
+    def observe(self, key, seconds, phases=None, error_type=None, errors=()):
+        buckets = LATENCY_BUCKETS
+        with self._lock:
+            op = self.operations.get(key) or self._operation(key)
+            hist = op.duration
+            hist.counts[_bucket_index(buckets, seconds)] += 1
+            hist.sum += seconds
+            if seconds > op.max:
+                op.max = seconds
+            if phases:
+                op_phases = op.phases
+                for phase, phase_s in phases.items():
+                    hist = op_phases.get(phase) or op.phase(phase)
+                    hist.counts[_bucket_index(buckets, phase_s)] += 1
+                    hist.sum += phase_s
+            if error_type is not None:
+                op.errors += 1
+                ekey = key + (error_type,)
+                self.errors[ekey] = self.errors.get(ekey, 0) + 1
+            for ekey in errors:
+                self.errors[ekey] = self.errors.get(ekey, 0) + 1
+
+    def operation_stats(self):
+        """Ringkasan per operasi (count, errors, total_ms, max_ms) untuk /debug/operations"""
+        with self._lock:
+            return {key: {"count": sum(op.duration.counts), "errors": op.errors,
+                          "total_ms": op.duration.sum * 1000, "max_ms": op.max * 1000}
+                    for key, op in self.operations.items()}
+
+    def count_error(self, module, operation, error_type):
+        with self._lock:
+            ekey = (module, operation, error_type)
+            self.errors[ekey] = self.errors.get(ekey, 0) + 1
+
+    def enter(self, endpoint):
+        with self._lock:
+            self.in_flight[endpoint] = self.in_flight.get(endpoint, 0) + 1
+
+    def leave(self, endpoint):
+        with self._lock:
+            self.in_flight[endpoint] -= 1
+
+    def render(self):
+        """Teks exposition format Prometheus 0.0.4"""
+        with self._lock:
+            durations = {k: (list(op.duration.counts), op.duration.sum) for k, op in self.operations.items()}
+            phases = {k + (name,): (list(h.counts), h.sum)
+                      for k, op in self.operations.items() for name, h in op.phases.items()}
+            errors = dict(self.errors)
+            in_flight = dict(self.in_flight)
+        out = []
+        metric_histogram(out, 'kalkulator_operation_duration_seconds',
+                         "Durasi operasi /compute per module/operation", ('module', 'operation'), durations)
+        metric_histogram(out, 'kalkulator_phase_duration_seconds',
+                         "Durasi per fase (parse, compute, plot, queue, serialize)", ('module', 'operation', 'phase'), phases)
+        metric_family(out, 'kalkulator_errors_total', 'counter', "Error per tipe exception",
+                      [(labels(module=m, operation=o, type=t), v) for (m, o, t), v in sorted(errors.items())])
+        metric_family(out, 'kalkulator_requests_in_flight', 'gauge', "Request yang sedang diproses per endpoint",
+                      [(labels(endpoint=e), v) for e, v in sorted(in_flight.items())])
+        caches = {name: cache.stats() for name, cache in CACHE_REGISTRY.items()}
+        for field, kind, help_text in (('hits', 'counter', "Cache hit"), ('misses', 'counter', "Cache miss"),
+                                       ('hit_ratio', 'gauge', "Rasio cache hit"), ('size', 'gauge', "Jumlah entri cache"),
+                                       ('bytes', 'gauge', "Ukuran isi cache (byte)")):
+            name = f'kalkulator_cache_{field}' + ('_total' if kind == 'counter' else '')
+            metric_family(out, name, kind, help_text,
+                          [(labels(cache=c), st[field]) for c, st in sorted(caches.items()) if st.get(field) is not None])
+        pool = WORKER_POOL.stats()
+        metric_family(out, 'kalkulator_coalesced_requests_total', 'counter',
+                      "Request /compute yang menunggu hasil request identik yang sedang dihitung",
+                      [("", COMPUTE_FLIGHTS.stats()["coalesced"])])
+        metric_family(out, 'kalkulator_worker_pool_in_flight', 'gauge', "Operasi yang sedang di worker pool", [("", pool["in_flight"])])
+        metric_family(out, 'kalkulator_worker_pool_restarts_total', 'counter', "Restart worker pool (timeout/rusak)", [("", pool["restarts"])])
+        metric_family(out, 'kalkulator_startup_seconds', 'gauge', "Waktu import modul saat start", [("", STARTUP_MS / 1000)])
+        return "\n".join(out) + "\n"
+
+def labels(**kv):
+    def esc(v):
+        return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in kv.items()) + "}"
+
+def metric_family(out, name, kind, help_text, samples):
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} {kind}")
+    for label_str, value in samples:
+        out.append(f"{name}{label_str} {value}")
+
+def metric_histogram(out, name, help_text, label_names, series):
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} histogram")
+    for key, (counts, total) in sorted(series.items()):
+        base = dict(zip(label_names, key))
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), counts):
+            cumulative += count
+            out.append(f"{name}_bucket{labels(**base, le=bound)} {cumulative}")
+        out.append(f"{name}_sum{labels(**base)} {total}")
+        out.append(f"{name}_count{labels(**base)} {cumulative}")
+
+METRICS = Metrics()
+
+# =======================
+# PROFILER SAMPLING (OPT-IN)
 # =======================
-x, y = sp.symbols('x y')
+# KALKULATOR_PROFILE=1 menyalakan profiler: thread daemon mengambil stack
+# (sys._current_frames) dari thread yang sedang menjalankan operasi, tiap
+# KALKULATOR_PROFILE_INTERVAL_MS. Operasi yang lebih lama dari
+# KALKULATOR_PROFILE_THRESHOLD_MS disimpan di ring buffer (KALKULATOR_PROFILE_BUFFER),
+# sisanya dibuang. KALKULATOR_PROFILE_RATE (0..1) = porsi operasi yang di-sample.
+# Hasil bisa diambil di /debug/profiles sebagai collapsed stacks atau JSON speedscope.
+PROFILE_ENABLED = os.environ.get('KALKULATOR_PROFILE') == '1'
+PROFILE_THRESHOLD_MS = float(os.environ.get('KALKULATOR_PROFILE_THRESHOLD_MS', '500'))
+PROFILE_INTERVAL_MS = float(os.environ.get('KALKULATOR_PROFILE_INTERVAL_MS', '5'))
+PROFILE_RATE = float(os.environ.get('KALKULATOR_PROFILE_RATE', '1.0'))
+PROFILE_BUFFER = int(os.environ.get('KALKULATOR_PROFILE_BUFFER', '32'))
+
+class SamplingProfiler:
+    def __init__(self, interval_ms, threshold_ms, rate, capacity):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.rate = rate
+        self.records = deque(maxlen=capacity)
+        self._active = {}  # thread id -> Counter(stack -> jumlah sample)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._next_id = 1
+
+    def begin(self):
+        """Mulai sampling thread ini; None jika operasi ini tidak terpilih (rate)"""
+        if self.rate < 1.0 and random.random() >= self.rate:
+            return None
+        tid = threading.get_ident()
+        with self._lock:
+            self._active[tid] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='kalkulator-profiler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return tid
+
+    def collect(self, token):
+        """Hentikan sampling dan kembalikan sample mentah (dipakai juga oleh proses worker)"""
+        with self._lock:
+            return self._active.pop(token, None) or Counter()
+
+    def end(self, token, seconds, label, extra=None):
+        """Simpan ke ring buffer jika operasi melewati ambang"""
+        samples = self.collect(token)
+        if extra:
+            samples.update(extra)
+        if seconds < self.threshold:
+            return
+        with self._lock:
+            record_id = self._next_id
+            self._next_id += 1
+            self.records.append({
+                "id": record_id,
+                "operation": label,
+                "duration_ms": round(seconds * 1000, 3),
+                "timestamp": time.time(),
+                "interval_ms": self.interval * 1000,
+                "samples": samples,
+            })
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            with self._lock:
+                tids = list(self._active)
+            if not tids:
+                self._wake.clear()
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for tid in tids:
+                frame = frames.get(tid)
+                if frame is None or tid == own:
+                    continue
+                stack = collapse_stack(frame)
+                with self._lock:
+                    counter = self._active.get(tid)
+                    if counter is not None:
+                        counter[stack] += 1
+            del frames
+            time.sleep(self.interval)
+
+    def summary(self):
+        with self._lock:
+            return [{k: v for k, v in r.items() if k != "samples"} | {"sample_count": sum(r["samples"].values())}
+                    for r in self.records]
+
+    def get(self, record_id):
+        with self._lock:
+            for r in self.records:
+                if r["id"] == record_id:
+                    return r
+        return None
+
+def collapse_stack(frame):
+    """Stack dari root ke leaf sebagai tuple (fungsi, file, baris)"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+def frame_label(entry):
+    name, filename, line = entry
+    return f"{name} ({filename}:{line})".replace(";", ":")
+
+def profile_collapsed(record):
+    """Format collapsed stacks (flamegraph.pl / speedscope / inferno)"""
+    return "".join(f"{';'.join(frame_label(f) for f in stack)} {count}\n"
+                   for stack, count in record["samples"].most_common())
+
+def profile_speedscope(record):
+    """Format file speedscope (profil 'sampled', bobot dalam milidetik)"""
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in record["samples"].items():
+        ids = []
+        for entry in stack:
+            if entry not in index:
+                index[entry] = len(frames)
+                frames.append({"name": entry[0], "file": entry[1], "line": entry[2]})
+            ids.append(index[entry])
+        samples.append(ids)
+        weights.append(count * record["interval_ms"])
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": f"{record['operation']} ({record['duration_ms']} ms)",
+        "exporter": "kalkulator",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": record["operation"],
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+PROFILER = SamplingProfiler(PROFILE_INTERVAL_MS, PROFILE_THRESHOLD_MS, PROFILE_RATE, PROFILE_BUFFER) if PROFILE_ENABLED else None
 
 # =======================
 # HELPER & FORMATTING
@@ -39,18 +447,123 @@ class Color:
     YELLOW = '#eab308'
     RED = '#ef4444'
 
+# =======================
+# FORMAT ANGKA (fnum)
+# =======================
+# fnum dipanggil berkali-kali per respons, jadi formatter dipilih per tipe sekali
+# lalu disimpan di _FNUM_BY_TYPE: int/float/skalar numpy/Number SymPy langsung
+# diformat tanpa evalf, evalf (di-cache) hanya untuk ekspresi simbolik seperti sqrt(2).
+_FNUM_BY_TYPE = {}
+
 def fnum(val):
-    """Format angka untuk tampilan"""
+    """Format angka untuk tampilan: bulat jika hampir bulat, selain itu 2 desimal"""
+    if val is None:
+        return "Tidak ada"
+    try:
+        fmt = _FNUM_BY_TYPE[type(val)]
+    except KeyError:
+        fmt = _FNUM_BY_TYPE[type(val)] = _fnum_formatter(type(val))
+    return fmt(val)
+
+def _fnum_float(x):
+    if not math.isfinite(x):
+        return str(x)
+    r = round(x)
+    if abs(x - r) < 1e-9:
+        return str(r)
+    return f"{x:.2f}"
+
+def _fnum_number(val):
+    """Rational/Float SymPy: float() langsung, oo/nan tampil apa adanya"""
+    x = float(val)
+    return _fnum_float(x) if math.isfinite(x) else str(val)
+
+def _fnum_expr(val):
+    """Ekspresi SymPy: evalf hanya jika bernilai angka (tanpa simbol bebas), hasilnya di-cache"""
+    if not val.is_number:
+        return str(val)
+    return EVALF_CACHE.get_or_compute(val, lambda: _fnum_evalf(val))
+
+def _fnum_evalf(val):
     try:
-        if val is None:
-            return "Tidak ada"
-        val_float = float(val.evalf())
-        if abs(val_float - round(val_float)) < 1e-9:
-            return str(int(round(val_float)))
-        return f"{val_float:.2f}"
-    except:
+        return _fnum_number(val.evalf())
+    except (TypeError, ValueError):
+        # Bilangan kompleks tidak bisa jadi float
         return str(val)
 
+def _fnum_formatter(cls):
+    # numpy/sympy tidak di-import di sini: kalau nilainya bertipe numpy/sympy, modulnya sudah dimuat
+    if issubclass(cls, bool):
+        return str
+    if cls is int:
+        return str
+    if cls is float:
+        return _fnum_float
+    # Subclass int/float (mis. numpy.float64) lebih cepat diubah ke tipe dasar dulu
+    if issubclass(cls, int):
+        return lambda v: str(int(v))
+    if issubclass(cls, float):
+        return lambda v: _fnum_float(float(v))
+    if 'numpy' in sys.modules and issubclass(cls, np.generic):
+        if issubclass(cls, np.bool_):
+            return str
+        if issubclass(cls, np.integer):
+            return lambda v: str(int(v))
+        if issubclass(cls, np.floating):
+            return lambda v: _fnum_float(float(v))
+        return str
+    if 'sympy' in sys.modules and issubclass(cls, sp.Basic):
+        if issubclass(cls, sp.Integer):
+            return lambda v: str(v.p)
+        if issubclass(cls, (sp.Rational, sp.Float)):
+            return _fnum_number
+        if issubclass(cls, sp.Expr):
+            return _fnum_expr
+    return str
+
+def fnum_array(values):
+    """
+    fnum untuk satu array sekaligus (kolom hasil batch), hasil list string.
+    Pembulatan dan cek hampir-bulat dilakukan vektor oleh NumPy; NaN jadi None.
+    """
+    arr = np.asarray(values, dtype=np.float64).ravel()
+    rounded = np.round(arr)
+    with np.errstate(invalid='ignore'):
+        near_int = (np.abs(arr - rounded) < 1e-9).tolist()
+    return [None if x != x else (str(int(r)) if m else ('%.2f' % x))
+            for x, r, m in zip(arr.tolist(), rounded.tolist(), near_int)]
+
+# Batas galat pembulatan operasi matriks float, dalam kelipatan epsilon × besaran operand
+SNAP_ULPS = 16
+
+def snap_near_integers(values, scale, out=None):
+    """
+    Nilai yang selisihnya dari bilangan bulat masih dalam batas galat pembulatan
+    (SNAP_ULPS × epsilon × scale) dijadikan bulat persis, supaya jalur float vektor
+    sama dengan jalur eksak (mis. 3.0000000000000004 -> 3.0). NaN/inf dibiarkan.
+    out=values mengubah array di tempat (tanpa salinan untuk batch besar).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = values.copy()
+    rounded = np.rint(values)
+    with np.errstate(invalid='ignore'):
+        diff = np.subtract(values, rounded)
+        np.abs(diff, out=diff)
+        near = diff <= np.multiply(scale, SNAP_ULPS * np.finfo(np.float64).eps)
+    np.copyto(out, rounded, where=near)
+    return out
+
+def sin_deg(deg):
+    """sin sudut (derajat) untuk kolom batch; 0, ±½ dan ±1 dibuat persis seperti SymPy (sin 30° = 0.5)"""
+    twice = 2 * np.sin(np.radians(deg))
+    return snap_near_integers(twice, 2.0, out=twice) / 2
+
+def cos_deg(deg):
+    """cos sudut (derajat) untuk kolom batch, dengan snap yang sama seperti sin_deg"""
+    twice = 2 * np.cos(np.radians(deg))
+    return snap_near_integers(twice, 2.0, out=twice) / 2
+
 def get_val(sympy_val):
     """Helper untuk mengambil float dari sympy"""
     return float(sympy_val.evalf())
@@ -58,76 +571,902 @@ def get_val(sympy_val):
 def to_rad(deg):
     return deg * sp.pi / 180
 
+# Level detail respons, dari paling ringkas:
+# 'none' hanya nilai mentah, 'result' + teks hasil, 'steps' + langkah, 'full' + LaTeX & gambar
+DETAIL_LEVELS = ('none', 'result', 'steps', 'full')
+DETAIL_RANK = {level: i for i, level in enumerate(DETAIL_LEVELS)}
+
+def wants(detail, level):
+    """True jika level detail yang diminta mencakup `level`"""
+    return DETAIL_RANK[detail] >= DETAIL_RANK[level]
+
+def plain_value(val):
+    """Nilai mentah untuk level detail 'none': int/float jika numerik, selain itu string"""
+    if isinstance(val, (int, float)):
+        return val
+    if isinstance(val, sp.Integer):
+        return int(val)
+    if getattr(val, 'is_number', False) and val.is_real:
+        return float(val.evalf())
+    return str(val)
+
+# Literal angka biasa: "2", "-3", "2.5", ".5", "1e3" (tanpa nol di depan)
+NUMERIC_LITERAL = re.compile(r'^[+-]?(?:(0|[1-9]\d*)(\.\d*)?|(\.\d+))([eE][+-]?\d+)?$')
+MAX_EXACT_INT = 2**53
+
+def parse_input(raw):
+    """
+    Parsing field request. Literal angka biasa langsung jadi Integer/Float,
+    selain itu lewat parse_expression (parser aman & ber-cache, bukan sp.sympify).
+    """
+    if type(raw) is int:
+        return sp.Integer(raw)
+    if type(raw) is float:
+        return sp.Float(raw)
+    if not isinstance(raw, str):
+        raise ValueError(f"Input harus angka atau ekspresi, bukan {type(raw).__name__}")
+    text = raw.strip()
+    if len(text) > EXPR_MAX_LENGTH:
+        raise ValueError(f"Ekspresi terlalu panjang (maks {EXPR_MAX_LENGTH} karakter)")
+    m = NUMERIC_LITERAL.match(text)
+    if m:
+        is_float = m.group(2) is not None or m.group(3) is not None or m.group(4) is not None
+        if not is_float:
+            return sp.Integer(text)
+        # Lebih dari 15 digit butuh presisi > double, serahkan ke parse_expression
+        digits = (m.group(1) or '') + (m.group(2) or m.group(3) or '')[1:]
+        if len(digits.lstrip('0')) <= 15:
+            return sp.Float(text)
+    return EXPR_CACHE.get_or_compute(text, lambda: parse_expression(text))
+
+# =======================
+# PARSER EKSPRESI (AMAN & TERBATAS)
+# =======================
+# Pengganti sp.sympify untuk input user: hanya angka, operator aritmatika,
+# konstanta/fungsi dari whitelist dan nama simbol pendek. Tidak ada eval,
+# panjang/kedalaman/pangkat dibatasi, dan evaluasi punya batas waktu.
+# EXPR_TIMEOUT dicek per node AST (sebelum node dibangun), jadi satu operasi SymPy
+# yang sedang jalan tidak diinterupsi. Batas keras ada di WorkerPool.run
+# (future.result(timeout=...)): di /compute input non-literal selalu di-parse di
+# proses worker. Parameter /compute/batch dan KALKULATOR_WORKERS=0 di-parse inline,
+# hanya dibatasi anggaran per node ini plus batas panjang/kedalaman/pangkat.
+EXPR_MAX_LENGTH = int(os.environ.get('KALKULATOR_EXPR_MAX_LENGTH', '200'))
+EXPR_MAX_DEPTH = int(os.environ.get('KALKULATOR_EXPR_MAX_DEPTH', '24'))
+EXPR_MAX_EXPONENT = int(os.environ.get('KALKULATOR_EXPR_MAX_EXPONENT', '1000'))
+EXPR_MAX_INT_BITS = int(os.environ.get('KALKULATOR_EXPR_MAX_INT_BITS', '4096'))
+EXPR_TIMEOUT = float(os.environ.get('KALKULATOR_EXPR_TIMEOUT_MS', '250')) / 1000
+
+SYMBOL_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9]{0,7}$')
+EXPR_CONSTANTS = {'pi': 'pi', 'E': 'E', 'oo': 'oo'}
+EXPR_FUNCTIONS = {
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan', 'cot': 'cot', 'sec': 'sec', 'csc': 'csc',
+    'asin': 'asin', 'acos': 'acos', 'atan': 'atan',
+    'sqrt': 'sqrt', 'cbrt': 'cbrt', 'exp': 'exp', 'log': 'log', 'ln': 'log',
+    'Abs': 'Abs', 'abs': 'Abs', 'floor': 'floor', 'ceiling': 'ceiling',
+}
+
+def parse_expression(text):
+    """Parse ekspresi teks jadi objek SymPy tanpa eval, dengan semua batas di atas"""
+    try:
+        # Sama seperti sympify: ^ berarti pangkat
+        tree = ast.parse(text.replace('^', '**'), mode='eval')
+    except (SyntaxError, ValueError):
+        raise ValueError(f"Ekspresi tidak valid: {text}")
+    builder = _ExpressionBuilder(text, time.perf_counter() + EXPR_TIMEOUT)
+    return builder.build(tree.body, 1)
+
+class _ExpressionBuilder:
+    BINARY = {
+        ast.Add: lambda a, b: a + b,
+        ast.Sub: lambda a, b: a - b,
+        ast.Mult: lambda a, b: a * b,
+        ast.Div: lambda a, b: a / b,
+        ast.Mod: lambda a, b: sp.Mod(a, b),
+    }
+
+    def __init__(self, text, deadline):
+        self.text = text
+        self.deadline = deadline
+
+    def build(self, node, depth):
+        if depth > EXPR_MAX_DEPTH:
+            raise ValueError(f"Ekspresi terlalu dalam (maks {EXPR_MAX_DEPTH} tingkat)")
+        if time.perf_counter() > self.deadline:
+            raise ValueError("Evaluasi ekspresi melewati batas waktu")
+        value = self._build(node, depth)
+        if isinstance(value, sp.Integer) and abs(int(value)).bit_length() > EXPR_MAX_INT_BITS:
+            raise ValueError("Bilangan terlalu besar")
+        return value
+
+    def _build(self, node, depth):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            if type(node.value) is int:
+                return sp.Integer(node.value)
+            # Pakai teks aslinya agar presisi literal panjang tidak hilang (seperti sympify)
+            return sp.Float(ast.get_source_segment(self.text.replace('^', '**'), node) or repr(node.value))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            operand = self.build(node.operand, depth + 1)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.BinOp):
+            left = self.build(node.left, depth + 1)
+            right = self.build(node.right, depth + 1)
+            if isinstance(node.op, ast.Pow):
+                return self._power(left, right)
+            op = self.BINARY.get(type(node.op))
+            if op is not None:
+                return op(left, right)
+        if isinstance(node, ast.Name):
+            if node.id in EXPR_CONSTANTS:
+                return getattr(sp, EXPR_CONSTANTS[node.id])
+            if SYMBOL_NAME.match(node.id) and node.id not in EXPR_FUNCTIONS:
+                return sp.Symbol(node.id)
+            raise ValueError(f"Nama tidak dikenal: {node.id}")
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in EXPR_FUNCTIONS:
+            if node.keywords or not 1 <= len(node.args) <= 2:
+                raise ValueError(f"Argumen {node.func.id} tidak valid")
+            args = [self.build(arg, depth + 1) for arg in node.args]
+            return getattr(sp, EXPR_FUNCTIONS[node.func.id])(*args)
+        raise ValueError(f"Ekspresi tidak didukung: {self.text}")
+
+    def _power(self, base, exponent):
+        if exponent.is_Number:
+            if abs(exponent) > EXPR_MAX_EXPONENT:
+                raise ValueError(f"Pangkat terlalu besar (maks {EXPR_MAX_EXPONENT})")
+            # Perkiraan ukuran hasil sebelum dihitung, mis. (10**500)**999
+            if isinstance(base, sp.Rational) and exponent.is_Integer:
+                bits = max(abs(base.p).bit_length(), abs(base.q).bit_length())
+                if bits * abs(int(exponent)) > EXPR_MAX_INT_BITS:
+                    raise ValueError("Bilangan terlalu besar")
+        return base ** exponent
+
+def is_plain_number(*vals):
+    """True jika semua nilai adalah Integer/Float SymPy yang muat di float64 tanpa kehilangan presisi"""
+    for v in vals:
+        if isinstance(v, sp.Integer):
+            if abs(int(v)) > MAX_EXACT_INT:
+                return False
+        elif isinstance(v, sp.Float):
+            if v._prec > 53:
+                return False
+        else:
+            return False
+    return True
+
+def numeric_result(values, exact):
+    """
+    Kembalikan hasil jalur cepat (float) ke Integer/Float SymPy,
+    supaya str() di teks langkah dan fnum() identik dengan jalur simbolik.
+    Hasil nol selalu jadi Integer 0, sama seperti perkalian Matrix SymPy.
+    """
+    return tuple(sp.Integer(int(v)) if e or v == 0 else sp.Float(float(v)) for v, e in zip(values, exact))
+
+# =======================
+# CACHE
+# =======================
+CACHE_REGISTRY = {}
+_MISSING = object()
+
+class LRUCache:
+    """
+    Cache LRU thread-safe dengan batas jumlah entri dan penghitung hit/miss.
+    maxbytes (opsional) membatasi total len(value), untuk cache gambar.
+    ttl (detik, opsional) = masa berlaku default entri; set(..., ttl=) per entri.
+    Semua instance terdaftar di CACHE_REGISTRY agar statistiknya bisa dipantau.
+    """
+    def __init__(self, name, maxsize=256, maxbytes=None, ttl=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._expires = {}  # hanya entri ber-TTL
+        self._lock = threading.Lock()
+        CACHE_REGISTRY[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self._expires and self._expires.get(key, math.inf) <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            if self.maxbytes is not None:
+                self.nbytes += len(value)
+            self._data[key] = value
+            if ttl:
+                self._expires[key] = time.monotonic() + ttl
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self.nbytes > self.maxbytes and len(self._data) > 1):
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key):
+        old = self._data.pop(key)
+        self._expires.pop(key, None)
+        if self.maxbytes is not None:
+            self.nbytes -= len(old)
+
+    def get_or_compute(self, key, fn):
+        """Ambil dari cache, atau hitung dengan fn() (di luar lock) lalu simpan"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expires.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            size, hits, misses, nbytes = len(self._data), self.hits, self.misses, self.nbytes
+        total = hits + misses
+        stats = {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0
+        }
+        if self.maxbytes is not None:
+            stats["bytes"] = nbytes
+            stats["maxbytes"] = self.maxbytes
+        return stats
+
+# =======================
+# CACHE BERSAMA (BACKEND PLUGGABLE)
+# =======================
+# Respons /compute dan gambar plot disimpan sebagai bytes di backend yang bisa dipakai
+# bersama antar worker/proses, dipilih lewat KALKULATOR_CACHE_BACKEND:
+#   memory (default)                -> LRUCache di proses ini
+#   sqlite:///path/kalkulator.db    -> file SQLite (WAL), dibagi semua proses di mesin yang sama
+#   redis://[[user]:password@]host:6379/0 -> server Redis (atau yang kompatibel RESP), antar mesin
+#   rediss://...                    -> sama, lewat TLS
+# Semua backend punya API yang sama dengan LRUCache (get/set/clear/stats) dan TTL per entri.
+# Error backend tidak pernah menggagalkan request: dicatat, lalu dianggap miss.
+CACHE_BACKEND = os.environ.get('KALKULATOR_CACHE_BACKEND', 'memory')
+CACHE_MAX_ITEM_BYTES = int(os.environ.get('KALKULATOR_CACHE_MAX_ITEM_BYTES', str(8 * 1024 * 1024)))
+CACHE_RETRY_AFTER = 5.0  # detik backend dilewati setelah gagal terhubung
+
+class SharedCache:
+    """Bagian umum backend luar proses: statistik, batas ukuran entri, penanganan error"""
+    def __init__(self, name, maxsize, maxbytes, ttl):
+        self.name = name
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._down_until = 0.0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        CACHE_REGISTRY[name] = self
+
+    def get(self, key, default=None):
+        value = self._call(self._get, key) if time.monotonic() >= self._down_until else None
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        if len(value) > CACHE_MAX_ITEM_BYTES or time.monotonic() < self._down_until:
+            return
+        self._call(self._set, key, bytes(value), self.ttl if ttl is None else ttl)
+
+    def get_or_compute(self, key, fn):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        self._call(self._clear)
+        with self._stats_lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._stats_lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        total = hits + misses
+        stats = {"backend": self.backend, "maxsize": self.maxsize, "hits": hits, "misses": misses,
+                 "errors": errors, "hit_ratio": round(hits / total, 4) if total else 0.0}
+        stats.update(self._call(self._usage) or {})
+        if self.maxbytes is not None:
+            stats["maxbytes"] = self.maxbytes
+        return stats
+
+    def _connection(self):
+        """Satu koneksi per thread per proses (koneksi tidak boleh terbawa fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def _call(self, fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            with self._stats_lock:
+                self.errors += 1
+            self._local.conn = None
+            self._down_until = time.monotonic() + CACHE_RETRY_AFTER
+            logger.warning("Cache %s (%s) error: %s", self.name, self.backend, e)
+            trace_error('cache', self.name, e)
+            return None
+
+class SQLiteCache(SharedCache):
+    """
+    Satu tabel per file untuk semua namespace (kolom key diawali '<name>:').
+    Mode WAL: pembaca tidak diblok penulis, aman dipakai banyak proses sekaligus.
+    Kelebihan entri/byte dipangkas tiap beberapa penulisan, yang paling lama tidak diakses lebih dulu.
+    Baca tidak menulis: waktu akses (atime) dikumpulkan di memori dan ditulis dalam satu
+    transaksi sebelum pemangkasan, atau begitu terkumpul ATIME_FLUSH_EVERY key.
+    """
+    backend = 'sqlite'
+    PRUNE_EVERY = 64
+    ATIME_FLUSH_EVERY = 256
+
+    def __init__(self, name, path, maxsize, maxbytes, ttl):
+        super().__init__(name, maxsize, maxbytes, ttl)
+        self.path = path
+        self._prefix = f"{name}:"
+        self._range = (self._prefix, f"{name};")  # semua key ber-prefix, lewat index primary key
+        self._writes = 0
+        self._atimes = {}
+        self._atime_lock = threading.Lock()
+
+    def _connect(self):
+        import sqlite3
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                     " expires REAL, atime REAL NOT NULL) WITHOUT ROWID")
+        return conn
+
+    def _get(self, key):
+        db = self._connection()
+        now = time.time()
+        row = db.execute("SELECT value, expires FROM cache WHERE key = ?", (self._prefix + key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= now:
+            db.execute("DELETE FROM cache WHERE key = ? AND expires <= ?", (self._prefix + key, now))
+            return None
+        with self._atime_lock:
+            self._atimes[self._prefix + key] = now
+            flush = len(self._atimes) >= self.ATIME_FLUSH_EVERY
+        if flush:
+            self._flush_atimes(db)
+        return row[0]
+
+    def _flush_atimes(self, db):
+        with self._atime_lock:
+            pending, self._atimes = self._atimes, {}
+        if pending:
+            db.execute("BEGIN")
+            try:
+                db.executemany("UPDATE cache SET atime = MAX(atime, ?) WHERE key = ?",
+                               [(t, k) for k, t in pending.items()])
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def _set(self, key, value, ttl):
+        db = self._connection()
+        now = time.time()
+        db.execute("INSERT OR REPLACE INTO cache (key, value, expires, atime) VALUES (?, ?, ?, ?)",
+                   (self._prefix + key, value, now + ttl if ttl else None, now))
+        with self._atime_lock:
+            self._atimes.pop(self._prefix + key, None)
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self._flush_atimes(db)
+            self._prune(db, now)
+
+    def _prune(self, db, now):
+        db.execute("DELETE FROM cache WHERE key >= ? AND key < ? AND expires <= ?", self._range + (now,))
+        count, nbytes = db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache"
+                                   " WHERE key >= ? AND key < ?", self._range).fetchone()
+        excess = count - self.maxsize
+        if self.maxbytes is not None and nbytes > self.maxbytes and count:
+            excess = max(excess, math.ceil(count * (nbytes - self.maxbytes) / nbytes))
+        if excess > 0:
+            db.execute("DELETE FROM cache WHERE key IN (SELECT key FROM cache WHERE key >= ? AND key < ?"
+                       " ORDER BY atime LIMIT ?)", self._range + (excess,))
+
+    def _clear(self):
+        self._connection().execute("DELETE FROM cache WHERE key >= ? AND key < ?", self._range)
+
+    def _usage(self):
+        count, nbytes = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache WHERE key >= ? AND key < ?",
+            self._range).fetchone()
+        return {"size": count, "bytes": nbytes}
+
+class RedisError(Exception):
+    """Balasan error (-ERR ...) dari server Redis"""
+
+class RedisCache(SharedCache):
+    """
+    Klien RESP minimal (GET/SET PX/SCAN/DEL + ZSET index), tanpa dependensi. Key diberi
+    prefix 'kalkulator:<name>:'. maxsize dijaga lewat ZSET 'kalkulator:<name>' (skor = waktu
+    kedaluwarsa): tiap SET ikut mendaftarkan key dalam round trip yang sama, kelebihannya
+    dibuang mulai dari yang paling cepat kedaluwarsa (butuh Redis 5+ untuk ZPOPMIN).
+    maxbytes membatasi ukuran satu entri; total byte diatur di server, mis.
+    maxmemory 256mb + maxmemory-policy allkeys-lru (dengan noeviction SET gagal saat penuh
+    dan dianggap miss). Skema rediss:// memakai TLS (sertifikat server diverifikasi);
+    user di URL dikirim sebagai user ACL pada AUTH.
+    """
+    backend = 'redis'
+
+    def __init__(self, name, url, maxsize, maxbytes, ttl):
+        super().__init__(name, maxsize, maxbytes, ttl)
+        from urllib.parse import unquote, urlsplit
+        parts = urlsplit(url)
+        self.tls = parts.scheme == 'rediss'
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 6379
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.lstrip('/') or 0)
+        self._prefix = f"kalkulator:{name}:".encode()
+        self._index = f"kalkulator:{name}".encode()
+
+    def _connect(self):
+        import socket
+        sock = socket.create_connection((self.host, self.port), timeout=2)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.tls:
+            import ssl
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        conn = (sock, sock.makefile('rb'))
+        if self.password:
+            # AUTH <user> <pass> untuk ACL (Redis 6+), AUTH <pass> untuk requirepass lama
+            auth = (self.username, self.password) if self.username else (self.password,)
+            self._command(conn, b'AUTH', *auth)
+        if self.db:
+            self._command(conn, b'SELECT', self.db)
+        return conn
+
+    @staticmethod
+    def _encode(args):
+        out = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b'$%d\r\n%b\r\n' % (len(arg), arg))
+        return b''.join(out)
+
+    @staticmethod
+    def _reply(f):
+        line = f.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("Koneksi Redis terputus")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest
+        if kind == b'-':
+            raise RedisError(rest.decode('utf-8', 'replace'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            n = int(rest)
+            if n < 0:
+                return None
+            data = f.read(n + 2)
+            if len(data) != n + 2:
+                raise ConnectionError("Koneksi Redis terputus")
+            return data[:-2]
+        if kind == b'*':
+            n = int(rest)
+            return None if n < 0 else [RedisCache._reply(f) for _ in range(n)]
+        raise ConnectionError(f"Balasan Redis tidak dikenal: {line[:32]!r}")
+
+    def _command(self, conn, *args):
+        sock, f = conn
+        sock.sendall(self._encode(args))
+        return self._reply(f)
+
+    def _pipeline(self, conn, *commands):
+        """Kirim beberapa perintah sekaligus, balasannya dibaca berurutan (satu round trip)"""
+        sock, f = conn
+        sock.sendall(b''.join(self._encode(args) for args in commands))
+        return [self._reply(f) for _ in commands]
+
+    def _get(self, key):
+        return self._command(self._connection(), b'GET', self._prefix + key.encode())
+
+    def _set(self, key, value, ttl):
+        if self.maxbytes is not None and len(value) > self.maxbytes:
+            return  # satu entri sudah melebihi batas seluruh cache
+        rkey = self._prefix + key.encode()
+        now_ms = int(time.time() * 1000)
+        args = (b'SET', rkey, value)
+        if ttl:
+            args += (b'PX', int(ttl * 1000))
+        conn = self._connection()
+        *_, count = self._pipeline(conn, args,
+                                   (b'ZADD', self._index, now_ms + int(ttl * 1000) if ttl else b'+inf', rkey),
+                                   (b'ZREMRANGEBYSCORE', self._index, b'-inf', now_ms),
+                                   (b'ZCARD', self._index))
+        if count > self.maxsize:
+            popped = self._command(conn, b'ZPOPMIN', self._index, count - self.maxsize)
+            if popped:
+                self._command(conn, b'DEL', *popped[::2])  # balasan: [member, skor, ...]
+
+    def _scan(self):
+        conn = self._connection()
+        cursor = b'0'
+        while True:
+            cursor, keys = self._command(conn, b'SCAN', cursor, b'MATCH', self._prefix + b'*', b'COUNT', 1000)
+            yield conn, keys
+            if cursor == b'0':
+                return
+
+    def _clear(self):
+        for conn, keys in self._scan():
+            if keys:
+                self._command(conn, b'DEL', *keys)
+        self._command(self._connection(), b'DEL', self._index)
+
+    def _usage(self):
+        # Dari index, bukan SCAN penuh: cukup murah untuk tiap scrape /metrics
+        now_ms = int(time.time() * 1000)
+        return {"size": self._command(self._connection(), b'ZCOUNT', self._index, f"({now_ms}", b'+inf')}
+
+def shared_cache(name, maxsize, maxbytes=None, ttl=None):
+    """Cache bytes untuk data yang layak dibagi antar proses, sesuai KALKULATOR_CACHE_BACKEND"""
+    if CACHE_BACKEND.startswith('sqlite:'):
+        path = CACHE_BACKEND[len('sqlite:'):]
+        path = path[2:] if path.startswith('//') else path
+        return SQLiteCache(name, path, maxsize, maxbytes, ttl)
+    if CACHE_BACKEND.startswith(('redis://', 'rediss://')):
+        return RedisCache(name, CACHE_BACKEND, maxsize, maxbytes, ttl)
+    if CACHE_BACKEND != 'memory':
+        raise ValueError(f"KALKULATOR_CACHE_BACKEND tidak dikenal: {CACHE_BACKEND}")
+    return LRUCache(name, maxsize, maxbytes, ttl)
+
+# Ukuran bisa diatur lewat environment, mis. KALKULATOR_MATRIX_CACHE_SIZE=1024
+MATRIX_CACHE_SIZE = int(os.environ.get('KALKULATOR_MATRIX_CACHE_SIZE', '512'))
+PIPELINE_CACHE_SIZE = int(os.environ.get('KALKULATOR_PIPELINE_CACHE_SIZE', '256'))
+
+MATRIX_CACHE = LRUCache('matrix', MATRIX_CACHE_SIZE)
+INVERSE_CACHE = LRUCache('matrix_inverse', MATRIX_CACHE_SIZE)
+DETERMINANT_CACHE = LRUCache('matrix_determinant', MATRIX_CACHE_SIZE)
+PIPELINE_CACHE = LRUCache('pipeline', PIPELINE_CACHE_SIZE)
+
+# Teks fnum per ekspresi SymPy bernilai angka (hasil evalf), mis. sqrt(2) -> '1.41'
+EVALF_CACHE = LRUCache('evalf', int(os.environ.get('KALKULATOR_EVALF_CACHE_SIZE', '1024')))
+# Hasil parse_expression per teks input (objek SymPy immutable, aman dipakai bersama)
+EXPR_CACHE = LRUCache('expression', int(os.environ.get('KALKULATOR_EXPR_CACHE_SIZE', '2048')))
+
+# Cache gambar plot: bytes mentah PNG/SVG (bukan base64) di backend bersama,
+# dibatasi total byte & TTL; tier disk opsional agar tahan restart
+PLOT_CACHE_MAX_BYTES = int(os.environ.get('KALKULATOR_PLOT_CACHE_BYTES', str(64 * 1024 * 1024)))
+PLOT_CACHE_TTL = float(os.environ.get('KALKULATOR_PLOT_CACHE_TTL', '86400'))
+PLOT_CACHE_DIR = os.environ.get('KALKULATOR_PLOT_CACHE_DIR')
+# Batas tier disk; file yang paling lama tidak dipakai (mtime) dihapus lebih dulu.
+# Dicek tiap PLOT_CACHE_DIR_PRUNE_EVERY penulisan per proses (dan pada penulisan pertama).
+PLOT_CACHE_DIR_MAX_BYTES = int(os.environ.get('KALKULATOR_PLOT_CACHE_DIR_BYTES', str(256 * 1024 * 1024)))
+PLOT_CACHE_DIR_MAX_FILES = int(os.environ.get('KALKULATOR_PLOT_CACHE_DIR_FILES', '20000'))
+PLOT_CACHE_DIR_PRUNE_EVERY = 64
+_PLOT_DISK_WRITES = itertools.count()
+PLOT_CACHE = shared_cache('plot', maxsize=100_000, maxbytes=PLOT_CACHE_MAX_BYTES, ttl=PLOT_CACHE_TTL)
+
+IMAGE_FORMATS = ('png', 'svg', 'json-geometry')
+IMAGE_DELIVERIES = ('inline', 'url')
+IMAGE_MIMETYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# Gambar yang dikirim lewat URL (/plot/<id>.<ext>), disimpan sebagai bytes mentah.
+# Ikut backend bersama supaya URL dari satu worker bisa dilayani worker lain.
+PLOT_STORE = shared_cache('plot_store', maxsize=100_000, maxbytes=PLOT_CACHE_MAX_BYTES, ttl=PLOT_CACHE_TTL)
+
 # =======================
 # VISUALIZATION ENGINE (NEW)
 # =======================
 class Plotter:
     @staticmethod
-    def create_triangle_image(a, b, c, A_deg, B_deg, C_deg, title="Visualisasi Segitiga"):
+    def triangle_geometry(a, b, c, A_deg, B_deg, C_deg, title="Visualisasi Segitiga"):
         """
-        Membuat plot segitiga berdasarkan 3 sisi dan 3 sudut.
+        Koordinat titik dan teks label segitiga (tanpa menggambar).
         Titik A di (0,0), B di (c,0).
         """
+        # Konversi ke float native Python
+        side_a = float(a)
+        side_b = float(b)
+        side_c = float(c)
+        angle_A = float(A_deg) * np.pi / 180
+        # angle_B tidak dipakai untuk koordinat, tapi untuk label
+
+        # Koordinat Titik
+        # A = (0, 0)
+        # B = (c, 0)
+        # C = (b * cos(A), b * sin(A))
+
+        Ax, Ay = 0, 0
+        Bx, By = side_c, 0
+        Cx = side_b * np.cos(angle_A)
+        Cy = side_b * np.sin(angle_A)
+
+        return {
+            "vertices": [[Ax, Ay], [Bx, By], [Cx, Cy]],
+            "angle_labels": [f'A\n{fnum(A_deg)}°', f'B\n{fnum(B_deg)}°', f'C\n{fnum(C_deg)}°'],
+            "side_labels": [f'c = {fnum(side_c)}', f'a = {fnum(side_a)}', f'b = {fnum(side_b)}'],
+            "title": title
+        }
+
+    @staticmethod
+    def cache_key(geom, image_format='png'):
+        """Kunci cache gambar: koordinat dibulatkan + semua teks yang tergambar + format"""
+        coords = tuple(round(float(v), 9) for pt in geom["vertices"] for v in pt)
+        return coords + tuple(geom["angle_labels"]) + tuple(geom["side_labels"]) + (geom["title"], image_format)
+
+    @staticmethod
+    def geometry_json(geom):
+        """Mode 'json-geometry': hanya koordinat & label, browser yang menggambar"""
+        return {
+            "vertices": [[float(x), float(y)] for x, y in geom["vertices"]],
+            "angle_labels": list(geom["angle_labels"]),
+            "side_labels": list(geom["side_labels"]),
+            "title": geom["title"]
+        }
+
+    @staticmethod
+    def create_triangle_image(a, b, c, A_deg, B_deg, C_deg, title="Visualisasi Segitiga", image_format='png'):
+        """
+        Membuat plot segitiga berdasarkan 3 sisi dan 3 sudut.
+        image_format: 'png' (base64), 'svg' (markup SVG) atau 'json-geometry' (dict koordinat & label).
+        Gambar di-cache di memori (LRU) dan opsional di disk (KALKULATOR_PLOT_CACHE_DIR).
+        """
+        t0 = time.perf_counter()
         try:
-            # Konversi ke float native Python
-            side_a = float(a)
-            side_b = float(b)
-            side_c = float(c)
-            angle_A = float(A_deg) * np.pi / 180
-            # angle_B tidak dipakai untuk koordinat, tapi untuk label
-            
-            # Koordinat Titik
-            # A = (0, 0)
-            # B = (c, 0)
-            # C = (b * cos(A), b * sin(A))
-            
-            Ax, Ay = 0, 0
-            Bx, By = side_c, 0
-            Cx = side_b * np.cos(angle_A)
-            Cy = side_b * np.sin(angle_A)
-            
-            # Setup Plot
-            fig, ax = plt.subplots(figsize=(6, 4.5)) # Ukuran pas untuk web
-            
-            # Gambar Segitiga
-            x_vals = [Ax, Bx, Cx, Ax]
-            y_vals = [Ay, By, Cy, Ay]
-            
-            # Fill warna gradasi (simulasi dengan alpha)
-            ax.fill(x_vals, y_vals, color='#0ea5e9', alpha=0.1)
-            ax.plot(x_vals, y_vals, color='#0ea5e9', linewidth=2, marker='o', markersize=6)
-            
-            # Label Titik
-            offset = side_c * 0.05
-            ax.text(Ax - offset, Ay, f'A\n{fnum(A_deg)}°', fontsize=10, ha='right', color='white', fontweight='bold', bbox=dict(facecolor='black', alpha=0.5, edgecolor='none', boxstyle='round,pad=0.2'))
-            ax.text(Bx + offset, By, f'B\n{fnum(B_deg)}°', fontsize=10, ha='left', color='white', fontweight='bold', bbox=dict(facecolor='black', alpha=0.5, edgecolor='none', boxstyle='round,pad=0.2'))
-            ax.text(Cx, Cy + offset, f'C\n{fnum(C_deg)}°', fontsize=10, ha='center', color='white', fontweight='bold', bbox=dict(facecolor='black', alpha=0.5, edgecolor='none', boxstyle='round,pad=0.2'))
-            
-            # Label Sisi
-            ax.text((Ax+Bx)/2, Ay - offset/2, f'c = {fnum(side_c)}', ha='center', va='top', color='#94a3b8', fontsize=9)
-            ax.text((Bx+Cx)/2, (By+Cy)/2, f'a = {fnum(side_a)}', ha='left', va='bottom', color='#94a3b8', fontsize=9)
-            ax.text((Ax+Cx)/2, (Ay+Cy)/2, f'b = {fnum(side_b)}', ha='right', va='bottom', color='#94a3b8', fontsize=9)
-            
-            # Styling Axis
-            ax.set_aspect('equal')
-            ax.axis('off') # Hilangkan sumbu X/Y biar bersih
-            
-            # Judul Kecil di dalam plot
-            plt.title(title, color='white', fontsize=10, pad=10)
-
-            # Simpan ke Buffer
-            buf = io.BytesIO()
-            # Set background transparan agar menyatu dengan Glassmorphism
-            plt.savefig(buf, format='png', bbox_inches='tight', transparent=True)
-            plt.close(fig)
-            buf.seek(0)
-            
-            # Encode Base64
-            img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-            return img_base64
+            return Plotter._create_triangle_image(a, b, c, A_deg, B_deg, C_deg, title, image_format)
+        finally:
+            trace_phase('plot', time.perf_counter() - t0)
+
+    @staticmethod
+    def _create_triangle_image(a, b, c, A_deg, B_deg, C_deg, title, image_format):
+        try:
+            geom = Plotter.triangle_geometry(a, b, c, A_deg, B_deg, C_deg, title)
+            if image_format == 'json-geometry':
+                return Plotter.geometry_json(geom)
+            key = Plotter.cache_key(geom, image_format)
+        except Exception as e:
+            logger.exception("Plot Error: %s", e)
+            trace_error('plot', 'geometry', e)
+            return None
+
+        cache_id = Plotter.cache_id(key)
+        raw = PLOT_CACHE.get(cache_id)
+        if raw is not None:
+            return Plotter._encode_image(raw, image_format)
+
+        raw = Plotter._read_disk_cache(cache_id)
+        if raw is None:
+            raw = Plotter._render(geom, image_format)
+            if raw is None:
+                return None
+            Plotter._write_disk_cache(cache_id, raw)
+        PLOT_CACHE.set(cache_id, raw)
+        return Plotter._encode_image(raw, image_format)
+
+    @staticmethod
+    def _encode_image(raw, image_format):
+        """Bytes hasil savefig -> nilai yang dikembalikan ke client (PNG base64 / teks SVG)"""
+        if image_format == 'svg':
+            return raw.decode('utf-8')
+        return base64.b64encode(raw).decode('utf-8')
+
+    @staticmethod
+    def _decode_image(img, image_format):
+        if image_format == 'svg':
+            return img.encode('utf-8')
+        return base64.b64decode(img)
+
+    @staticmethod
+    def cache_id(key):
+        """Kunci cache_key sebagai teks stabil (sha256 + ekstensi), dipakai semua backend & disk"""
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return f"{digest}.{key[-1]}"
+
+    @staticmethod
+    def _read_disk_cache(cache_id):
+        if not PLOT_CACHE_DIR:
+            return None
+        path = os.path.join(PLOT_CACHE_DIR, cache_id)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+            os.utime(path)  # mtime = waktu akses terakhir, dasar urutan pemangkasan
+            return raw
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_disk_cache(cache_id, raw):
+        if not PLOT_CACHE_DIR:
+            return
+        path = os.path.join(PLOT_CACHE_DIR, cache_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(PLOT_CACHE_DIR, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(raw)
+            os.replace(tmp_path, path)  # atomik, aman untuk banyak worker
+            if next(_PLOT_DISK_WRITES) % PLOT_CACHE_DIR_PRUNE_EVERY == 0:
+                Plotter._prune_disk_cache()
+        except OSError as e:
+            logger.warning("Plot Cache Error: %s", e)
+            trace_error('plot', 'disk_cache', e)
+
+    @staticmethod
+    def _prune_disk_cache():
+        """Pangkas direktori cache ke batas jumlah file & byte, mtime terlama lebih dulu"""
+        entries = []
+        with os.scandir(PLOT_CACHE_DIR) as it:
+            for entry in it:
+                if entry.name.endswith('.tmp'):
+                    continue  # sedang ditulis worker lain
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if len(entries) <= PLOT_CACHE_DIR_MAX_FILES and total <= PLOT_CACHE_DIR_MAX_BYTES:
+            return
+        entries.sort()
+        count = len(entries)
+        for _, size, path in entries:
+            if count <= PLOT_CACHE_DIR_MAX_FILES and total <= PLOT_CACHE_DIR_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # sudah dihapus proses lain
+            count -= 1
+            total -= size
+
+    @staticmethod
+    def _render(geom, image_format='png'):
+        fig = FIGURE_POOL.acquire()
+        try:
+            raw = fig.render(geom, image_format)
         except Exception as e:
-            print(f"Plot Error: {e}")
+            # Figure yang gagal di tengah jalan tidak dikembalikan ke pool
+            logger.exception("Plot Error: %s", e)
+            trace_error('plot', 'render', e)
             return None
+        FIGURE_POOL.release(fig)
+        return raw
+
+class TriangleFigure:
+    """
+    Figure segitiga yang dibangun sekali lalu dipakai ulang: artist (poligon, garis,
+    label) tetap ada dan hanya datanya yang di-update. Tanpa pyplot, jadi tidak
+    menyentuh state global dan aman dipakai paralel (satu figure per thread).
+    """
+    def __init__(self):
+        # Setup Plot
+        Figure, FigureCanvasAgg = load_matplotlib()
+        self.fig = Figure(figsize=(6, 4.5)) # Ukuran pas untuk web
+        FigureCanvasAgg(self.fig)
+        ax = self.fig.subplots()
+        self.ax = ax
+
+        # Fill warna gradasi (simulasi dengan alpha)
+        empty = [0, 0, 0, 0]
+        self.fill, = ax.fill(empty, empty, color='#0ea5e9', alpha=0.1)
+        self.line, = ax.plot(empty, empty, color='#0ea5e9', linewidth=2, marker='o', markersize=6)
+
+        # Label Titik
+        self.angle_texts = [
+            ax.text(0, 0, '', fontsize=10, ha=ha, color='white', fontweight='bold', bbox=dict(facecolor='black', alpha=0.5, edgecolor='none', boxstyle='round,pad=0.2'))
+            for ha in ('right', 'left', 'center')
+        ]
+
+        # Label Sisi
+        self.side_texts = [
+            ax.text(0, 0, '', ha=ha, va=va, color='#94a3b8', fontsize=9)
+            for ha, va in (('center', 'top'), ('left', 'bottom'), ('right', 'bottom'))
+        ]
+
+        # Styling Axis
+        ax.set_aspect('equal')
+        ax.axis('off') # Hilangkan sumbu X/Y biar bersih
+
+        # Judul Kecil di dalam plot
+        self.title = ax.set_title('', color='white', fontsize=10, pad=10)
+
+    def render(self, geom, image_format='png'):
+        (Ax, Ay), (Bx, By), (Cx, Cy) = geom["vertices"]
+
+        # Gambar Segitiga
+        x_vals = [Ax, Bx, Cx, Ax]
+        y_vals = [Ay, By, Cy, Ay]
+        self.fill.set_xy(list(zip(x_vals, y_vals)))
+        self.line.set_data(x_vals, y_vals)
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+        offset = Bx * 0.05
+        positions = [(Ax - offset, Ay), (Bx + offset, By), (Cx, Cy + offset)]
+        for text, pos, label in zip(self.angle_texts, positions, geom["angle_labels"]):
+            text.set_position(pos)
+            text.set_text(label)
+
+        positions = [((Ax+Bx)/2, Ay - offset/2), ((Bx+Cx)/2, (By+Cy)/2), ((Ax+Cx)/2, (Ay+Cy)/2)]
+        for text, pos, label in zip(self.side_texts, positions, geom["side_labels"]):
+            text.set_position(pos)
+            text.set_text(label)
+
+        self.title.set_text(geom["title"])
+
+        # Simpan ke Buffer
+        buf = io.BytesIO()
+        # Set background transparan agar menyatu dengan Glassmorphism
+        # metadata Date=None agar SVG deterministik (aman di-cache)
+        metadata = {'Date': None} if image_format == 'svg' else None
+        self.fig.savefig(buf, format=image_format, bbox_inches='tight', transparent=True, metadata=metadata)
+        return buf.getvalue()
+
+class FigurePool:
+    """Pool TriangleFigure: tiap render meminjam satu figure secara eksklusif"""
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._free = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return TriangleFigure()
+
+    def release(self, fig):
+        with self._lock:
+            if len(self._free) < self.maxsize:
+                self._free.append(fig)
+
+FIGURE_POOL = FigurePool(int(os.environ.get('KALKULATOR_FIGURE_POOL_SIZE', '8')))
+
+REFLEKSI_LABEL = {
+    'x': 'sumbu X',
+    'y': 'sumbu Y',
+    'yx': 'garis y = x',
+    'y-x': 'garis y = -x',
+    'origin': 'titik asal',
+}
 
 # =======================
 # ENGINE GEOMETRI (ASLI - TIDAK UBAH)
@@ -135,6 +1474,11 @@ class Plotter:
 class GeoEngine:
     @staticmethod
     def get_matrix(mode, param=None):
+        """Matriks 2x2 transformasi, di-cache per (mode, param). Hasil immutable karena dipakai bersama."""
+        return MATRIX_CACHE.get_or_compute((mode, param), lambda: sp.ImmutableMatrix(GeoEngine._build_matrix(mode, param)))
+
+    @staticmethod
+    def _build_matrix(mode, param=None):
         if mode == 'x': return sp.Matrix([[1, 0], [0, -1]])
         if mode == 'y': return sp.Matrix([[-1, 0], [0, 1]])
         if mode == 'yx': return sp.Matrix([[0, 1], [1, 0]])
@@ -148,108 +1492,265 @@ class GeoEngine:
         return sp.eye(2)
 
     @staticmethod
-    def get_matrix_homogen_3x3(mode, param=None, tx=0, ty=0):
+    def get_matrix_numeric(mode, param=None):
+        """Versi float (NumPy) dari get_matrix untuk jalur cepat input numerik"""
+        if mode == 'x': return np.array([[1.0, 0.0], [0.0, -1.0]])
+        if mode == 'y': return np.array([[-1.0, 0.0], [0.0, 1.0]])
+        if mode == 'yx': return np.array([[0.0, 1.0], [1.0, 0.0]])
+        if mode == 'y-x': return np.array([[0.0, -1.0], [-1.0, 0.0]])
+        if mode == 'origin': return np.array([[-1.0, 0.0], [0.0, -1.0]])
+        if mode == 'rot':
+            theta = math.radians(float(param))
+            return np.array([[math.cos(theta), -math.sin(theta)], [math.sin(theta), math.cos(theta)]])
+        if mode == 'dil':
+            k = float(param)
+            return np.array([[k, 0.0], [0.0, k]])
+        return np.eye(2)
+
+    @staticmethod
+    def get_matrix_homogen_3x3(mode, param=None, tx=0, ty=0, center=(0, 0)):
         if mode == 'trans':
             return sp.Matrix([[1, 0, tx], [0, 1, ty], [0, 0, 1]])
         m2 = GeoEngine.get_matrix(mode, param)
+        cx, cy = center
+        if cx == 0 and cy == 0:
+            return sp.Matrix([
+                [m2[0,0], m2[0,1], 0],
+                [m2[1,0], m2[1,1], 0],
+                [0,       0,       1]
+            ])
+        # Geser-Putar-Geser dalam satu matriks: T(c)·M·T(-c)
         return sp.Matrix([
-            [m2[0,0], m2[0,1], 0],
-            [m2[1,0], m2[1,1], 0],
+            [m2[0,0], m2[0,1], cx - m2[0,0]*cx - m2[0,1]*cy],
+            [m2[1,0], m2[1,1], cy - m2[1,0]*cx - m2[1,1]*cy],
             [0,       0,       1]
         ])
 
     @staticmethod
-    def translasi(point, T):
+    def get_matrix_homogen_3x3_numeric(mode, param=None, tx=0, ty=0, center=(0, 0)):
+        """
+        Versi float dari get_matrix_homogen_3x3.
+        Jika center bukan (0,0), Geser-Putar-Geser digabung jadi satu matriks: T(c)·M·T(-c)
+        """
+        if mode == 'trans':
+            return np.array([[1.0, 0.0, float(tx)], [0.0, 1.0, float(ty)], [0.0, 0.0, 1.0]])
+        m3 = np.eye(3)
+        m2 = GeoEngine.get_matrix_numeric(mode, param)
+        m2 = snap_near_integers(m2, np.abs(m2).max())  # cos 90° = 6e-17 -> 0
+        m3[:2, :2] = m2
+        c = np.array([float(center[0]), float(center[1])])
+        m3[:2, 2] = c - m2 @ c
+        return m3
+
+    @staticmethod
+    def transform_points(mat3, points):
+        """
+        Terapkan matriks homogen 3x3 ke array titik N×2 sekaligus (satu matmul vektor).
+        Hasil yang hanya meleset sebesar galat pembulatan dari bilangan bulat dibulatkan.
+        """
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lin, shift = mat3[:2, :2], mat3[:2, 2]
+        # Input ekstrem (inf/nan, overflow) menghasilkan inf/nan, dikirim sebagai null
+        with np.errstate(over='ignore', invalid='ignore'):
+            res = pts @ lin.T
+            res += shift
+            scale = np.abs(pts) @ np.abs(lin).T
+            scale += np.abs(shift)
+            return snap_near_integers(res, scale, out=res)
+
+    @staticmethod
+    def compile_pipeline(spec):
+        """
+        Gabungkan urutan transformasi jadi satu matriks homogen 3x3: M = Mn···M2·M1.
+        spec: tuple langkah (mode, param, tx, ty, cx, cy), sekaligus jadi kunci cache
+        sehingga pipeline yang sama tidak dikomposisi ulang.
+        """
+        return PIPELINE_CACHE.get_or_compute(spec, lambda: GeoEngine._compose_pipeline(spec))
+
+    @staticmethod
+    def _compose_pipeline(spec):
+        total = sp.eye(3)
+        for mode, param, tx, ty, cx, cy in spec:
+            total = GeoEngine.get_matrix_homogen_3x3(mode, param, tx, ty, center=(cx, cy)) * total
+        mat = sp.ImmutableMatrix(total)
+        mat_num = np.array(mat.evalf(), dtype=np.float64)
+        mat_num.setflags(write=False)
+        return mat, mat_num
+
+    @staticmethod
+    def describe_pipeline_step(mode, param, tx, ty, cx, cy):
+        if mode == 'trans':
+            return f"Translasi T({tx}, {ty})"
+        if mode == 'rot':
+            return f"Rotasi pusat ({cx},{cy}) sudut {param}°"
+        if mode == 'dil':
+            return f"Dilatasi pusat ({cx},{cy}) faktor k={param}"
+        return f"Refleksi terhadap {REFLEKSI_LABEL.get(mode, mode)}"
+
+    @staticmethod
+    def pipeline(point, spec, detail='full'):
+        px, py = point
+        mat, mat_num = GeoEngine.compile_pipeline(spec)
+        if is_plain_number(px, py):
+            res_num = GeoEngine.transform_points(mat_num, [float(px), float(py)])[0]
+            res = numeric_result(res_num, (False, False))
+        else:
+            res_vec = mat * sp.Matrix([px, py, 1])
+            res = (res_vec[0], res_vec[1])
+        steps = []
+        if wants(detail, 'steps'):
+            steps = [GeoEngine.describe_pipeline_step(*s) for s in spec]
+            steps.append(f"Matriks gabungan M = M{len(spec)}···M1, P' = M × P({px}, {py}, 1)")
+        return res, steps, mat
+
+    @staticmethod
+    def translasi(point, T, detail='full'):
         px, py = point
         tx, ty = T
         res = (px + tx, py + ty)
-        steps = [
-            f"Titik awal P({px}, {py})",
-            f"Vektor geser T({tx}, {ty})",
-            f"x' = {px} + {tx} = {px+tx}",
-            f"y' = {py} + {ty} = {py+ty}"
-        ]
+        steps = []
+        if wants(detail, 'steps'):
+            steps = [
+                f"Titik awal P({px}, {py})",
+                f"Vektor geser T({tx}, {ty})",
+                f"x' = {px} + {tx} = {res[0]}",
+                f"y' = {py} + {ty} = {res[1]}"
+            ]
         return res, steps
 
     @staticmethod
-    def translasi_homogen(point, T):
+    def translasi_homogen(point, T, detail='full'):
         px, py = point
         tx, ty = T
         mat = GeoEngine.get_matrix_homogen_3x3('trans', tx=tx, ty=ty)
-        p_vec = sp.Matrix([px, py, 1])
-        res_vec = mat * p_vec
+        if is_plain_number(px, py, tx, ty):
+            mat_num = GeoEngine.get_matrix_homogen_3x3_numeric('trans', tx=tx, ty=ty)
+            res_num = mat_num @ np.array([float(px), float(py), 1.0])
+            exact = [isinstance(px, sp.Integer) and isinstance(tx, sp.Integer),
+                     isinstance(py, sp.Integer) and isinstance(ty, sp.Integer)]
+            res_vec = numeric_result(res_num[:2], exact)
+        else:
+            p_vec = sp.Matrix([px, py, 1])
+            res_vec = mat * p_vec
         res = (res_vec[0], res_vec[1])
-        steps = [
-            f"Mengubah P({px}, {py}) ke koordinat homogen: Matrix([x, y, 1])",
-            f"Matriks Translasi 3x3: [[1,0,{tx}],[0,1,{ty}],[0,0,1]]",
-            f"Hasil perkalian: [{res_vec[0]}, {res_vec[1]}, 1]"
-        ]
+        steps = []
+        if wants(detail, 'steps'):
+            steps = [
+                f"Mengubah P({px}, {py}) ke koordinat homogen: Matrix([x, y, 1])",
+                f"Matriks Translasi 3x3: [[1,0,{tx}],[0,1,{ty}],[0,0,1]]",
+                f"Hasil perkalian: [{res_vec[0]}, {res_vec[1]}, 1]"
+            ]
         return res, steps, mat
 
     @staticmethod
-    def invers_transformasi(mode, param=None):
-        mat = GeoEngine.get_matrix(mode, param)
+    def get_inverse(mode, param=None):
+        """Invers matriks transformasi (di-cache), None jika singular"""
+        def build():
+            try:
+                return GeoEngine.get_matrix(mode, param).inv()
+            except ValueError:
+                return None
+        return INVERSE_CACHE.get_or_compute((mode, param), build)
+
+    @staticmethod
+    def get_determinant(mode, param=None):
+        return DETERMINANT_CACHE.get_or_compute((mode, param), lambda: GeoEngine.get_matrix(mode, param).det())
+
+    @staticmethod
+    def invers_transformasi(mode, param=None, detail='full'):
+        explain = wants(detail, 'steps')
         try:
-            mat_inv = mat.inv()
-            steps = [
-                f"Matriks Asal M:\n{mat}",
-                f"Determinan = {fnum(mat.det())}",
-                "Invers M⁻¹ = 1/det(M) × Adjoin(M)"
-            ]
+            mat_inv = GeoEngine.get_inverse(mode, param)
+            if mat_inv is None:
+                raise ValueError("Matriks singular")
+            steps = []
+            if explain:
+                steps = [
+                    f"Matriks Asal M:\n{GeoEngine.get_matrix(mode, param)}",
+                    f"Determinan = {fnum(GeoEngine.get_determinant(mode, param))}",
+                    "Invers M⁻¹ = 1/det(M) × Adjoin(M)"
+                ]
             return mat_inv, steps
         except:
-            return None, ["Matriks singular, tidak punya invers."]
+            return None, ["Matriks singular, tidak punya invers."] if explain else []
 
     @staticmethod
-    def refleksi(point, mode):
+    def refleksi(point, mode, detail='full'):
         px, py = point
         mat = GeoEngine.get_matrix(mode)
-        p_vec = sp.Matrix([px, py])
-        res_vec = mat * p_vec
-        res = (res_vec[0], res_vec[1])
-        steps = [
-            f"Titik awal P({px}, {py})",
-            f"Matriks refleksi: {mat}",
-            f"P' = Matriks × P = {res}"
-        ]
+        if is_plain_number(px, py):
+            mat_num = GeoEngine.get_matrix_numeric(mode)
+            res_num = mat_num @ np.array([float(px), float(py)])
+            # Koefisien refleksi bulat (0/±1): hasil tetap Integer jika input pembentuknya Integer
+            exact = [all(isinstance(v, sp.Integer) for v, m in zip((px, py), row) if m != 0) for row in mat_num]
+            res = numeric_result(res_num, exact)
+        else:
+            p_vec = sp.Matrix([px, py])
+            res_vec = mat * p_vec
+            res = (res_vec[0], res_vec[1])
+        steps = []
+        if wants(detail, 'steps'):
+            steps = [
+                f"Titik awal P({px}, {py})",
+                f"Matriks refleksi: {mat}",
+                f"P' = Matriks × P = {res}"
+            ]
         return res, steps, mat
 
     @staticmethod
-    def rotasi(point, angle_deg, center=(0,0)):
+    def rotasi(point, angle_deg, center=(0,0), detail='full'):
         px, py = point
         cx, cy = center
         mat = GeoEngine.get_matrix('rot', angle_deg)
         
-        if cx == 0 and cy == 0:
+        if is_plain_number(px, py, angle_deg, cx, cy):
+            # Sama dengan jalur pipeline/batch: matriks homogen float + snap galat pembulatan
+            mat_num = GeoEngine.get_matrix_homogen_3x3_numeric('rot', angle_deg, center=(cx, cy))
+            res_num = GeoEngine.transform_points(mat_num, [float(px), float(py)])[0]
+            res_vec = numeric_result(res_num, (False, False))
+        elif cx == 0 and cy == 0:
             p_vec = sp.Matrix([px, py])
             res_vec = mat * p_vec
-            steps = [f"Rotasi pusat (0,0) sudut {angle_deg}°"]
         else:
             p_vec = sp.Matrix([px - cx, py - cy])
             temp_vec = mat * p_vec
             res_vec = temp_vec + sp.Matrix([cx, cy])
-            steps = [f"Rotasi pusat ({cx},{cy}) sudut {angle_deg}°: Geser-Putar-Geser"]
 
+        steps = []
+        if wants(detail, 'steps'):
+            if cx == 0 and cy == 0:
+                steps = [f"Rotasi pusat (0,0) sudut {angle_deg}°"]
+            else:
+                steps = [f"Rotasi pusat ({cx},{cy}) sudut {angle_deg}°: Geser-Putar-Geser"]
         res = (res_vec[0], res_vec[1])
         return res, steps, mat
 
     @staticmethod
-    def dilatasi(point, factor, center=(0,0)):
+    def dilatasi(point, factor, center=(0,0), detail='full'):
         px, py = point
         cx, cy = center
         k = factor
         mat = GeoEngine.get_matrix('dil', k)
         
-        if cx == 0 and cy == 0:
+        if is_plain_number(px, py, k, cx, cy):
+            # Sama dengan jalur pipeline/batch: matriks homogen float + snap galat pembulatan
+            mat_num = GeoEngine.get_matrix_homogen_3x3_numeric('dil', k, center=(cx, cy))
+            res_num = GeoEngine.transform_points(mat_num, [float(px), float(py)])[0]
+            res_vec = numeric_result(res_num, (False, False))
+        elif cx == 0 and cy == 0:
             p_vec = sp.Matrix([px, py])
             res_vec = mat * p_vec
-            steps = [f"Dilatasi pusat (0,0) faktor k={k}"]
         else:
             p_vec = sp.Matrix([px - cx, py - cy])
             temp_vec = mat * p_vec
             res_vec = temp_vec + sp.Matrix([cx, cy])
-            steps = [f"Dilatasi pusat ({cx},{cy}) faktor k={k}: (x'-{cx}) = {k}·(x-{cx})"]
 
+        steps = []
+        if wants(detail, 'steps'):
+            if cx == 0 and cy == 0:
+                steps = [f"Dilatasi pusat (0,0) faktor k={k}"]
+            else:
+                steps = [f"Dilatasi pusat ({cx},{cy}) faktor k={k}: (x'-{cx}) = {k}·(x-{cx})"]
         res = (res_vec[0], res_vec[1])
         return res, steps, mat
 
@@ -257,16 +1758,23 @@ class GeoEngine:
 # ENGINE TRIGONOMETRI (UPDATED WITH PLOT CALLS)
 # =======================
 class TrigEngine:
+    # detail: lihat DETAIL_LEVELS. Langkah hanya disusun mulai level 'steps',
+    # gambar (beserta hitungan sudut pendukungnya) hanya pada level 'full'.
+
     @staticmethod
-    def luas_segitiga(a, b, angle_C):
+    def luas_segitiga(a, b, angle_C, image_format='png', detail='full'):
         rad_C = to_rad(angle_C)
         val_sin = sp.sin(rad_C)
         res = 0.5 * a * b * val_sin
-        steps = [
-            f"sin({angle_C}°) = {fnum(val_sin)}",
-            f"L = ½ × {a} × {b} × {fnum(val_sin)}",
-            f"L = {fnum(res)}"
-        ]
+        steps = []
+        if wants(detail, 'steps'):
+            steps = [
+                f"sin({angle_C}°) = {fnum(val_sin)}",
+                f"L = ½ × {a} × {b} × {fnum(val_sin)}",
+                f"L = {fnum(res)}"
+            ]
+        if not wants(detail, 'full'):
+            return res, steps, None
         
         # Hitung sisi c untuk visualisasi
         c_sq = a**2 + b**2 - (2 * a * b * sp.cos(rad_C))
@@ -278,19 +1786,23 @@ class TrigEngine:
         deg_A = rad_A * 180 / sp.pi
         deg_B = 180 - angle_C - deg_A
         
-        img = Plotter.create_triangle_image(a, b, c_res, deg_A, deg_B, angle_C)
+        img = Plotter.create_triangle_image(a, b, c_res, deg_A, deg_B, angle_C, image_format=image_format)
         return res, steps, img
 
     @staticmethod
-    def aturan_sinus_ambigu(sisi_a, sisi_b, sudut_A):
+    def aturan_sinus_ambigu(sisi_a, sisi_b, sudut_A, image_format='png', detail='full'):
+        explain = wants(detail, 'steps')
+        plot = wants(detail, 'full')
         rad_A = to_rad(sudut_A)
         sin_A = sp.sin(rad_A)
         h = sisi_b * sin_A
         
-        steps = [
-            f"Diketahui: a={sisi_a}, b={sisi_b}, A={sudut_A}°",
-            f"Tinggi h = b × sin A = {sisi_b} × {fnum(sin_A)} = {fnum(h)}"
-        ]
+        steps = []
+        if explain:
+            steps = [
+                f"Diketahui: a={sisi_a}, b={sisi_b}, A={sudut_A}°",
+                f"Tinggi h = b × sin A = {sisi_b} × {fnum(sin_A)} = {fnum(h)}"
+            ]
         
         val_a = float(sisi_a.evalf())
         val_b = float(sisi_b.evalf())
@@ -299,32 +1811,35 @@ class TrigEngine:
         images = []
         
         if val_a < val_h:
-            steps.append(f"Karena a < h ({val_a} < {fnum(val_h)}), tidak ada segitiga")
+            if explain:
+                steps.append(f"Karena a < h ({fnum(val_a)} < {fnum(val_h)}), tidak ada segitiga")
             return [], steps, "Tidak ada solusi (0 Segitiga)", []
             
         elif abs(val_a - val_h) < 1e-9:
             deg_B = 90
             deg_C = 180 - float(sudut_A) - 90
-            # Cari sisi c
-            # c/sinC = a/sinA
-            val_c = (val_a * math.sin(math.radians(deg_C))) / math.sin(math.radians(float(sudut_A)))
-            
-            steps.append(f"Karena a = h, segitiga siku-siku di B")
-            img = Plotter.create_triangle_image(val_a, val_b, val_c, float(sudut_A), deg_B, deg_C)
-            return [deg_B], steps, "1 Solusi (Siku-siku)", [img]
+            if explain:
+                steps.append(f"Karena a = h, segitiga siku-siku di B")
+            if plot:
+                # Cari sisi c
+                # c/sinC = a/sinA
+                val_c = (val_a * math.sin(math.radians(deg_C))) / math.sin(math.radians(float(sudut_A)))
+                images = [Plotter.create_triangle_image(val_a, val_b, val_c, float(sudut_A), deg_B, deg_C, image_format=image_format)]
+            return [deg_B], steps, "1 Solusi (Siku-siku)", images
             
         elif val_a >= val_b:
             val_sin_B = (sisi_b * sin_A) / sisi_a
             rad_B = sp.asin(val_sin_B)
             deg_B = float(rad_B * 180 / sp.pi)
             deg_C = 180 - float(sudut_A) - deg_B
-            val_c = (val_a * math.sin(math.radians(deg_C))) / math.sin(math.radians(float(sudut_A)))
 
-            steps.append(f"Karena a ≥ b, hanya ada 1 segitiga")
-            steps.append(f"B = {fnum(deg_B)}°")
-            
-            img = Plotter.create_triangle_image(val_a, val_b, val_c, float(sudut_A), deg_B, deg_C)
-            return [deg_B], steps, "1 Solusi", [img]
+            if explain:
+                steps.append(f"Karena a ≥ b, hanya ada 1 segitiga")
+                steps.append(f"B = {fnum(deg_B)}°")
+            if plot:
+                val_c = (val_a * math.sin(math.radians(deg_C))) / math.sin(math.radians(float(sudut_A)))
+                images = [Plotter.create_triangle_image(val_a, val_b, val_c, float(sudut_A), deg_B, deg_C, image_format=image_format)]
+            return [deg_B], steps, "1 Solusi", images
             
         else:
             # Kasus Ambigu (2 Segitiga)
@@ -333,31 +1848,37 @@ class TrigEngine:
             deg_B1 = float(rad_B1 * 180 / sp.pi)
             deg_B2 = 180 - deg_B1
             
-            deg_C1 = 180 - float(sudut_A) - deg_B1
-            deg_C2 = 180 - float(sudut_A) - deg_B2
-            
-            val_c1 = (val_a * math.sin(math.radians(deg_C1))) / math.sin(math.radians(float(sudut_A)))
-            val_c2 = (val_a * math.sin(math.radians(deg_C2))) / math.sin(math.radians(float(sudut_A)))
-            
-            steps.append(f"Karena h < a < b, ada 2 kemungkinan")
-            
-            img1 = Plotter.create_triangle_image(val_a, val_b, val_c1, float(sudut_A), deg_B1, deg_C1, "Solusi 1 (Lancip)")
-            img2 = Plotter.create_triangle_image(val_a, val_b, val_c2, float(sudut_A), deg_B2, deg_C2, "Solusi 2 (Tumpul)")
+            if explain:
+                steps.append(f"Karena h < a < b, ada 2 kemungkinan")
+            if plot:
+                deg_C1 = 180 - float(sudut_A) - deg_B1
+                deg_C2 = 180 - float(sudut_A) - deg_B2
+                
+                val_c1 = (val_a * math.sin(math.radians(deg_C1))) / math.sin(math.radians(float(sudut_A)))
+                val_c2 = (val_a * math.sin(math.radians(deg_C2))) / math.sin(math.radians(float(sudut_A)))
+                
+                img1 = Plotter.create_triangle_image(val_a, val_b, val_c1, float(sudut_A), deg_B1, deg_C1, "Solusi 1 (Lancip)", image_format)
+                img2 = Plotter.create_triangle_image(val_a, val_b, val_c2, float(sudut_A), deg_B2, deg_C2, "Solusi 2 (Tumpul)", image_format)
+                images = [img1, img2]
             
-            return [deg_B1, deg_B2], steps, "2 Solusi (Ambigu)", [img1, img2]
+            return [deg_B1, deg_B2], steps, "2 Solusi (Ambigu)", images
 
     @staticmethod
-    def aturan_cosinus(a=None, b=None, c=None, angle_C=None):
+    def aturan_cosinus(a=None, b=None, c=None, angle_C=None, image_format='png', detail='full'):
         if c is None:
             # Cari Sisi
             rad_C = to_rad(angle_C)
             val_cos = sp.cos(rad_C)
             c_sq = a**2 + b**2 - (2 * a * b * val_cos)
             res = sp.sqrt(c_sq)
-            steps = [
-                f"c² = a² + b² - 2ab·cos C",
-                f"c = √{fnum(c_sq)} = {fnum(res)}"
-            ]
+            steps = []
+            if wants(detail, 'steps'):
+                steps = [
+                    f"c² = a² + b² - 2ab·cos C",
+                    f"c = √{fnum(c_sq)} = {fnum(res)}"
+                ]
+            if not wants(detail, 'full'):
+                return res, steps, None
             
             # Hitung sudut A untuk plot
             # a^2 = b^2 + c^2 - 2bc cosA
@@ -372,17 +1893,21 @@ class TrigEngine:
             deg_A = math.degrees(math.acos(cos_A))
             deg_B = 180 - val_ang_C - deg_A
             
-            img = Plotter.create_triangle_image(val_a, val_b, val_c, deg_A, deg_B, val_ang_C)
+            img = Plotter.create_triangle_image(val_a, val_b, val_c, deg_A, deg_B, val_ang_C, image_format=image_format)
             return res, steps, img
             
         elif angle_C is None:
             # Cari Sudut
             val_cos = (a**2 + b**2 - c**2) / (2 * a * b)
             res = sp.acos(val_cos) * 180 / sp.pi
-            steps = [
-                f"cos C = (a² + b² - c²) / 2ab",
-                f"C = {fnum(res)}°"
-            ]
+            steps = []
+            if wants(detail, 'steps'):
+                steps = [
+                    f"cos C = (a² + b² - c²) / 2ab",
+                    f"C = {fnum(res)}°"
+                ]
+            if not wants(detail, 'full'):
+                return res, steps, None
             
             val_a = get_val(a)
             val_b = get_val(b)
@@ -395,9 +1920,80 @@ class TrigEngine:
             deg_A = math.degrees(math.acos(cos_A))
             deg_B = 180 - val_res_C - deg_A
             
-            img = Plotter.create_triangle_image(val_a, val_b, val_c, deg_A, deg_B, val_res_C)
+            img = Plotter.create_triangle_image(val_a, val_b, val_c, deg_A, deg_B, val_res_C, image_format=image_format)
             return res, steps, img
 
+    # ---- Versi batch (NumPy, vektor float64) ----
+    # Input berupa array sisi/sudut (derajat) yang sudah di-broadcast, output dict kolom.
+    # Rumus dan percabangan sama dengan versi satuan di atas; baris yang tidak valid
+    # bernilai NaN dengan valid=False.
+
+    @staticmethod
+    def luas_segitiga_batch(a, b, C):
+        sin_C = sin_deg(C)
+        luas = 0.5 * a * b * sin_C
+        c = np.sqrt(a**2 + b**2 - 2 * a * b * cos_deg(C))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            A = np.degrees(np.arcsin(a * sin_C / c))
+        B = 180 - C - A
+        valid = (a > 0) & (b > 0) & (C > 0) & (C < 180) & np.isfinite(A)
+        return TrigEngine._mask_columns(valid, luas=luas, c=c, A=A, B=B)
+
+    @staticmethod
+    def aturan_cosinus_batch(a, b, c=None, C=None):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if c is None:
+                # Cari sisi c dari a, b, C
+                c = np.sqrt(a**2 + b**2 - 2 * a * b * cos_deg(C))
+                valid = (a > 0) & (b > 0) & (C > 0) & (C < 180)
+                result = {"c": c}
+            else:
+                # Cari sudut C dari tiga sisi; di luar domain acos = bukan segitiga
+                cos_C = (a**2 + b**2 - c**2) / (2 * a * b)
+                valid = (a > 0) & (b > 0) & (c > 0) & (np.abs(cos_C) <= 1)
+                C = np.degrees(np.arccos(np.clip(cos_C, -1, 1)))
+                result = {"C": C}
+            cos_A = np.clip((b**2 + c**2 - a**2) / (2 * b * c), -1, 1)
+            A = np.degrees(np.arccos(cos_A))
+        result["A"] = A
+        result["B"] = 180 - C - A
+        return TrigEngine._mask_columns(valid & np.isfinite(A), **result)
+
+    @staticmethod
+    def aturan_sinus_ambigu_batch(a, b, A):
+        sin_A = sin_deg(A)
+        h = b * sin_A
+        none = a < h
+        right = ~none & (np.abs(a - h) < 1e-9)
+        one = ~none & ~right & (a >= b)
+        two = ~none & ~right & ~one
+        with np.errstate(divide='ignore', invalid='ignore'):
+            B1 = np.where(right, 90.0, np.degrees(np.arcsin(np.clip(h / a, -1, 1))))
+            C1 = 180 - A - B1
+            c1 = a * sin_deg(C1) / sin_A
+            B2 = 180 - B1
+            C2 = 180 - A - B2
+            c2 = a * sin_deg(C2) / sin_A
+        solutions = np.where(none, 0, np.where(two, 2, 1)).astype(np.int8)
+        valid = (a > 0) & (b > 0) & (A > 0) & (A < 180)
+        cols = TrigEngine._mask_columns(valid & ~none, B1=B1, C1=C1, c1=c1)
+        cols.update(TrigEngine._mask_columns(valid & two, B2=B2, C2=C2, c2=c2))
+        cols["solutions"] = np.where(valid, solutions, 0).astype(np.int8)
+        cols["h"] = snap_near_integers(h, np.abs(h), out=h)
+        cols["valid"] = valid
+        return cols
+
+    @staticmethod
+    def _mask_columns(valid, **columns):
+        # sin/cos sudut istimewa sudah persis lewat sin_deg/cos_deg (luas 7.5, bukan 7.499999999999999);
+        # sisa galat di sekitar bilangan bulat di-snap seperti jalur geo (59.99999999999999 -> 60)
+        out = {}
+        for name, col in columns.items():
+            col = np.where(valid, col, np.nan)
+            out[name] = snap_near_integers(col, np.abs(col), out=col)
+        out["valid"] = valid
+        return out
+
 # =======================
 # FRONTEND (HTML/CSS/JS)
 # =======================
@@ -599,6 +2195,8 @@ HTML_TEMPLATE = """
             transform: scale(1.02);
         }
 
+        .visual-img svg { max-width: 100%; height: auto; }
+
         /* CARD STEP */
         .card-explanation {
             background: rgba(255, 255, 255, 0.02);
@@ -859,20 +2457,186 @@ HTML_TEMPLATE = """
         } else if(op === 'luas_segitiga') document.getElementById('trig-luas').classList.remove('hidden');
     }
     
+    function escapeXML(s) {
+        return String(s).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+    }
+
+    // Label multi-baris ("A\\n30°") jadi <tspan> per baris
+    function svgText(x, y, label, attrs) {
+        const lines = String(label).split('\\n');
+        const spans = lines.map((line, i) => `<tspan x="${x}" dy="${i === 0 ? 0 : '1.2em'}">${escapeXML(line)}</tspan>`).join('');
+        return `<text x="${x}" y="${y}" ${attrs}>${spans}</text>`;
+    }
+
+    // Mode 'json-geometry': gambar segitiga dari koordinat + label kiriman server
+    function geometrySVG(g) {
+        const W = 480, H = 360, pad = 60;
+        const xs = g.vertices.map(v => v[0]), ys = g.vertices.map(v => v[1]);
+        const minX = Math.min(...xs), maxX = Math.max(...xs), minY = Math.min(...ys), maxY = Math.max(...ys);
+        const scale = Math.min((W - 2 * pad) / ((maxX - minX) || 1), (H - 2 * pad) / ((maxY - minY) || 1));
+        const offX = pad + ((W - 2 * pad) - (maxX - minX) * scale) / 2;
+        const offY = pad + ((H - 2 * pad) - (maxY - minY) * scale) / 2;
+        const P = g.vertices.map(v => [offX + (v[0] - minX) * scale, H - offY - (v[1] - minY) * scale]);
+        const [A, B, C] = P;
+        const angleAttrs = 'fill="white" font-size="13" font-weight="bold"';
+        const sideAttrs = 'fill="#94a3b8" font-size="12"';
+
+        let svg = `<svg viewBox="0 0 ${W} ${H}" class="visual-img" xmlns="http://www.w3.org/2000/svg" font-family="sans-serif">`;
+        svg += svgText(W / 2, 22, g.title, 'fill="white" font-size="13" text-anchor="middle"');
+        svg += `<polygon points="${P.map(p => p.join(',')).join(' ')}" fill="#0ea5e9" fill-opacity="0.1" stroke="#0ea5e9" stroke-width="2" stroke-linejoin="round"/>`;
+        P.forEach(p => svg += `<circle cx="${p[0]}" cy="${p[1]}" r="4" fill="#0ea5e9"/>`);
+        svg += svgText(A[0] - 10, A[1], g.angle_labels[0], `${angleAttrs} text-anchor="end"`);
+        svg += svgText(B[0] + 10, B[1], g.angle_labels[1], `${angleAttrs} text-anchor="start"`);
+        svg += svgText(C[0], C[1] - 28, g.angle_labels[2], `${angleAttrs} text-anchor="middle"`);
+        svg += svgText((A[0] + B[0]) / 2, A[1] + 18, g.side_labels[0], `${sideAttrs} text-anchor="middle"`);
+        svg += svgText((B[0] + C[0]) / 2 + 6, (B[1] + C[1]) / 2, g.side_labels[1], `${sideAttrs} text-anchor="start"`);
+        svg += svgText((A[0] + C[0]) / 2 - 6, (A[1] + C[1]) / 2, g.side_labels[2], `${sideAttrs} text-anchor="end"`);
+        return svg + '</svg>';
+    }
+
+    function visualHTML(img, format, style, delivery) {
+        if (delivery === 'url') return `<img src="${img}" class="visual-img" style="${style}">`;
+        if (format === 'json-geometry') return `<div style="${style}">${geometrySVG(img)}</div>`;
+        if (format === 'svg') return `<div class="visual-img" style="${style}">${img}</div>`;
+        return `<img src="data:image/png;base64,${img}" class="visual-img" style="${style}">`;
+    }
+
     function updateCosForm() {
         const type = document.getElementById('trig-cos-type').value;
         document.getElementById('trig-cos-sisi').classList.toggle('hidden', type !== 'cari_sisi');
         document.getElementById('trig-cos-sudut').classList.toggle('hidden', type !== 'cari_sudut');
     }
     
-    function calculate() {
-        const btn = document.querySelector('.btn-calc');
-        btn.innerHTML = "⏳ MEMPROSES...";
-        
-        // Reset Visual Panel
-        document.getElementById('visual-panel').style.display = 'none';
-        document.getElementById('visual-container').innerHTML = '';
-        
+    // =======================
+    // REQUEST LAYER: dedup, debounce, batalkan request basi, cache respons
+    // =======================
+    // Payload yang sama (setelah dinormalisasi) tidak dikirim ulang: jawaban diambil
+    // dari cache memori lalu IndexedDB. Request lama dibatalkan (AbortController) saat
+    // input berubah, dan hanya respons request terakhir yang ditampilkan. Server sibuk (503)
+    // dicoba lagi setelah retry_after detik, makin lama tiap percobaan.
+    const CACHE_VERSION = '{{ cache_version }}';  // berubah setiap kode server berubah
+    const MEMORY_CACHE_MAX = 200;
+    const IDB_MAX_AGE_MS = 7 * 24 * 3600 * 1000;
+    const DEBOUNCE_MS = 400;
+    const BUSY_MAX_RETRIES = 3;
+    const memoryCache = new Map();  // urutan sisip = urutan LRU
+    let inflight = null;            // { key, controller }
+    let requestSeq = 0;
+    let debounceTimer = null;
+    let autoCalculate = false;      // hitung ulang otomatis setelah hitung manual pertama
+
+    const idb = new Promise(resolve => {
+        try {
+            const req = indexedDB.open('kalkulator', 1);
+            req.onupgradeneeded = () => req.result.createObjectStore('responses', { keyPath: 'key' });
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = req.onblocked = () => resolve(null);
+        } catch (e) {
+            resolve(null);  // tanpa IndexedDB (mode privat, dsb.): cache memori saja
+        }
+    });
+
+    function idbGet(key) {
+        return idb.then(db => db && new Promise(resolve => {
+            const req = db.transaction('responses').objectStore('responses').get(key);
+            req.onsuccess = () => {
+                const rec = req.result;
+                resolve(rec && Date.now() - rec.time < IDB_MAX_AGE_MS ? rec.data : null);
+            };
+            req.onerror = () => resolve(null);
+        })).catch(() => null);
+    }
+
+    function idbPut(key, data) {
+        idb.then(db => {
+            if (db) db.transaction('responses', 'readwrite').objectStore('responses').put({ key, data, time: Date.now() });
+        }).catch(() => {});
+    }
+
+    // Buang entri dari versi server lama atau yang sudah kedaluwarsa
+    function idbPrune() {
+        idb.then(db => {
+            if (!db) return;
+            const req = db.transaction('responses', 'readwrite').objectStore('responses').openCursor();
+            req.onsuccess = () => {
+                const cursor = req.result;
+                if (!cursor) return;
+                const rec = cursor.value;
+                if (!rec.key.startsWith(CACHE_VERSION + ':') || Date.now() - rec.time > IDB_MAX_AGE_MS) cursor.delete();
+                cursor.continue();
+            };
+        }).catch(() => {});
+    }
+
+    function normalizePayload(payload) {
+        const norm = {};
+        Object.keys(payload).sort().forEach(k => {
+            const v = payload[k];
+            norm[k] = typeof v === 'string' ? v.trim() : v;
+        });
+        return norm;
+    }
+
+    function rememberResponse(key, data) {
+        memoryCache.delete(key);
+        memoryCache.set(key, data);
+        if (memoryCache.size > MEMORY_CACHE_MAX) memoryCache.delete(memoryCache.keys().next().value);
+    }
+
+    function requestCompute(key, payload) {
+        if (inflight) inflight.controller.abort();
+        inflight = null;
+        if (memoryCache.has(key)) {
+            const data = memoryCache.get(key);
+            rememberResponse(key, data);
+            return Promise.resolve(data);
+        }
+        const controller = new AbortController();
+        const current = inflight = { key, controller };
+        return idbGet(key)
+            .then(stored => {
+                if (stored) {
+                    rememberResponse(key, stored);
+                    return stored;
+                }
+                return postCompute(payload, controller.signal, 0).then(({ res, data }) => {
+                    // Hanya jawaban sukses yang disimpan (bukan 503/504 atau pesan error input)
+                    if (res.ok && !data.error) {
+                        rememberResponse(key, data);
+                        idbPut(key, data);
+                    }
+                    return data;
+                });
+            })
+            .finally(() => { if (inflight === current) inflight = null; });
+    }
+
+    function postCompute(payload, signal, attempt) {
+        return fetch('/compute', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(payload),
+            signal
+        }).then(res => res.json().then(data => {
+            if (res.status !== 503 || attempt >= BUSY_MAX_RETRIES) return { res, data };
+            // Worker penuh: tunggu sesuai saran server (+ jitter agar client tidak serempak)
+            const seconds = Number(data.retry_after || res.headers.get('Retry-After')) || 1;
+            const delay = seconds * 1000 * 2 ** attempt * (1 + Math.random() * 0.5);
+            return sleep(delay, signal).then(() => postCompute(payload, signal, attempt + 1));
+        }));
+    }
+
+    function sleep(ms, signal) {
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(resolve, ms);
+            signal.addEventListener('abort', () => {
+                clearTimeout(timer);
+                reject(new DOMException('Aborted', 'AbortError'));
+            }, { once: true });
+        });
+    }
+
+    function buildPayload() {
         let payload = {};
         
         // GEOMETRY PAYLOAD
@@ -889,7 +2653,8 @@ HTML_TEMPLATE = """
         // TRIGONOMETRY PAYLOAD
         } else {
             const op = document.getElementById('trig-op').value;
-            payload = { module: 'trig', operation: op };
+            // Server cukup kirim koordinat & label, gambar dibuat di browser
+            payload = { module: 'trig', operation: op, image_format: 'json-geometry' };
             
             if (op === 'aturan_sinus') {
                 payload.b = document.getElementById('trig-b').value;
@@ -918,261 +2683,1364 @@ HTML_TEMPLATE = """
                 payload.C = document.getElementById('trig-C-luas').value;
             }
         }
-        
-        fetch('/compute', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify(payload)
-        })
-        .then(res => res.json())
-        .then(data => {
-            // Render Result
-            if (data.error) {
-                document.getElementById('res-main').innerHTML = `<div style="color:${data.color || '#ef4444'}">${data.error}</div>`;
-            } else {
-                let mainHTML = '';
-                if(Array.isArray(data.result)) data.result.forEach(r => mainHTML += `<div>${r}</div>`);
-                else mainHTML = `<div>${data.result}</div>`;
-                
-                if(data.matrix) mainHTML += `<div style="margin-top:10px; font-size:0.8em; color:var(--text-dim)">${data.matrix}</div>`;
-                document.getElementById('res-main').innerHTML = mainHTML;
-                
-                // RENDER STEPS
-                let stepsHTML = '';
-                if(data.status) stepsHTML += `<div class="status-box ${data.status_class}">${data.status}</div>`;
-                if(data.steps) data.steps.forEach(s => stepsHTML += `<div class="step-item"><b>${s.title}</b> ${s.desc}</div>`);
-                document.getElementById('res-explain').innerHTML = stepsHTML;
-
-                // RENDER VISUALIZATION (NEW)
-                if(data.images && data.images.length > 0) {
-                    const visPanel = document.getElementById('visual-panel');
-                    const visContainer = document.getElementById('visual-container');
-                    visPanel.style.display = 'flex';
-                    
-                    data.images.forEach(imgData => {
-                        visContainer.innerHTML += `
-                            <img src="data:image/png;base64,${imgData}" class="visual-img" style="margin-bottom:15px;">
-                        `;
-                    });
-                } else if (data.image) {
-                     const visPanel = document.getElementById('visual-panel');
-                     visPanel.style.display = 'flex';
-                     document.getElementById('visual-container').innerHTML = `
-                        <img src="data:image/png;base64,${data.image}" class="visual-img">
-                     `;
-                }
+        return normalizePayload(payload);
+    }
+
+    function renderResult(data) {
+        // Reset Visual Panel
+        document.getElementById('visual-panel').style.display = 'none';
+        document.getElementById('visual-container').innerHTML = '';
+
+        // Render Result
+        if (data.error) {
+            document.getElementById('res-main').innerHTML = `<div style="color:${data.color || '#ef4444'}">${data.error}</div>`;
+        } else {
+            let mainHTML = '';
+            if(Array.isArray(data.result)) data.result.forEach(r => mainHTML += `<div>${r}</div>`);
+            else mainHTML = `<div>${data.result}</div>`;
+            
+            if(data.matrix) mainHTML += `<div style="margin-top:10px; font-size:0.8em; color:var(--text-dim)">${data.matrix}</div>`;
+            document.getElementById('res-main').innerHTML = mainHTML;
+            
+            // RENDER STEPS
+            let stepsHTML = '';
+            if(data.status) stepsHTML += `<div class="status-box ${data.status_class}">${data.status}</div>`;
+            if(data.steps) data.steps.forEach(s => stepsHTML += `<div class="step-item"><b>${s.title}</b> ${s.desc}</div>`);
+            document.getElementById('res-explain').innerHTML = stepsHTML;
+
+            // RENDER VISUALIZATION (NEW)
+            if(data.images && data.images.length > 0) {
+                const visPanel = document.getElementById('visual-panel');
+                const visContainer = document.getElementById('visual-container');
+                visPanel.style.display = 'flex';
+
+                data.images.forEach(imgData => {
+                    visContainer.innerHTML += visualHTML(imgData, data.image_format, 'margin-bottom:15px;', data.image_delivery);
+                });
+            } else if (data.image) {
+                 const visPanel = document.getElementById('visual-panel');
+                 visPanel.style.display = 'flex';
+                 document.getElementById('visual-container').innerHTML = visualHTML(data.image, data.image_format, '', data.image_delivery);
             }
-            MathJax.typesetPromise();
-            btn.innerHTML = "HITUNG SEKARANG";
-        })
-        .catch(err => {
-            btn.innerHTML = "HITUNG SEKARANG";
-            alert("Error: " + err);
-        });
+        }
+        MathJax.typesetPromise();
+    }
+
+    function calculate() {
+        autoCalculate = true;
+        clearTimeout(debounceTimer);
+        const payload = buildPayload();
+        const key = CACHE_VERSION + ':' + JSON.stringify(payload);
+        if (inflight && inflight.key === key) return;  // klik ulang saat request yang sama masih jalan
+
+        const btn = document.querySelector('.btn-calc');
+        const seq = ++requestSeq;
+        btn.innerHTML = "⏳ MEMPROSES...";
+        requestCompute(key, payload)
+            .then(data => {
+                if (seq !== requestSeq) return;  // sudah ada request yang lebih baru
+                renderResult(data);
+                btn.innerHTML = "HITUNG SEKARANG";
+            })
+            .catch(err => {
+                if (err.name === 'AbortError' || seq !== requestSeq) return;
+                btn.innerHTML = "HITUNG SEKARANG";
+                alert("Error: " + err);
+            });
+    }
+
+    // Ketikan/ganti pilihan: hitung ulang setelah input berhenti DEBOUNCE_MS
+    function scheduleCalculate() {
+        if (!autoCalculate) return;
+        clearTimeout(debounceTimer);
+        debounceTimer = setTimeout(calculate, DEBOUNCE_MS);
     }
     
-    document.addEventListener('DOMContentLoaded', () => { updateGeoForm(); MathJax.typesetPromise(); });
+    document.addEventListener('input', e => { if (e.target.matches('input, select')) scheduleCalculate(); });
+    document.addEventListener('DOMContentLoaded', () => { updateGeoForm(); MathJax.typesetPromise(); idbPrune(); });
 </script>
 
 </body>
 </html>
 """
 
+# =======================
+# REGISTRY OPERASI /compute
+# =======================
+# Tiap operasi didaftarkan dengan kunci (module, operation) beserta skema parameternya.
+# Parsing input, pembungkusan langkah, opsi gambar dan metrik waktu ditangani di sini,
+# handler cukup memanggil engine dan menyusun isi respons.
+OPERATIONS = {}
+
+class InputError(ValueError):
+    """Input tidak valid, pesannya dikirim apa adanya ke client"""
+
+class Param:
+    """
+    Skema satu parameter request.
+    kind: 'expr' (angka/ekspresi, lewat parse_input), 'text' (string pilihan), 'json' (struktur mentah)
+    """
+    def __init__(self, name, default=None, kind='expr', choices=None, invalid_msg=None):
+        self.name = name
+        self.default = default
+        self.kind = kind
+        self.choices = choices
+        self.invalid_msg = invalid_msg
+
+    def parse(self, data):
+        raw = data.get(self.name, self.default)
+        if self.kind == 'expr':
+            return parse_input(raw)
+        if self.choices is not None and raw not in self.choices:
+            raise InputError(f"{self.invalid_msg}: {raw}")
+        return raw
+
+class Operation:
+    """
+    isolate: 'always' (selalu di worker pool), 'symbolic' (jika ada input yang bukan
+    literal angka, atau operasi bergambar pada detail 'full'), 'never', atau fungsi predikat(data).
+    timeout dalam detik, None = COMPUTE_TIMEOUT.
+    """
+    def __init__(self, module, name, params, handler, images=False, isolate='symbolic', timeout=None):
+        self.module = module
+        self.name = name
+        self.params = {p.name: p for p in params}
+        self.handler = handler
+        self.images = images
+        self.isolate = isolate
+        self.timeout = timeout
+
+    def needs_worker(self, data):
+        """Literal angka ditangani jalur numerik cepat, cukup dihitung inline"""
+        if callable(self.isolate):
+            return self.isolate(data)
+        if self.isolate != 'symbolic':
+            return self.isolate == 'always'
+        if self.images and data.get('detail', 'full') == 'full':
+            return True
+        return any(not is_numeric_literal(data.get(p.name, p.default))
+                   for p in self.params.values() if p.kind == 'expr')
+
+class RequestParams:
+    """Parameter request yang di-parse sesuai skema saat pertama kali diakses"""
+    def __init__(self, entry, data):
+        self._entry = entry
+        self._data = data
+        self._values = {}
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            t0 = time.perf_counter()
+            value = self._entry.params[name].parse(self._data)
+            trace_phase('parse', time.perf_counter() - t0)
+            self._values[name] = value
+            return value
+
+DETAIL_PARAM = Param('detail', 'full', kind='text', choices=DETAIL_LEVELS, invalid_msg="Level detail tidak valid")
+
+IMAGE_PARAMS = (
+    Param('image_format', 'png', kind='text', choices=IMAGE_FORMATS, invalid_msg="Format gambar tidak valid"),
+    Param('image_delivery', 'inline', kind='text', choices=IMAGE_DELIVERIES, invalid_msg="Mode pengiriman gambar tidak valid"),
+)
+
+def operation(module, name, *params, images=False, isolate=None, timeout=None):
+    """Dekorator: daftarkan handler untuk (module, name)"""
+    def register(handler):
+        all_params = params + (DETAIL_PARAM,) + (IMAGE_PARAMS if images else ())
+        # Operasi bergambar mem-plot pada detail 'full', lihat Operation.needs_worker
+        mode = isolate or 'symbolic'
+        OPERATIONS[(module, name)] = Operation(module, name, all_params, handler, images, mode, timeout)
+        return handler
+    return register
+
+def run_operation(entry, data, serialize=None):
+    """
+    Jalankan satu operasi terdaftar: parse, hitung, bentuk respons, catat waktu.
+    Mengembalikan (body, status_code); jika serialize diberikan (mis. jsonify),
+    body sudah diserialisasi dan waktunya ikut tercatat sebagai fase 'serialize'.
+    """
+    t0 = time.perf_counter()
+    trace = trace_begin()
+    profile_token = PROFILER.begin() if PROFILER is not None else None
+    error_type = None
+    status_code = 200
+    run_s = parse_before = 0.0
+    try:
+        params = RequestParams(entry, data)
+        # Validasi opsi detail & gambar lebih dulu, sebelum hitungan yang mahal
+        with_images = entry.images and wants(params['detail'], 'full')
+        if with_images:
+            image_format, image_delivery = params['image_format'], params['image_delivery']
+        parse_before = trace.phases.get('parse', 0.0)
+        t_run = time.perf_counter()
+        try:
+            if entry.needs_worker(data):
+                body = WORKER_POOL.run(entry, data, trace)
+            else:
+                body = execute_operation(entry, params)
+        finally:
+            run_s = time.perf_counter() - t_run
+        if with_images:
+            if "image" in body:
+                body["image"] = deliver_image(body["image"], image_format, image_delivery)
+            if "images" in body:
+                body["images"] = [deliver_image(img, image_format, image_delivery) for img in body["images"]]
+            body["image_format"] = image_format
+            body["image_delivery"] = image_delivery
+    except PoolSaturated as e:
+        error_type = type(e).__name__
+        status_code = 503
+        body = {"error": str(e), "retry_after": WORKER_RETRY_AFTER, "color": "#ef4444"}
+    except OperationTimeout as e:
+        error_type = type(e).__name__
+        status_code = 504
+        body = {"error": str(e), "color": "#ef4444"}
+    except InputError as e:
+        error_type = type(e).__name__
+        body = {"error": str(e), "color": "#ef4444"}
+    except Exception as e:
+        error_type = e.exc_type if isinstance(e, RemoteError) else type(e).__name__
+        body = {"error": f"Input Error: {str(e)}", "color": "#ef4444"}
+    trace_end()
+    phases = trace.phases
+    # compute = waktu handler dikurangi parse/plot di dalamnya dan antrean worker
+    phases['compute'] = max(run_s - phases.get('queue', 0.0) - phases.get('plot', 0.0)
+                            - (phases.get('parse', 0.0) - parse_before), 0.0)
+    if serialize is not None:
+        t_ser = time.perf_counter()
+        body = serialize(body)
+        phases['serialize'] = time.perf_counter() - t_ser
+    if profile_token is not None:
+        PROFILER.end(profile_token, time.perf_counter() - t0, f"{entry.module}.{entry.name}", trace.samples)
+    record_operation((entry.module, entry.name), time.perf_counter() - t0, error_type, trace)
+    return body, status_code
+
+def execute_operation(entry, params):
+    """Panggil handler; dipakai inline maupun di dalam proses worker"""
+    return entry.handler(params)
+
+def record_operation(key, seconds, error_type=None, trace=None):
+    # Statistik /debug/operations dan histogram /metrics dicatat di bawah satu lock METRICS
+    if trace is None:
+        METRICS.observe(key, seconds, error_type=error_type)
+    else:
+        METRICS.observe(key, seconds, trace.phases, error_type, trace.errors)
+
+# =======================
+# WORKER POOL (ISOLASI KOMPUTASI SIMBOLIK)
+# =======================
+# Ekspresi simbolik yang berat (acos dari ekspresi rumit, invers matriks simbolik)
+# dan plotting dijalankan di ProcessPoolExecutor terbatas, bukan di thread request.
+# Tiap operasi punya deadline; request baru langsung dilayani pool baru, sedangkan pool
+# lama (berisi worker yang macet) dihentikan setelah tugas lain di dalamnya selesai.
+# KALKULATOR_WORKERS=0 mematikan pool (semua dihitung inline, tanpa deadline).
+WORKER_PROCESSES = int(os.environ.get('KALKULATOR_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Antrean minimal 32 agar lonjakan kecil di mesin 1-2 core tidak langsung dibalas 503
+WORKER_MAX_PENDING = int(os.environ.get('KALKULATOR_WORKER_MAX_PENDING', str(max(WORKER_PROCESSES * 4, 32))))
+WORKER_RETRY_AFTER = int(os.environ.get('KALKULATOR_WORKER_RETRY_AFTER', '1'))
+COMPUTE_TIMEOUT = float(os.environ.get('KALKULATOR_COMPUTE_TIMEOUT', '10'))
+
+class PoolSaturated(RuntimeError):
+    """Semua slot worker terpakai; client diminta mencoba lagi (HTTP 503)"""
+
+class OperationTimeout(RuntimeError):
+    """Perhitungan melewati deadline operasi (HTTP 504)"""
+
+class RemoteError(Exception):
+    """Exception dari proses worker, pesannya diteruskan apa adanya"""
+    def __init__(self, message, exc_type='Exception'):
+        super().__init__(message)
+        self.exc_type = exc_type
+
+def is_numeric_literal(raw):
+    if isinstance(raw, bool):
+        return False
+    if isinstance(raw, (int, float)):
+        return True
+    return isinstance(raw, str) and NUMERIC_LITERAL.match(raw.strip()) is not None
+
+def _worker_init():
+    """Hangatkan import berat sekali per proses worker"""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    lazy_import('sympy')
+    lazy_import('numpy')
+    load_matplotlib()
+
+def _worker_execute(module, name, data):
+    """
+    Dijalankan di proses worker. Exception dikembalikan sebagai nilai
+    karena tidak semua exception sympy bisa di-pickle. Waktu fase dan error
+    yang ditangani ikut dikirim balik supaya tercatat di METRICS proses utama.
+    """
+    entry = OPERATIONS[(module, name)]
+    trace = trace_begin()
+    profile_token = PROFILER.begin() if PROFILER is not None else None
+    t0 = time.perf_counter()
+    try:
+        result = 'ok', execute_operation(entry, RequestParams(entry, data)), None
+    except InputError as e:
+        result = 'input_error', str(e), type(e).__name__
+    except Exception as e:
+        result = 'error', str(e), type(e).__name__
+    finally:
+        trace_end()
+    trace.phases['handler'] = time.perf_counter() - t0
+    samples = PROFILER.collect(profile_token) if profile_token is not None else None
+    return result + (trace.phases, trace.errors, samples)
+
+class WorkerPool:
+    def __init__(self, processes, max_pending):
+        self.processes = processes
+        self.enabled = processes > 0
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._executor = None
+        self._lock = threading.Lock()
+        self._futures = {}  # future yang sedang ditunggu -> executor-nya
+        self.restarts = 0
+        self.in_flight = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.enabled:
+                try:
+                    self._executor = ProcessPoolExecutor(
+                        self.processes,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_worker_init)
+                except (OSError, NotImplementedError) as e:
+                    # Mis. serverless tanpa /dev/shm: semaphore multiprocessing tidak tersedia
+                    logging.getLogger(__name__).warning("Worker pool tidak tersedia, hitung inline: %s", e)
+                    self.enabled = False
+            return self._executor
+
+    def _restart(self, executor, stuck=None):
+        """
+        Pensiunkan executor: request berikutnya memakai pool baru. Tugas yang belum mulai
+        dibatalkan; tugas lain yang sedang jalan dibiarkan selesai (paling lama
+        COMPUTE_TIMEOUT) sebelum semua prosesnya dihentikan, termasuk worker `stuck`.
+        Future yang macet tidak bisa di-cancel, dan ProcessPoolExecutor tidak bisa
+        membunuh satu worker tanpa merusak pool, jadi hanya tugas yang macet yang hilang.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return  # sudah dipensiunkan request lain, yang juga menghentikannya
+            self._executor = None
+            self.restarts += 1
+            others = [f for f, ex in self._futures.items() if ex is executor and f is not stuck]
+        # shutdown() melepas referensi ke proses, jadi diambil lebih dulu
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        if stuck is None or not others:
+            self._terminate(processes)
+            return
+
+        def drain():
+            futures_wait(others, timeout=COMPUTE_TIMEOUT)
+            self._terminate(processes)
+
+        threading.Thread(target=drain, name="worker-pool-drain", daemon=True).start()
+
+    @staticmethod
+    def _terminate(processes):
+        for proc in processes:
+            if proc.is_alive():
+                proc.terminate()
+
+    def run(self, entry, data, trace=None):
+        """
+        Hitung di worker dengan deadline entry.timeout (default COMPUTE_TIMEOUT).
+        Fase dari worker digabung ke trace; selisih waktu tunggu dan waktu handler
+        di worker dicatat sebagai fase 'queue' (antrean + IPC).
+        """
+        if not self.enabled:
+            return execute_operation(entry, RequestParams(entry, data))
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated("Server sedang sibuk, coba lagi sebentar")
+        with self._lock:
+            self.in_flight += 1
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return execute_operation(entry, RequestParams(entry, data))
+            timeout = entry.timeout or COMPUTE_TIMEOUT
+            t0 = time.perf_counter()
+            future = None
+            try:
+                future = executor.submit(_worker_execute, entry.module, entry.name, data)
+                with self._lock:
+                    self._futures[future] = executor
+                status, payload, exc_type, phases, errors, samples = future.result(timeout=timeout)
+            except FutureTimeout:
+                if not future.cancel():
+                    self._restart(executor, stuck=future)
+                raise OperationTimeout(f"Perhitungan melebihi batas waktu {timeout:g} detik")
+            except CancelledError:
+                # Masih antre di pool yang dipensiunkan request lain
+                raise PoolSaturated("Worker sedang dimulai ulang, coba lagi sebentar")
+            except (BrokenProcessPool, RuntimeError):
+                # Pool rusak/sudah dipensiunkan: buat ulang di request berikutnya
+                self._restart(executor)
+                raise PoolSaturated("Worker sedang dimulai ulang, coba lagi sebentar")
+            finally:
+                if future is not None:
+                    with self._lock:
+                        self._futures.pop(future, None)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+        if trace is not None:
+            handler_s = phases.pop('handler', 0.0)
+            trace.merge(phases, errors)
+            trace.samples = samples
+            trace.phases['queue'] = max(time.perf_counter() - t0 - handler_s, 0.0)
+        if status == 'ok':
+            return payload
+        if status == 'input_error':
+            raise InputError(payload)
+        raise RemoteError(payload, exc_type)
+
+    def warm(self):
+        """Mulai proses worker sekarang, bukan saat request simbolik pertama"""
+        executor = self._get_executor()
+        if executor is not None:
+            executor.submit(int).result()
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        return {"enabled": self.enabled, "processes": self.processes, "restarts": self.restarts,
+                "in_flight": self.in_flight, "timeout_s": COMPUTE_TIMEOUT}
+
+WORKER_POOL = WorkerPool(WORKER_PROCESSES, WORKER_MAX_PENDING)
+
+# =======================
+# SINGLE-FLIGHT & CACHE RESPONS /compute
+# =======================
+# Saat kelas mengirim payload yang sama dalam detik yang sama, hanya satu yang
+# benar-benar dihitung: request identik yang datang bersamaan menunggu hasil
+# request pertama, dan respons JSON utuh (termasuk gambar) disimpan sebentar
+# (KALKULATOR_RESPONSE_CACHE_TTL detik, 0 = tanpa cache; single-flight tetap jalan).
+RESPONSE_CACHE_TTL = float(os.environ.get('KALKULATOR_RESPONSE_CACHE_TTL', '5'))
+RESPONSE_CACHE_BYTES = int(os.environ.get('KALKULATOR_RESPONSE_CACHE_BYTES', str(32 * 1024 * 1024)))
+
+RESPONSE_CACHE = shared_cache('response', maxsize=4096, maxbytes=RESPONSE_CACHE_BYTES, ttl=RESPONSE_CACHE_TTL)
+
+# String JSON yang berisi PNG base64 (signature PNG = 'iVBORw0KGgo' dalam base64)
+_PNG_B64 = re.compile(rb'"(iVBORw0KGgo[A-Za-z0-9+/]*={0,2})"')
+
+def pack_response(status, body):
+    """
+    Respons JSON -> bytes untuk cache. PNG base64 di dalamnya disimpan sebagai bytes
+    mentah (~25% lebih kecil): baris header [status, panjang potongan teks, panjang PNG],
+    lalu potongan teks, lalu PNG. unpack_response menyusun ulang body yang identik.
+    """
+    parts, blobs, pos = [], [], 0
+    for m in _PNG_B64.finditer(body):
+        encoded = m.group(1)
+        try:
+            raw = base64.b64decode(encoded, validate=True)
+        except ValueError:
+            continue
+        if base64.b64encode(raw) != encoded:
+            continue  # bukan hasil encoder kita, simpan sebagai teks
+        parts.append(body[pos:m.start(1)])
+        blobs.append(raw)
+        pos = m.end(1)
+    parts.append(body[pos:])
+    header = json.dumps([status, [len(p) for p in parts], [len(b) for b in blobs]], separators=(',', ':'))
+    return b"".join([header.encode(), b"\n"] + parts + blobs)
+
+def unpack_response(blob):
+    end = blob.index(b"\n")
+    status, part_lens, blob_lens = json.loads(blob[:end])
+    pos = end + 1
+    parts = []
+    for n in part_lens:
+        parts.append(blob[pos:pos + n])
+        pos += n
+    out = [parts[0]]
+    for n, part in zip(blob_lens, parts[1:]):
+        out.append(base64.b64encode(blob[pos:pos + n]))
+        out.append(part)
+        pos += n
+    return status, b"".join(out)
+
+class SingleFlight:
+    """Satu komputasi per key; pemanggil lain dengan key sama menunggu hasilnya"""
+    class _Flight:
+        __slots__ = ('done', 'result')
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key, fn, timeout=None):
+        """Kembalikan (hasil, dibagi); jika pemimpin gagal/terlalu lama, hitung sendiri"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = SingleFlight._Flight()
+        if not leader:
+            if flight.done.wait(timeout) and flight.result is not None:
+                with self._lock:
+                    self.coalesced += 1
+                return flight.result, True
+            return fn(), False
+        try:
+            flight.result = fn()
+            return flight.result, False
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._flights), "coalesced": self.coalesced}
+
+COMPUTE_FLIGHTS = SingleFlight()
+
+def canonical_value(param, raw):
+    """
+    Nilai kanonik satu parameter untuk key: literal angka di-parse ('2.50' = '2.5'),
+    ekspresi simbolik memakai teksnya (parse simbolik hanya boleh di worker), json di-dump terurut.
+    """
+    if param.kind == 'expr':
+        if is_numeric_literal(raw):
+            value = parse_input(raw)
+            return f"{type(value).__name__}:{value}"
+        return raw.strip() if isinstance(raw, str) else raw
+    if param.kind == 'json':
+        return json.dumps(raw, sort_keys=True, separators=(',', ':'), default=str)
+    return raw
+
+def compute_key(entry, data):
+    """Hash kanonik (module, operation, parameter); None jika input tidak bisa dikanonikkan"""
+    try:
+        canon = [entry.module, entry.name]
+        for name in sorted(entry.params):
+            param = entry.params[name]
+            canon.append([name, canonical_value(param, data.get(name, param.default))])
+        return hashlib.sha256(json.dumps(canon, separators=(',', ':'), default=str).encode()).hexdigest()
+    except Exception:
+        return None
+
+def compute_response(entry, data, key):
+    """Hitung + serialisasi satu /compute; respons sukses disimpan di RESPONSE_CACHE"""
+    body, status_code = run_operation(entry, data, lambda b: jsonify(b).get_data())
+    if RESPONSE_CACHE_TTL > 0 and status_code == 200:
+        RESPONSE_CACHE.set(key, pack_response(status_code, body))
+    return status_code, body
+
+def numbered_steps(step_list):
+    return [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
+
+def point_response(res, step_list, status, mat=None, detail='full'):
+    """Respons standar transformasi titik geo, isinya menurut level detail"""
+    if detail == 'none':
+        return {"values": [plain_value(res[0]), plain_value(res[1])]}
+    body = {
+        "result": f"P'({fnum(res[0])}, {fnum(res[1])})",
+        "status": status,
+        "status_class": "success"
+    }
+    if wants(detail, 'steps'):
+        body["steps"] = numbered_steps(step_list)
+    if mat is not None and wants(detail, 'full'):
+        body["matrix"] = f"Matriks: {sp.latex(mat)}"
+    return body
+
+GEO_POINT = (Param('px', '0'), Param('py', '0'))
+
+@operation('geo', 'translasi', *GEO_POINT, Param('tx', '0'), Param('ty', '0'))
+def op_translasi(p):
+    res, step_list = GeoEngine.translasi((p['px'], p['py']), (p['tx'], p['ty']), p['detail'])
+    return point_response(res, step_list, "✓ Translasi selesai", detail=p['detail'])
+
+@operation('geo', 'translasi_homogen', *GEO_POINT, Param('tx', '0'), Param('ty', '0'))
+def op_translasi_homogen(p):
+    res, step_list, mat = GeoEngine.translasi_homogen((p['px'], p['py']), (p['tx'], p['ty']), p['detail'])
+    return point_response(res, step_list, "✓ Translasi Homogen selesai", mat, p['detail'])
+
+@operation('geo', 'refleksi', *GEO_POINT, Param('mode', 'x', kind='text'))
+def op_refleksi(p):
+    res, step_list, mat = GeoEngine.refleksi((p['px'], p['py']), p['mode'], p['detail'])
+    return point_response(res, step_list, "✓ Refleksi selesai", mat, p['detail'])
+
+@operation('geo', 'rotasi', *GEO_POINT, Param('angle', '90'), Param('cx', '0'), Param('cy', '0'))
+def op_rotasi(p):
+    res, step_list, mat = GeoEngine.rotasi((p['px'], p['py']), p['angle'], (p['cx'], p['cy']), p['detail'])
+    return point_response(res, step_list, "✓ Rotasi selesai", mat, p['detail'])
+
+@operation('geo', 'dilatasi', *GEO_POINT, Param('factor', '2'), Param('dcx', '0'), Param('dcy', '0'))
+def op_dilatasi(p):
+    res, step_list, mat = GeoEngine.dilatasi((p['px'], p['py']), p['factor'], (p['dcx'], p['dcy']), p['detail'])
+    return point_response(res, step_list, "✓ Dilatasi selesai", mat, p['detail'])
+
+@operation('geo', 'invers', Param('inv_type', 'rot', kind='text'), Param('param', '90'))
+def op_invers(p):
+    detail = p['detail']
+    mat_inv, step_list = GeoEngine.invers_transformasi(p['inv_type'], p['param'], detail)
+    if mat_inv is None:
+        body = {"error": "Matriks singular"}
+        if wants(detail, 'steps'):
+            body["steps"] = numbered_steps(step_list)
+        return body
+    if detail == 'none':
+        return {"values": [[plain_value(v) for v in row] for row in mat_inv.tolist()]}
+    # Matriks invers adalah hasilnya sendiri, jadi ikut sejak level 'result'
+    body = {
+        "result": "Invers Matriks Ditemukan",
+        "matrix": f"$$M^{{-1}} = {sp.latex(mat_inv)}$$",
+        "status": "✓ Perhitungan sukses",
+        "status_class": "success"
+    }
+    if wants(detail, 'steps'):
+        body["steps"] = numbered_steps(step_list)
+    return body
+
+def pipeline_needs_worker(data):
+    values = [data.get('px', '0'), data.get('py', '0')]
+    steps = data.get('steps')
+    if isinstance(steps, list):
+        for step in steps:
+            if isinstance(step, dict):
+                values += [v for k, v in step.items() if k not in ('operation', 'mode')]
+    return not all(is_numeric_literal(v) for v in values)
+
+@operation('geo', 'pipeline', *GEO_POINT, Param('steps', [], kind='json'), isolate=pipeline_needs_worker)
+def op_pipeline(p):
+    spec = parse_pipeline(p['steps'])
+    res, step_list, mat = GeoEngine.pipeline((p['px'], p['py']), spec, p['detail'])
+    return point_response(res, step_list, f"✓ Pipeline {len(spec)} transformasi selesai", mat, p['detail'])
+
+def solution_response(detail, values, result, steps, status, status_class="success", **media):
+    """
+    Respons trig menurut level detail. result berupa callable agar teks hasil
+    (fnum) tidak disusun pada level 'none'; media (image/images) hanya pada 'full'.
+    """
+    if detail == 'none':
+        return {"values": [plain_value(v) for v in values]}
+    body = {"result": result(), "status": status, "status_class": status_class}
+    if wants(detail, 'steps'):
+        body["steps"] = steps
+    if wants(detail, 'full'):
+        body.update(media)
+    return body
+
+@operation('trig', 'aturan_sinus', Param('b', '5'), Param('A', '30'), Param('B', '45'), images=True)
+def op_aturan_sinus(p):
+    b, A, B = p['b'], p['A'], p['B']
+    detail = p['detail']
+
+    rad_A = to_rad(A)
+    rad_B = to_rad(B)
+    a = (b * sp.sin(rad_A)) / sp.sin(rad_B)
+
+    img = None
+    if wants(detail, 'full'):
+        # Hitung C untuk visualisasi
+        C_angle = 180 - float(A) - float(B)
+        c_side = (b * sp.sin(to_rad(C_angle))) / sp.sin(rad_B)
+        img = Plotter.create_triangle_image(a, b, c_side, float(A), float(B), C_angle, image_format=p['image_format'])
+
+    steps = None
+    if wants(detail, 'steps'):
+        steps = [
+            {"title": "Rumus", "desc": "a/sin A = b/sin B"},
+            {"title": "Substitusi", "desc": f"a = {b} × sin({A}) / sin({B})"},
+            {"title": "Hasil", "desc": f"a = {fnum(a)}"}
+        ]
+    return solution_response(detail, [a], lambda: f"Sisi a = {fnum(a)}", steps, "✓ Sisi a ditemukan", image=img)
+
+@operation('trig', 'aturan_sinus_ambigu', Param('a', '5'), Param('b', '7'), Param('A', '30'), images=True)
+def op_aturan_sinus_ambigu(p):
+    detail = p['detail']
+    res_list, step_list, status, images = TrigEngine.aturan_sinus_ambigu(p['a'], p['b'], p['A'], p['image_format'], detail)
+    steps = [{"title": f"Analisis", "desc": s} for s in step_list]
+
+    def result():
+        if not res_list:
+            return ["Tidak ada solusi"]
+        return [f"Sudut B{i+1} = {fnum(ang)}°" for i, ang in enumerate(res_list)]
+
+    return solution_response(detail, res_list, result, steps, status,
+                             "warning" if "Ambigu" in status else "success", images=images)
+
+@operation('trig', 'aturan_cosinus', Param('cari', 'sisi', kind='text'),
+           Param('a', '5'), Param('b', '6'), Param('C', '60'), Param('c', '7'), images=True)
+def op_aturan_cosinus(p):
+    detail = p['detail']
+    if p['cari'] == 'sisi':
+        res, step_list, img = TrigEngine.aturan_cosinus(a=p['a'], b=p['b'], angle_C=p['C'], image_format=p['image_format'], detail=detail)
+        result, status = (lambda: f"Sisi c = {fnum(res)}"), "✓ Sisi c ditemukan"
+    else:
+        res, step_list, img = TrigEngine.aturan_cosinus(a=p['a'], b=p['b'], c=p['c'], image_format=p['image_format'], detail=detail)
+        result, status = (lambda: f"Sudut C = {fnum(res)}°"), "✓ Sudut C ditemukan"
+    return solution_response(detail, [res], result, numbered_steps(step_list), status, image=img)
+
+@operation('trig', 'luas_segitiga', Param('a', '5'), Param('b', '6'), Param('C', '30'), images=True)
+def op_luas_segitiga(p):
+    detail = p['detail']
+    res, step_list, img = TrigEngine.luas_segitiga(p['a'], p['b'], p['C'], p['image_format'], detail)
+    return solution_response(detail, [res], lambda: f"Luas = {fnum(res)} satuan²", numbered_steps(step_list),
+                             "✓ Luas segitiga dihitung", image=img)
+
 # =======================
 # ROUTES
 # =======================
+class StaticPage:
+    """
+    Halaman statis yang dirender sekali saat startup, lalu disimpan dalam versi
+    identity/gzip/brotli dengan ETag kuat per encoding.
+    """
+    def __init__(self, html, max_age=300):
+        body = html.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.max_age = max_age
+        self.variants = {'identity': (body, digest)}
+        self.variants['gzip'] = (gzip.compress(body, 9), f"{digest}-gz")
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(body, quality=11), f"{digest}-br")
+
+    def choose_encoding(self, accept_encodings):
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, req):
+        encoding = self.choose_encoding(req.accept_encodings)
+        body, etag = self.variants[encoding]
+        if any(tag in req.if_none_match for _, tag in self.variants.values()):
+            resp = Response(status=304)
+        else:
+            resp = Response(body, mimetype='text/html')
+            if encoding != 'identity':
+                resp.headers['Content-Encoding'] = encoding
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = f'public, max-age={self.max_age}'
+        resp.headers['Vary'] = 'Accept-Encoding'
+        return resp
+
+def source_version():
+    """Versi kode server (hash file ini), dipakai browser untuk membuang cache respons lama"""
+    try:
+        with open(__file__, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    except OSError:
+        return str(int(time.time()))
+
+with app.app_context():
+    INDEX_PAGE = StaticPage(render_template_string(HTML_TEMPLATE, cache_version=source_version()))
+
 @app.route("/")
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return INDEX_PAGE.response(request)
+
+def json_object_body():
+    """Body JSON request sebagai dict, atau None jika bukan JSON object (null, list, rusak)"""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else None
+
+def invalid_body(message="Body request harus JSON object"):
+    return jsonify({"error": message, "color": "#ef4444"}), 400
 
 @app.route("/compute", methods=["POST"])
 def compute():
-    data = request.json
-    mod = data.get('module')
-    op = data.get('operation')
-    
+    if request.mimetype == NDJSON_MIMETYPE:
+        return stream_compute()
+    data = json_object_body()
+    if data is None:
+        return invalid_body()
+    entry = OPERATIONS.get((data.get('module'), data.get('operation')))
+    if entry is None:
+        return jsonify({"error": "Operasi tidak valid"})
+    key = compute_key(entry, data)
+    if key is None:
+        resp, status_code = run_operation(entry, data, jsonify)
+        source = 'miss'
+    else:
+        cached = RESPONSE_CACHE.get(key) if RESPONSE_CACHE_TTL > 0 else None
+        if cached is not None:
+            (status_code, body), source = unpack_response(cached), 'hit'
+        else:
+            (status_code, body), shared = COMPUTE_FLIGHTS.do(
+                key, lambda: compute_response(entry, data, key), (entry.timeout or COMPUTE_TIMEOUT) + 1)
+            source = 'coalesced' if shared else 'miss'
+        resp = Response(body, mimetype='application/json')
+    resp.status_code = status_code
+    resp.headers['X-Kalkulator-Cache'] = source
+    if status_code == 503:
+        resp.headers['Retry-After'] = str(WORKER_RETRY_AFTER)
+    return resp
+
+def deliver_image(img, image_format, image_delivery):
+    """
+    Mode 'url': simpan bytes gambar di PLOT_STORE (content-addressed) dan
+    kembalikan URL /plot/<hash>.<ext> sebagai ganti base64/SVG inline.
+    """
+    if image_delivery != 'url' or img is None or image_format not in IMAGE_MIMETYPES:
+        return img
+    raw = Plotter._decode_image(img, image_format)
+    plot_id = hashlib.sha256(raw).hexdigest()[:32]
+    PLOT_STORE.set(f"{plot_id}.{image_format}", raw)
+    return f"/plot/{plot_id}.{image_format}"
+
+@app.route("/plot/<plot_id>.<ext>")
+def plot_image(plot_id, ext):
+    if ext not in IMAGE_MIMETYPES or not re.fullmatch(r'[0-9a-f]{32}', plot_id):
+        abort(404)
+    # Isi gambar ditentukan oleh hash-nya, jadi ETag cocok = client sudah punya bytes yang sama
+    if plot_id in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        raw = PLOT_STORE.get(f"{plot_id}.{ext}")
+        if raw is None:
+            abort(404)
+        resp = Response(raw, mimetype=IMAGE_MIMETYPES[ext])
+    resp.set_etag(plot_id)
+    resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return resp
+
+@app.route("/debug/imports")
+def import_stats():
+    """
+    Laporan waktu import: durasi lazy import per modul, waktu load app1 sendiri,
+    dan modul berat mana yang sudah ter-load. ?importtime=<modul> (butuh
+    KALKULATOR_DEBUG=1) menjalankan 'python -X importtime' di subprocess baru.
+    """
+    report = {
+        "module_load_ms": STARTUP_MS,
+        "lazy_imports_ms": IMPORT_TIMINGS,
+        "loaded": {name: name in sys.modules for name in ('sympy', 'numpy', 'matplotlib')}
+    }
+    target = request.args.get('importtime')
+    if target:
+        if os.environ.get('KALKULATOR_DEBUG') != '1':
+            abort(404)
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_.]*', target):
+            abort(400)
+        report["importtime"] = run_importtime(target)
+    return jsonify(report)
+
+def run_importtime(module, top=25):
+    """Jalankan 'python -X importtime -c import <module>' dan ambil modul dengan waktu kumulatif terbesar"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, timeout=120)
+    rows = []
+    for line in proc.stderr.splitlines():
+        # Format: "import time:  self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if not line.startswith('import time:') or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        rows.append({
+            "module": parts[2].strip(),
+            "self_ms": round(int(parts[0].split(':')[1]) / 1000, 2),
+            "cumulative_ms": round(int(parts[1]) / 1000, 2)
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+@app.route("/debug/operations")
+def operation_stats():
+    return jsonify({f"{mod}.{op}": stats for (mod, op), stats in METRICS.operation_stats().items()})
+
+# URL tanpa route (404) tidak punya endpoint; dikelompokkan jadi satu label
+@app.before_request
+def metrics_enter():
+    METRICS.enter(request.endpoint or 'unmatched')
+
+@app.teardown_request
+def metrics_leave(exc):
+    METRICS.leave(request.endpoint or 'unmatched')
+
+@app.route("/metrics")
+def metrics():
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route("/debug/profiles")
+@app.route("/debug/profiles/<int:record_id>")
+def profiles(record_id=None):
+    """
+    Daftar profil request lambat (butuh KALKULATOR_PROFILE=1), atau satu profil:
+    ?format=collapsed (default, teks) atau ?format=speedscope (JSON).
+    """
+    if PROFILER is None:
+        return jsonify({"enabled": False})
+    if record_id is None:
+        return jsonify({"enabled": True, "threshold_ms": PROFILE_THRESHOLD_MS, "interval_ms": PROFILE_INTERVAL_MS,
+                        "rate": PROFILE_RATE, "profiles": PROFILER.summary()})
+    record = PROFILER.get(record_id)
+    if record is None:
+        abort(404)
+    if request.args.get('format', 'collapsed') == 'speedscope':
+        resp = jsonify(profile_speedscope(record))
+        resp.headers['Content-Disposition'] = f'attachment; filename="kalkulator-{record_id}.speedscope.json"'
+        return resp
+    return Response(profile_collapsed(record), mimetype='text/plain')
+
+@app.route("/debug/workers")
+def worker_stats():
+    return jsonify(WORKER_POOL.stats())
+
+@app.route("/debug/cache")
+def cache_stats():
+    stats = {name: cache.stats() for name, cache in CACHE_REGISTRY.items()}
+    stats["single_flight"] = COMPUTE_FLIGHTS.stats()
+    return jsonify(stats)
+
+# =======================
+# BATCH (BANYAK TITIK / SEGITIGA SEKALIGUS)
+# =======================
+BATCH_MAX_POINTS = 10_000_000
+PIPELINE_MAX_STEPS = 64
+
+def parse_pipeline(steps):
+    """
+    Ubah daftar langkah pipeline, mis. [{"operation": "rotasi", "angle": "90", "cx": "1"}, ...]
+    (parameter sama dengan /compute) jadi spec tuple yang hashable untuk GeoEngine.compile_pipeline.
+    """
+    if not isinstance(steps, list) or not steps:
+        raise InputError("Pipeline butuh daftar langkah")
+    if len(steps) > PIPELINE_MAX_STEPS:
+        raise InputError(f"Maksimal {PIPELINE_MAX_STEPS} langkah per pipeline")
+    spec = []
+    for i, step in enumerate(steps, 1):
+        if not isinstance(step, dict):
+            raise InputError(f"Langkah pipeline ke-{i} harus berupa object, mis. {{\"operation\": \"rotasi\"}}")
+        try:
+            spec.append(pipeline_step(step))
+        except ValueError as e:
+            # Termasuk error parse_input: semua dilaporkan sebagai InputError beserta nomor langkahnya
+            raise InputError(f"Langkah pipeline ke-{i}: {e}") from None
+    return tuple(spec)
+
+def pipeline_step(step):
+    zero = sp.Integer(0)
+    op = step.get('operation')
+    if op in ('translasi', 'translasi_homogen'):
+        return ('trans', None, parse_input(step.get('tx', '0')), parse_input(step.get('ty', '0')), zero, zero)
+    if op == 'refleksi':
+        return (step.get('mode', 'x'), None, zero, zero, zero, zero)
+    if op == 'rotasi':
+        return ('rot', parse_input(step.get('angle', '90')), zero, zero,
+                parse_input(step.get('cx', '0')), parse_input(step.get('cy', '0')))
+    if op == 'dilatasi':
+        return ('dil', parse_input(step.get('factor', '2')), zero, zero,
+                parse_input(step.get('dcx', '0')), parse_input(step.get('dcy', '0')))
+    raise InputError(f"Operasi pipeline tidak dikenal: {op}")
+
+def geo_batch_matrix(op, data):
+    """Matriks homogen 3x3 (float) untuk operasi geo, parameter sama dengan /compute"""
+    if op == 'pipeline':
+        return GeoEngine.compile_pipeline(parse_pipeline(data.get('steps', [])))[1]
+    if op in ('translasi', 'translasi_homogen'):
+        tx = parse_input(data.get('tx', '0'))
+        ty = parse_input(data.get('ty', '0'))
+        return GeoEngine.get_matrix_homogen_3x3_numeric('trans', tx=float(tx), ty=float(ty))
+    if op == 'refleksi':
+        return GeoEngine.get_matrix_homogen_3x3_numeric(data.get('mode', 'x'))
+    if op == 'rotasi':
+        angle = parse_input(data.get('angle', '90'))
+        cx = parse_input(data.get('cx', '0'))
+        cy = parse_input(data.get('cy', '0'))
+        return GeoEngine.get_matrix_homogen_3x3_numeric('rot', float(angle), center=(float(cx), float(cy)))
+    if op == 'dilatasi':
+        factor = parse_input(data.get('factor', '2'))
+        dcx = parse_input(data.get('dcx', '0'))
+        dcy = parse_input(data.get('dcy', '0'))
+        return GeoEngine.get_matrix_homogen_3x3_numeric('dil', float(factor), center=(float(dcx), float(dcy)))
+    return None
+
+def decode_float64_b64(text, name):
+    """Base64 buffer float64 little-endian -> array 1D; input rusak jadi InputError"""
+    try:
+        return np.frombuffer(base64.b64decode(text, validate=True), dtype='<f8')
+    except (TypeError, ValueError):  # binascii.Error turunan ValueError
+        raise InputError(f"'{name}' harus base64 dari buffer float64 (kelipatan 8 byte)")
+
+def decode_points(data):
+    """
+    Titik bisa dikirim sebagai 'points' ([[x, y], ...]) atau
+    'points_b64' (base64 buffer float64 little-endian, urutan x0,y0,x1,y1,...).
+    """
+    if data.get('points_b64') is not None:
+        pts = decode_float64_b64(data['points_b64'], 'points_b64')
+        if pts.size % 2:
+            raise ValueError("Buffer titik harus berisi pasangan (x, y)")
+        pts = pts.reshape(-1, 2)
+    else:
+        pts = np.asarray(data.get('points', []), dtype=np.float64)
+        if pts.size == 0:
+            pts = pts.reshape(0, 2)
+        if pts.ndim != 2 or pts.shape[1] != 2:
+            raise ValueError("Format titik harus [[x, y], ...]")
+    if len(pts) > BATCH_MAX_POINTS:
+        raise ValueError(f"Maksimal {BATCH_MAX_POINTS} titik per request")
+    return pts
+
+def encode_points(pts, fmt):
+    if fmt == 'base64':
+        buf = np.ascontiguousarray(pts, dtype='<f8').tobytes()
+        return {"points_b64": base64.b64encode(buf).decode('ascii'), "dtype": "float64", "shape": list(pts.shape)}
+    if fmt == 'text':
+        # Teks tampilan (fnum) untuk seluruh array sekaligus
+        flat = fnum_array(pts)
+        return {"points": [flat[i:i + 2] for i in range(0, len(flat), 2)]}
+    return {"points": json_floats(pts)}
+
+# Kolom input per operasi trig (nama parameter sama dengan /compute)
+TRIG_BATCH_COLUMNS = {
+    'luas_segitiga': ('a', 'b', 'C'),
+    'aturan_cosinus:sisi': ('a', 'b', 'C'),
+    'aturan_cosinus:sudut': ('a', 'b', 'c'),
+    'aturan_sinus_ambigu': ('a', 'b', 'A'),
+}
+BATCH_MAX_TRIANGLES = 1_000_000
+BATCH_MAX_PLOTS = int(os.environ.get('KALKULATOR_BATCH_MAX_PLOTS', '50'))
+
+def decode_column(data, name):
+    """
+    Kolom bisa dikirim sebagai angka tunggal (di-broadcast), list angka,
+    atau '<nama>_b64' (base64 buffer float64 little-endian).
+    """
+    if data.get(f'{name}_b64') is not None:
+        return decode_float64_b64(data[f'{name}_b64'], f'{name}_b64')
+    raw = data.get(name)
+    if raw is None:
+        raise ValueError(f"Kolom '{name}' wajib diisi")
+    try:
+        col = np.asarray(raw, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Kolom '{name}' harus berisi angka")
+    if col.ndim > 1:
+        raise ValueError(f"Kolom '{name}' harus satu dimensi")
+    return col
+
+def encode_columns(columns, fmt):
+    if fmt == 'base64':
+        encoded, dtypes = {}, {}
+        for name, col in columns.items():
+            dtype = '<f8' if col.dtype.kind == 'f' else ('|b1' if col.dtype.kind == 'b' else '<i1')
+            encoded[name] = base64.b64encode(np.ascontiguousarray(col, dtype=dtype).tobytes()).decode('ascii')
+            dtypes[name] = np.dtype(dtype).name
+        return {"columns_b64": encoded, "dtypes": dtypes}
+    if fmt == 'text':
+        return {"columns": {name: fnum_array(col) if col.dtype.kind == 'f' else col.tolist()
+                            for name, col in columns.items()}}
+    return {"columns": {name: column_values(col) for name, col in columns.items()}}
+
+def column_values(col):
+    if col.dtype.kind == 'f':
+        return json_floats(col)
+    return col.tolist()
+
+def json_floats(arr):
+    """Array float -> list (bersarang) untuk JSON; NaN/±inf bukan JSON yang valid, jadi null"""
+    finite = np.isfinite(arr)
+    if finite.all():
+        return arr.tolist()
+    out = arr.astype(object)
+    out[~finite] = None
+    return out.tolist()
+
+def trig_batch_key(op, data):
+    """Kunci TRIG_BATCH_COLUMNS; aturan_cosinus dibedakan lewat 'cari'"""
+    if op == 'aturan_cosinus':
+        return f"{op}:{data.get('cari', 'sisi')}"
+    return op
+
+def solve_trig_batch(key, inputs):
+    if key == 'luas_segitiga':
+        return TrigEngine.luas_segitiga_batch(inputs['a'], inputs['b'], inputs['C'])
+    if key == 'aturan_cosinus:sisi':
+        return TrigEngine.aturan_cosinus_batch(inputs['a'], inputs['b'], C=inputs['C'])
+    if key == 'aturan_cosinus:sudut':
+        return TrigEngine.aturan_cosinus_batch(inputs['a'], inputs['b'], c=inputs['c'])
+    return TrigEngine.aturan_sinus_ambigu_batch(inputs['a'], inputs['b'], inputs['A'])
+
+def trig_batch(op, data):
+    """Selesaikan banyak segitiga sekaligus; kembalikan (key, inputs, columns) atau None"""
+    key = trig_batch_key(op, data)
+    names = TRIG_BATCH_COLUMNS.get(key)
+    if names is None:
+        return None
+    try:
+        inputs = dict(zip(names, np.broadcast_arrays(*(np.atleast_1d(decode_column(data, n)) for n in names))))
+    except ValueError as e:
+        if 'broadcast' in str(e):
+            raise ValueError("Panjang kolom input harus sama")
+        raise
+    if len(inputs[names[0]]) > BATCH_MAX_TRIANGLES:
+        raise ValueError(f"Maksimal {BATCH_MAX_TRIANGLES} segitiga per request")
+    return key, inputs, solve_trig_batch(key, inputs)
+
+def trig_batch_images(key, inputs, cols, image_format, image_delivery):
+    """Plot per baris (opsional); baris tidak valid mendapat None / list kosong"""
+    n = len(cols["valid"])
+    if n > BATCH_MAX_PLOTS:
+        raise ValueError(f"Plot batch maksimal {BATCH_MAX_PLOTS} segitiga")
+    a, b = inputs['a'], inputs['b']
+    images = []
+    for i in range(n):
+        if key == 'aturan_sinus_ambigu':
+            row = []
+            if cols["solutions"][i] >= 1:
+                title = "Solusi 1 (Lancip)" if cols["solutions"][i] == 2 else "Visualisasi Segitiga"
+                row.append(Plotter.create_triangle_image(a[i], b[i], cols["c1"][i], inputs['A'][i],
+                                                         cols["B1"][i], cols["C1"][i], title, image_format))
+            if cols["solutions"][i] == 2:
+                row.append(Plotter.create_triangle_image(a[i], b[i], cols["c2"][i], inputs['A'][i],
+                                                         cols["B2"][i], cols["C2"][i], "Solusi 2 (Tumpul)", image_format))
+            images.append([deliver_image(img, image_format, image_delivery) for img in row])
+        elif not cols["valid"][i]:
+            images.append(None)
+        else:
+            c = cols["c"][i] if "c" in cols else inputs['c'][i]
+            C = inputs['C'][i] if 'C' in inputs else cols["C"][i]
+            img = Plotter.create_triangle_image(a[i], b[i], c, cols["A"][i], cols["B"][i], C, image_format=image_format)
+            images.append(deliver_image(img, image_format, image_delivery))
+    return images
+
+# =======================
+# STREAMING NDJSON
+# =======================
+# Batch besar dikirim sebagai newline-delimited JSON, potongan demi potongan dari
+# generator: baris pertama header, lalu satu array per titik/segitiga, terakhir summary.
+# Potongan berikutnya baru dihitung setelah potongan sebelumnya ditulis ke socket,
+# jadi memori tetap datar berapa pun jumlah barisnya. Request juga boleh NDJSON
+# (baris pertama header, sisanya baris data) dan dibaca sebagai stream.
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_CHUNK_SIZE = int(os.environ.get('KALKULATOR_STREAM_CHUNK_SIZE', '4096'))
+
+def wants_stream(data=None):
+    if request.mimetype == NDJSON_MIMETYPE:
+        return True
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return True
+    return bool(data and data.get('stream'))
+
+def ndjson_line(obj):
+    return app.json.dumps(obj) + "\n"
+
+def ndjson_rows(rows):
+    """Satu baris per row; rows berisi array datar (angka/null/bool) jadi cukup satu json.dumps"""
+    if not rows:
+        return ""
+    return json.dumps(rows)[1:-1].replace("], [", "]\n[") + "\n"
+
+class BadLine:
+    """Pengganti record NDJSON yang tidak bisa di-decode (mode skip_bad)"""
+    __slots__ = ('lineno', 'message')
+
+    def __init__(self, lineno, message):
+        self.lineno = lineno
+        self.message = message
+
+def iter_ndjson_chunks(stream, size=STREAM_CHUNK_SIZE, skip_bad=False):
+    """
+    Baca record NDJSON dari stream request per potongan `size` baris.
+    Stream dibungkus buffer (werkzeug membaca baris per byte), dan satu
+    potongan di-decode dengan satu json.loads; jika gagal, potongan itu
+    di-decode per baris. Baris rusak menghentikan stream (ValueError), atau
+    dengan skip_bad=True diganti BadLine supaya record lain tetap diproses.
+    """
+    reader = io.BufferedReader(stream, buffer_size=1 << 16)
+    lineno = 0
+    while True:
+        lines = []
+        for line in reader:
+            lineno += 1
+            line = line.strip()
+            if line:
+                lines.append((lineno, line))
+                if len(lines) >= size:
+                    break
+        if not lines:
+            return
+        try:
+            yield json.loads(b"[" + b",".join(line for _, line in lines) + b"]")
+        except ValueError:
+            records = []
+            for n, line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    message = f"Baris {n} bukan JSON yang valid"
+                    if not skip_bad:
+                        raise ValueError(message)
+                    records.append(BadLine(n, message))
+            yield records
+
+def iter_ndjson(stream, skip_bad=False):
+    """Record NDJSON satu per satu"""
+    for chunk in iter_ndjson_chunks(stream, skip_bad=skip_bad):
+        yield from chunk
+
+def rows_to_array(rows, names):
+    """Baris NDJSON ([v1, v2, ...] atau {nama: nilai}) jadi array N×len(names)"""
+    return np.array([[row[n] for n in names] if isinstance(row, dict) else row for row in rows],
+                    dtype=np.float64).reshape(-1, len(names))
+
+def array_chunks(data, decode):
+    """Potongan N×k dari body JSON biasa (points/kolom), tanpa menyalin semuanya sekaligus"""
+    arrays = decode(data)
+    total = len(arrays[0])
+    for start in range(0, total, STREAM_CHUNK_SIZE):
+        yield np.column_stack([arr[start:start + STREAM_CHUNK_SIZE] for arr in arrays])
+
+def stream_batch(header, chunks):
+    """Generator NDJSON untuk /compute/batch; chunks: iterable array N×k"""
+    mod = header.get('module', 'geo')
+    op = header.get('operation')
+    count = 0
     try:
         if mod == 'geo':
-            # Parsing input dasar
-            px = sp.sympify(data.get('px', '0'))
-            py = sp.sympify(data.get('py', '0'))
-            
-            if op == 'translasi':
-                tx = sp.sympify(data.get('tx', '0'))
-                ty = sp.sympify(data.get('ty', '0'))
-                res, step_list = GeoEngine.translasi((px, py), (tx, ty))
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                return jsonify({
-                    "result": f"P'({fnum(res[0])}, {fnum(res[1])})",
-                    "steps": steps,
-                    "status": "✓ Translasi selesai",
-                    "status_class": "success"
-                })
-                
-            elif op == 'translasi_homogen':
-                tx = sp.sympify(data.get('tx', '0'))
-                ty = sp.sympify(data.get('ty', '0'))
-                res, step_list, mat = GeoEngine.translasi_homogen((px, py), (tx, ty))
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                return jsonify({
-                    "result": f"P'({fnum(res[0])}, {fnum(res[1])})",
-                    "matrix": f"Matriks: {sp.latex(mat)}",
-                    "steps": steps,
-                    "status": "✓ Translasi Homogen selesai",
-                    "status_class": "success"
-                })
-
-            elif op == 'refleksi':
-                mode = data.get('mode', 'x')
-                res, step_list, mat = GeoEngine.refleksi((px, py), mode)
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                return jsonify({
-                    "result": f"P'({fnum(res[0])}, {fnum(res[1])})",
-                    "matrix": f"Matriks: {sp.latex(mat)}",
-                    "steps": steps,
-                    "status": "✓ Refleksi selesai",
-                    "status_class": "success"
-                })
-
-            elif op == 'rotasi':
-                angle = sp.sympify(data.get('angle', '90'))
-                cx = sp.sympify(data.get('cx', '0'))
-                cy = sp.sympify(data.get('cy', '0'))
-                res, step_list, mat = GeoEngine.rotasi((px, py), angle, (cx, cy))
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                return jsonify({
-                    "result": f"P'({fnum(res[0])}, {fnum(res[1])})",
-                    "matrix": f"Matriks: {sp.latex(mat)}",
-                    "steps": steps,
-                    "status": "✓ Rotasi selesai",
-                    "status_class": "success"
-                })
-
-            elif op == 'dilatasi':
-                factor = sp.sympify(data.get('factor', '2'))
-                dcx = sp.sympify(data.get('dcx', '0'))
-                dcy = sp.sympify(data.get('dcy', '0'))
-                res, step_list, mat = GeoEngine.dilatasi((px, py), factor, (dcx, dcy))
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                return jsonify({
-                    "result": f"P'({fnum(res[0])}, {fnum(res[1])})",
-                    "matrix": f"Matriks: {sp.latex(mat)}",
-                    "steps": steps,
-                    "status": "✓ Dilatasi selesai",
-                    "status_class": "success"
-                })
-
-            elif op == 'invers':
-                inv_type = data.get('inv_type', 'rot')
-                param = sp.sympify(data.get('param', '90'))
-                mat_inv, step_list = GeoEngine.invers_transformasi(inv_type, param)
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                if mat_inv is not None:
-                    return jsonify({
-                        "result": "Invers Matriks Ditemukan",
-                        "matrix": f"$$M^{{-1}} = {sp.latex(mat_inv)}$$",
-                        "steps": steps,
-                        "status": "✓ Perhitungan sukses",
-                        "status_class": "success"
-                    })
-                return jsonify({"error": "Matriks singular", "steps": steps})
-
-        elif mod == 'trig':
-            if op == 'aturan_sinus':
-                b = sp.sympify(data.get('b', '5'))
-                A = sp.sympify(data.get('A', '30'))
-                B = sp.sympify(data.get('B', '45'))
-                
-                rad_A = to_rad(A)
-                rad_B = to_rad(B)
-                a = (b * sp.sin(rad_A)) / sp.sin(rad_B)
-                
-                # Hitung C untuk visualisasi
-                C_angle = 180 - float(A) - float(B)
-                c_side = (b * sp.sin(to_rad(C_angle))) / sp.sin(rad_B)
-                img = Plotter.create_triangle_image(a, b, c_side, float(A), float(B), C_angle)
-                
-                steps = [
-                    {"title": "Rumus", "desc": "a/sin A = b/sin B"},
-                    {"title": "Substitusi", "desc": f"a = {b} × sin({A}) / sin({B})"},
-                    {"title": "Hasil", "desc": f"a = {fnum(a)}"}
-                ]
-                return jsonify({
-                    "result": f"Sisi a = {fnum(a)}",
-                    "steps": steps,
-                    "image": img,
-                    "status": "✓ Sisi a ditemukan",
+            mat = geo_batch_matrix(op, header)
+            if mat is None:
+                raise InputError("Operasi tidak valid")
+            yield ndjson_line({"type": "header", "module": mod, "operation": op,
+                               "columns": ["x", "y"], "matrix": json_floats(mat)})
+            for chunk in chunks:
+                res = GeoEngine.transform_points(mat, chunk)
+                count += len(res)
+                yield ndjson_rows(json_floats(res))
+        elif mod == 'trig' and trig_batch_key(op, header) in TRIG_BATCH_COLUMNS:
+            key = trig_batch_key(op, header)
+            names = TRIG_BATCH_COLUMNS[key]
+            columns = None
+            for chunk in chunks:
+                cols = solve_trig_batch(key, {n: chunk[:, i] for i, n in enumerate(names)})
+                if columns is None:
+                    columns = sorted(cols)
+                    yield ndjson_line({"type": "header", "module": mod, "operation": op,
+                                       "inputs": list(names), "columns": columns})
+                count += len(chunk)
+                yield ndjson_rows(list(zip(*(column_values(cols[n]) for n in columns))))
+        else:
+            raise InputError("Operasi tidak valid")
+    except InputError as e:
+        yield ndjson_line({"type": "error", "error": str(e), "count": count})
+        return
+    except Exception as e:
+        yield ndjson_line({"type": "error", "error": f"Input Error: {str(e)}", "count": count})
+        return
+    unit = "titik ditransformasi" if mod == 'geo' else "segitiga dihitung"
+    yield ndjson_line({"type": "summary", "count": count, "status": f"✓ {count} {unit}", "status_class": "success"})
+
+def stream_batch_response(data=None):
+    if data is None:
+        # Body NDJSON: header di baris pertama, lalu baris data
+        reader = iter_ndjson_chunks(request.stream)
+        try:
+            first = next(reader, None) or [{}]
+        except ValueError as e:
+            return invalid_body(str(e))
+        header, rows = first[0], first[1:]
+        if not isinstance(header, dict):
+            return invalid_body("Baris pertama harus header JSON object")
+        mod = header.get('module', 'geo')
+        names = ("x", "y") if mod == 'geo' else TRIG_BATCH_COLUMNS.get(trig_batch_key(header.get('operation'), header), ())
+        chunks = (rows_to_array(rows, names) for rows in itertools.chain([rows], reader) if rows)
+    else:
+        header = data
+        if data.get('module', 'geo') == 'geo':
+            chunks = array_chunks(data, lambda d: decode_points(d).T)
+        else:
+            names = TRIG_BATCH_COLUMNS.get(trig_batch_key(data.get('operation'), data), ())
+            chunks = array_chunks(data, lambda d: np.broadcast_arrays(
+                *(np.atleast_1d(decode_column(d, n)) for n in names)))
+    if header.get('plot'):
+        return jsonify({"error": "Plot tidak didukung pada mode stream", "color": "#ef4444"})
+    return Response(stream_with_context(stream_batch(header, chunks)), mimetype=NDJSON_MIMETYPE)
+
+def stream_compute():
+    """
+    /compute dengan body NDJSON: satu request per baris, tepat satu respons per baris
+    (urutan sama). Baris yang rusak hanya menghasilkan record error untuk baris itu.
+    """
+    def generate():
+        for data in iter_ndjson(request.stream, skip_bad=True):
+            if isinstance(data, BadLine):
+                yield ndjson_line({"error": data.message, "line": data.lineno, "color": "#ef4444"})
+                continue
+            entry = OPERATIONS.get((data.get('module'), data.get('operation'))) if isinstance(data, dict) else None
+            if entry is None:
+                yield ndjson_line({"error": "Operasi tidak valid", "color": "#ef4444"})
+                continue
+            body, status_code = run_operation(entry, data)
+            if status_code != 200:
+                body["status_code"] = status_code
+            yield ndjson_line(body)
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+@app.route("/compute/batch", methods=["POST"])
+def compute_batch():
+    if request.mimetype == NDJSON_MIMETYPE:
+        return stream_batch_response()
+    data = json_object_body()
+    if data is None:
+        return invalid_body()
+    if wants_stream(data):
+        return stream_batch_response(data)
+    mod = data.get('module', 'geo')
+    op = data.get('operation')
+
+    try:
+        if mod == 'trig':
+            solved = trig_batch(op, data)
+            if solved is not None:
+                key, inputs, cols = solved
+                out = {
+                    "count": len(cols["valid"]),
+                    "valid_count": int(np.count_nonzero(cols["valid"])),
+                    "status": f"✓ {len(cols['valid'])} segitiga dihitung",
                     "status_class": "success"
-                })
-                
-            elif op == 'aturan_sinus_ambigu':
-                a = sp.sympify(data.get('a', '5'))
-                b = sp.sympify(data.get('b', '7'))
-                A = sp.sympify(data.get('A', '30'))
-                res_list, step_list, status, images = TrigEngine.aturan_sinus_ambigu(a, b, A)
-                steps = [{"title": f"Analisis", "desc": s} for s in step_list]
-                
-                result_txt = []
-                if not res_list: result_txt.append("Tidak ada solusi")
-                else: 
-                    for i, ang in enumerate(res_list): result_txt.append(f"Sudut B{i+1} = {fnum(ang)}°")
-
-                return jsonify({
-                    "result": result_txt,
-                    "steps": steps,
-                    "status": status,
-                    "status_class": "warning" if "Ambigu" in status else "success",
-                    "images": images
-                })
-                
-            elif op == 'aturan_cosinus':
-                cari = data.get('cari', 'sisi')
-                if cari == 'sisi':
-                    a = sp.sympify(data.get('a', '5'))
-                    b = sp.sympify(data.get('b', '6'))
-                    C = sp.sympify(data.get('C', '60'))
-                    res, step_list, img = TrigEngine.aturan_cosinus(a=a, b=b, angle_C=C)
-                    steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                    return jsonify({
-                        "result": f"Sisi c = {fnum(res)}",
-                        "steps": steps,
-                        "image": img,
-                        "status": "✓ Sisi c ditemukan",
-                        "status_class": "success"
-                    })
-                else:
-                    a = sp.sympify(data.get('a', '5'))
-                    b = sp.sympify(data.get('b', '6'))
-                    c = sp.sympify(data.get('c', '7'))
-                    res, step_list, img = TrigEngine.aturan_cosinus(a=a, b=b, c=c)
-                    steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                    return jsonify({
-                        "result": f"Sudut C = {fnum(res)}°",
-                        "steps": steps,
-                        "image": img,
-                        "status": "✓ Sudut C ditemukan",
-                        "status_class": "success"
-                    })
-
-            elif op == 'luas_segitiga':
-                a = sp.sympify(data.get('a', '5'))
-                b = sp.sympify(data.get('b', '6'))
-                C = sp.sympify(data.get('C', '30'))
-                res, step_list, img = TrigEngine.luas_segitiga(a, b, C)
-                steps = [{"title": f"Langkah {i+1}", "desc": s} for i, s in enumerate(step_list)]
-                return jsonify({
-                    "result": f"Luas = {fnum(res)} satuan²",
-                    "steps": steps,
-                    "image": img,
-                    "status": "✓ Luas segitiga dihitung",
+                }
+                out.update(encode_columns(cols, data.get('format', 'json')))
+                if data.get('plot'):
+                    image_format = IMAGE_PARAMS[0].parse(data)
+                    image_delivery = IMAGE_PARAMS[1].parse(data)
+                    out["images"] = trig_batch_images(key, inputs, cols, image_format, image_delivery)
+                    out["image_format"] = image_format
+                    out["image_delivery"] = image_delivery
+                return jsonify(out)
+        if mod == 'geo':
+            mat = geo_batch_matrix(op, data)
+            if mat is not None:
+                pts = decode_points(data)
+                res = GeoEngine.transform_points(mat, pts)
+                out = {
+                    "count": len(res),
+                    "matrix": json_floats(mat),
+                    "status": f"✓ {len(res)} titik ditransformasi",
                     "status_class": "success"
-                })
-
+                }
+                out.update(encode_points(res, data.get('format', 'json')))
+                return jsonify(out)
+    except InputError as e:
+        return jsonify({"error": str(e), "color": "#ef4444"})
     except Exception as e:
         return jsonify({"error": f"Input Error: {str(e)}", "color": "#ef4444"})
 
     return jsonify({"error": "Operasi tidak valid"})
 
+STARTUP_MS = round((time.perf_counter() - _MODULE_T0) * 1000, 2)
+
 # =======================
 # AUTO START
 # =======================
@@ -1180,6 +4048,195 @@ def open_browser():
     time.sleep(1.5)
     webbrowser.open("http://127.0.0.1:5000")
 
+# =======================
+# SERVE (PRODUKSI, PRE-FORK)
+# =======================
+# `python app1.py serve` menggantikan server development: proses master
+# membuka satu socket, menghangatkan import + satu render plot (diwarisi
+# worker lewat fork, copy-on-write), lalu mem-fork N worker HTTP yang
+# masing-masing menjalankan server werkzeug multi-thread di socket yang sama
+# ditambah pool isolasinya sendiri (lihat serve(): 2N proses secara default).
+# Worker yang mati diganti otomatis. SIGHUP = reload bertahap: master meng-exec
+# ulang dirinya (kode dan CACHE_VERSION baru, pid sama) dengan mewariskan socket
+# lewat KALKULATOR_LISTEN_FD; worker lama tetap melayani selama master baru
+# warm-up, lalu dihentikan dengan anggun setelah generasi baru di-fork (request
+# yang sedang jalan diselesaikan). File yang gagal di-compile membatalkan reload.
+# SIGTERM/SIGINT = berhenti dengan anggun.
+# `app` tetap bisa dipasang di server WSGI lain (gunicorn app1:app, Vercel).
+SERVE_HOST = os.environ.get('KALKULATOR_HOST', '127.0.0.1')
+SERVE_PORT = int(os.environ.get('KALKULATOR_PORT', '5000'))
+SERVE_WORKERS = int(os.environ.get('KALKULATOR_SERVE_WORKERS', str(os.cpu_count() or 1)))
+SERVE_KEEPALIVE = float(os.environ.get('KALKULATOR_KEEPALIVE', '5'))
+SERVE_BACKLOG = int(os.environ.get('KALKULATOR_BACKLOG', '1024'))
+# Dipakai master ke dirinya sendiri saat reload (exec), bukan untuk diisi manual
+LISTEN_FD_ENV = 'KALKULATOR_LISTEN_FD'
+RETIRE_PIDS_ENV = 'KALKULATOR_RETIRE_PIDS'
+
+def warm_up():
+    """Import berat dan satu render plot, supaya request pertama tiap worker tidak membayar"""
+    t0 = time.perf_counter()
+    lazy_import('sympy')
+    lazy_import('numpy')
+    load_matplotlib()
+    parse_input('sqrt(2) + pi/3')
+    Plotter.create_triangle_image(5.0, 6.0, 7.0, 44.42, 57.12, 78.46, title="warm-up")
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+def keepalive_handler(keepalive):
+    from werkzeug.serving import WSGIRequestHandler
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        # HTTP/1.1 = koneksi keep-alive; koneksi idle ditutup setelah `timeout` detik
+        protocol_version = "HTTP/1.1"
+        timeout = keepalive
+
+    return KeepAliveHandler
+
+def _serve_worker(sock, handler):
+    """Loop satu worker HTTP (proses hasil fork); tidak pernah kembali"""
+    import signal
+    from werkzeug.serving import make_server
+
+    server = make_server(sock.getsockname()[0], sock.getsockname()[1], app, threaded=True,
+                         request_handler=handler, fd=sock.fileno())
+    # Saat berhenti, tunggu thread request yang masih jalan (dibatasi timeout keep-alive)
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C ditangani master
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    threading.Thread(target=WORKER_POOL.warm, daemon=True).start()
+    code = 0
+    try:
+        server.serve_forever()
+        server.server_close()
+        WORKER_POOL.close()
+    except BaseException:
+        logger.exception("Worker %d berhenti karena error", os.getpid())
+        code = 1
+    finally:
+        os._exit(code)
+
+def serve(argv=None):
+    import argparse
+    import signal
+    import socket
+
+    parser = argparse.ArgumentParser(prog="app1.py serve", description="Jalankan Kalkulator dengan worker pre-fork")
+    parser.add_argument('--host', default=SERVE_HOST)
+    parser.add_argument('--port', type=int, default=SERVE_PORT)
+    parser.add_argument('--workers', type=int, default=SERVE_WORKERS, help="jumlah worker HTTP (default: jumlah core)")
+    parser.add_argument('--keepalive', type=float, default=SERVE_KEEPALIVE, help="detik koneksi idle dipertahankan")
+    parser.add_argument('--no-warmup', action='store_true')
+    args = parser.parse_args(argv)
+
+    # Tiap worker HTTP (hasil fork) membuat WorkerPool isolasinya sendiri, jadi total
+    # proses = N worker HTTP + N × KALKULATOR_WORKERS. Tanpa konfigurasi eksplisit pool
+    # dibatasi satu proses per worker: 2N proses, separuhnya hanya sibuk saat ada
+    # komputasi simbolik/plot; worker HTTP menunggu pool-nya selama itu.
+    if 'KALKULATOR_WORKERS' not in os.environ and WORKER_POOL.processes > 1:
+        WORKER_POOL.processes = 1
+
+    inherited_fd = os.environ.pop(LISTEN_FD_ENV, None)
+    retiring = {int(pid) for pid in os.environ.pop(RETIRE_PIDS_ENV, '').split(',') if pid}
+    if inherited_fd is not None:
+        sock = socket.socket(fileno=int(inherited_fd))
+    else:
+        sock = socket.create_server((args.host, args.port), backlog=SERVE_BACKLOG)
+    sock.set_inheritable(True)
+    handler = keepalive_handler(args.keepalive)
+    if not args.no_warmup:
+        logger.warning("Warm-up selesai dalam %s ms", warm_up())
+
+    if not hasattr(os, 'fork') or args.workers <= 1:
+        # Windows / satu worker: server multi-thread di proses ini saja
+        from werkzeug.serving import make_server
+        server = make_server(args.host, args.port, app, threaded=True, request_handler=handler, fd=sock.fileno())
+        logger.warning("Kalkulator melayani http://%s:%d (1 proses)", args.host, args.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    workers = set()
+    state = {"reload": False, "stop": False}
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            _serve_worker(sock, handler)
+        workers.add(pid)
+
+    def stop_workers(pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def on_signal(signum, frame):
+        state["reload" if signum == signal.SIGHUP else "stop"] = True
+
+    def reexec():
+        """Ganti image master dengan kode terbaru; worker lama dihentikan oleh master baru"""
+        script = os.path.abspath(sys.argv[0])
+        try:
+            if script.endswith('.py'):
+                compile(open(script, 'rb').read(), script, 'exec')
+        except (OSError, SyntaxError) as e:
+            logger.warning("Reload dibatalkan, %s tidak bisa di-compile: %s", script, e)
+            return
+        os.environ[LISTEN_FD_ENV] = str(sock.fileno())
+        os.environ[RETIRE_PIDS_ENV] = ','.join(map(str, workers | retiring))
+        logger.warning("Reload: exec ulang master pid %d", os.getpid())
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, on_signal)
+    for _ in range(args.workers):
+        spawn()
+    if retiring:
+        # Generasi baru sudah menerima koneksi; generasi sebelum exec diberhentikan
+        stop_workers(retiring)
+        logger.warning("Reload: %d worker lama dihentikan", len(retiring))
+    logger.warning("Kalkulator melayani http://%s:%d dengan %d worker (master pid %d)",
+                   *sock.getsockname()[:2], args.workers, os.getpid())
+
+    while not state["stop"]:
+        if state["reload"]:
+            state["reload"] = False
+            reexec()
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        retiring.discard(pid)
+        if pid and pid in workers:
+            workers.discard(pid)
+            if not state["stop"]:
+                logger.warning("Worker %d mati (status %d), diganti", pid, status)
+                spawn()
+        elif not pid:
+            time.sleep(0.2)
+
+    stop_workers(workers | retiring)
+    for pid in workers | retiring:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+
 if __name__ == "__main__":
-    threading.Thread(target=open_browser).start()
-    app.run(debug=False, port=5000)
+    if sys.argv[1:2] == ["serve"]:
+        serve(sys.argv[2:])
+    else:
+        threading.Thread(target=open_browser).start()
+        app.run(debug=False, port=5000)
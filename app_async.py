@@ -0,0 +1,421 @@
+"""
+Varian asyncio dari Kalkulator: kontrak HTTP sama persis dengan app1 (semua
+route, termasuk /compute JSON dan NDJSON), tapi koneksi dilayani event loop.
+
+Body request dibaca secara async sampai ASYNC_BODY_BUFFER byte; baru setelah
+itu aplikasi Flask dari app1 dipanggil di thread pool, jadi client lambat
+(mobile, upload pelan) hanya memakan coroutine, bukan thread. Komputasi
+simbolik tetap dilempar app1 ke pool prosesnya (WorkerPool). Respons kecil
+dikumpulkan di thread lalu ditulis oleh event loop; respons besar/stream
+(NDJSON) dialirkan langsung dari thread dengan backpressure.
+
+    uvicorn app_async:app                                  # ASGI, jika uvicorn/hypercorn terpasang
+    python app_async.py --port 5000 --processes 4          # server asyncio bawaan (tanpa dependensi)
+"""
+import argparse
+import asyncio
+import io
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote_to_bytes
+
+import app1
+
+ASYNC_THREADS = int(os.environ.get('KALKULATOR_ASYNC_THREADS', str(min(32, (os.cpu_count() or 1) + 4))))
+ASYNC_BODY_BUFFER = int(os.environ.get('KALKULATOR_ASYNC_BODY_BUFFER', str(1 << 20)))
+ASYNC_RESPONSE_BUFFER = int(os.environ.get('KALKULATOR_ASYNC_RESPONSE_BUFFER', str(256 << 10)))
+ASYNC_BODY_TIMEOUT = float(os.environ.get('KALKULATOR_ASYNC_BODY_TIMEOUT', '30'))
+READ_CHUNK = 64 << 10
+
+EXECUTOR = ThreadPoolExecutor(ASYNC_THREADS, thread_name_prefix='kalkulator-async')
+
+# =======================
+# ASGI -> WSGI (app1.app)
+# =======================
+class ReceiveStream(io.RawIOBase):
+    """
+    wsgi.input untuk body yang lebih besar dari buffer: dibaca dari thread
+    WSGI, potongan berikutnya diminta ke event loop lewat receive().
+    """
+    def __init__(self, prefix, more_body, receive, loop):
+        self._buf = prefix
+        self._more = more_body
+        self._receive = receive
+        self._loop = loop
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buf and self._more:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                raise ConnectionError("Client memutus koneksi")
+            self._buf = message.get('body', b'')
+            self._more = message.get('more_body', False)
+        n = min(len(b), len(self._buf))
+        b[:n] = self._buf[:n]
+        self._buf = self._buf[n:]
+        return n
+
+async def read_body(receive, limit):
+    """Kumpulkan body sampai selesai atau melewati limit; (bytes, masih_ada_lanjutan)"""
+    chunks, size, more = [], 0, True
+    while more and size <= limit:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionError("Client memutus koneksi")
+        chunk = message.get('body', b'')
+        chunks.append(chunk)
+        size += len(chunk)
+        more = message.get('more_body', False)
+    return b''.join(chunks), more
+
+def build_environ(scope, body, more_body, receive, loop):
+    headers = {}
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key in headers:
+            # Cookie digabung dengan '; ' (RFC 6265 §5.4), header lain dengan ','
+            value = f"{headers[key]}{'; ' if key == 'COOKIE' else ','}{value}"
+        headers[key] = value
+    server = scope.get('server') or ('127.0.0.1', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # Pisahkan query dulu: '%3F' di path tetap bagian path, bukan awal query
+        'PATH_INFO': unquote_to_bytes((scope.get('raw_path') or scope['path'].encode()).split(b'?', 1)[0]).decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    # Body sudah di-decode server (chunked dilepas), jadi Transfer-Encoding tidak diteruskan.
+    # Content-Length di sampingnya tidak berlaku (RFC 9112 §6.1) dan ikut dibuang.
+    if headers.pop('TRANSFER_ENCODING', None) is not None:
+        headers.pop('CONTENT_LENGTH', None)
+    for key, value in headers.items():
+        if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[key] = value
+        else:
+            environ[f'HTTP_{key}'] = value
+    if more_body:
+        environ['wsgi.input'] = io.BufferedReader(ReceiveStream(body, True, receive, loop), READ_CHUNK)
+    else:
+        environ['wsgi.input'] = io.BytesIO(body)
+        environ['CONTENT_LENGTH'] = str(len(body))
+    if 'CONTENT_LENGTH' not in environ:
+        # Body stream tanpa Content-Length: werkzeug membaca sampai EOF
+        environ['wsgi.input_terminated'] = True
+    return environ
+
+def call_wsgi(environ, loop, send):
+    """
+    Dijalankan di thread pool. Respons sampai ASYNC_RESPONSE_BUFFER dikembalikan
+    utuh (ditulis event loop); yang lebih besar dikirim dari thread ini, menunggu
+    tiap potongan terkirim supaya client lambat menahan produsen.
+    """
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+        return lambda data: None
+
+    def forward(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    result = app1.app(environ, start_response)
+    try:
+        chunks, size = [], 0
+        iterator = iter(result)
+        for chunk in iterator:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > ASYNC_RESPONSE_BUFFER:
+                forward({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+                forward({'type': 'http.response.body', 'body': b''.join(chunks), 'more_body': True})
+                for chunk in iterator:
+                    if chunk:
+                        forward({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                forward({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                return None
+        body = b''.join(chunks)
+        headers = response['headers']
+        if not any(name == b'content-length' for name, _ in headers):
+            headers = headers + [(b'content-length', str(len(body)).encode())]
+        return response['status'], headers, body
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+
+async def app(scope, receive, send):
+    """Aplikasi ASGI 3"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        body, more_body = await read_body(receive, ASYNC_BODY_BUFFER)
+    except ConnectionError:
+        return
+    environ = build_environ(scope, body, more_body, receive, loop)
+    result = await loop.run_in_executor(EXECUTOR, call_wsgi, environ, loop, send)
+    if result is not None:
+        status, headers, body = result
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            ms = await asyncio.get_running_loop().run_in_executor(EXECUTOR, app1.warm_up)
+            app1.logger.warning("Warm-up selesai dalam %s ms", ms)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await asyncio.get_running_loop().run_in_executor(None, app1.WORKER_POOL.close)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+# =======================
+# SERVER HTTP/1.1 BAWAAN (ASYNCIO)
+# =======================
+class BodyReader:
+    """Body request (Content-Length atau chunked) dibaca bertahap dari StreamReader"""
+    def __init__(self, reader, length, chunked):
+        self.reader = reader
+        self.remaining = length
+        self.chunked = chunked
+        self.done = not chunked and not length
+
+    async def read(self):
+        if self.done:
+            return b''
+        if not self.chunked:
+            data = await asyncio.wait_for(self.reader.read(min(self.remaining, READ_CHUNK)), ASYNC_BODY_TIMEOUT)
+            if not data:
+                raise ConnectionError("Body terpotong")
+            self.remaining -= len(data)
+            self.done = self.remaining <= 0
+            return data
+        line = await asyncio.wait_for(self.reader.readuntil(b"\r\n"), ASYNC_BODY_TIMEOUT)
+        size = int(line.split(b';', 1)[0], 16)
+        if size == 0:
+            while await asyncio.wait_for(self.reader.readuntil(b"\r\n"), ASYNC_BODY_TIMEOUT) != b"\r\n":
+                pass  # trailer diabaikan
+            self.done = True
+            return b''
+        data = await asyncio.wait_for(self.reader.readexactly(size + 2), ASYNC_BODY_TIMEOUT)
+        return data[:-2]
+
+    async def discard(self):
+        while not self.done:
+            await self.read()
+
+def parse_head(head):
+    lines = head[:-4].decode('latin-1').split('\r\n')
+    method, target, version = lines[0].split(' ', 2)
+    if not version.startswith('HTTP/1.'):
+        raise ValueError(version)
+    headers = []
+    for line in lines[1:]:
+        name, value = line.split(':', 1)
+        headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+    return method, target, version, headers
+
+def body_framing(headers):
+    """
+    (chunked, panjang) body request dari daftar header mentah (header berulang tetap
+    terlihat). Ditolak (ValueError) agar tidak bisa dipakai request smuggling di belakang
+    proxy (RFC 9112 §6.1, §6.3): Transfer-Encoding bersama Content-Length, lebih dari satu
+    baris Transfer-Encoding, coding terakhir selain chunked, Content-Length yang bukan
+    angka atau beberapa Content-Length yang nilainya berbeda.
+    """
+    encodings = [value for name, value in headers if name == b'transfer-encoding']
+    lengths = {v.strip() for name, value in headers if name == b'content-length' for v in value.split(b',')}
+    if encodings:
+        if lengths or len(encodings) > 1 or encodings[0].lower().rsplit(b',', 1)[-1].strip() != b'chunked':
+            raise ValueError("Framing body tidak valid")
+        return True, 0
+    if not lengths:
+        return False, 0
+    if len(lengths) > 1:
+        raise ValueError("Content-Length ganda dengan nilai berbeda")
+    length = lengths.pop()
+    if not length.isdigit():
+        raise ValueError("Content-Length tidak valid")
+    return False, int(length)
+
+async def handle_connection(reader, writer):
+    peer = writer.get_extra_info('peername') or ('', 0)
+    local = writer.get_extra_info('sockname') or ('', 0)
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), app1.SERVE_KEEPALIVE)
+                method, target, version, headers = parse_head(head)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+            except (asyncio.LimitOverrunError, ValueError):
+                writer.write(b"HTTP/1.1 400 Bad Request\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+            fields = dict(headers)
+            try:
+                chunked, length = body_framing(headers)
+            except ValueError:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+            body = BodyReader(reader, length, chunked)
+            connection = fields.get(b'connection', b'').lower()
+            keep_alive = connection != b'close' if version == 'HTTP/1.1' else connection == b'keep-alive'
+            if fields.get(b'expect', b'').lower() == b'100-continue':
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            path, _, query = target.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': version[5:],
+                'method': method, 'scheme': 'http', 'path': unquote_to_bytes(path).decode('latin-1'),
+                'raw_path': path.encode('latin-1'), 'query_string': query.encode('latin-1'),
+                'root_path': '', 'headers': headers, 'client': peer[:2], 'server': local[:2],
+            }
+            state = {'started': False, 'chunked': False}
+
+            async def receive():
+                try:
+                    data = await body.read()
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError):
+                    return {'type': 'http.disconnect'}
+                return {'type': 'http.request', 'body': data, 'more_body': not body.done}
+
+            async def send(message):
+                nonlocal keep_alive
+                if message['type'] == 'http.response.start':
+                    out_headers = message.get('headers', [])
+                    has_length = any(name.lower() == b'content-length' for name, _ in out_headers)
+                    state['chunked'] = not has_length and version == 'HTTP/1.1'
+                    keep_alive = keep_alive and (has_length or state['chunked'])
+                    lines = [f"HTTP/1.1 {message['status']} {status_phrase(message['status'])}".encode()]
+                    lines += [name + b': ' + value for name, value in out_headers]
+                    if state['chunked']:
+                        lines.append(b'transfer-encoding: chunked')
+                    lines.append(b'connection: keep-alive' if keep_alive else b'connection: close')
+                    writer.write(b"\r\n".join(lines) + b"\r\n\r\n")
+                    state['started'] = True
+                elif message['type'] == 'http.response.body':
+                    if method == 'HEAD':
+                        return  # hanya header; body dan framing chunked tidak dikirim
+                    data = message.get('body', b'')
+                    more = message.get('more_body', False)
+                    if state['chunked']:
+                        if data:
+                            writer.write(b"%x\r\n%b\r\n" % (len(data), data))
+                        if not more:
+                            writer.write(b"0\r\n\r\n")
+                    elif data:
+                        writer.write(data)
+                    await writer.drain()
+
+            try:
+                await app(scope, receive, send)
+            except Exception:
+                app1.logger.exception("Error saat melayani %s %s", method, target)
+                if not state['started']:
+                    writer.write(b"HTTP/1.1 500 Internal Server Error\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+            if not keep_alive:
+                return
+            await body.discard()
+    except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+def status_phrase(status):
+    from http import HTTPStatus
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ''
+
+async def serve_socket(sock):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    server = await asyncio.start_server(handle_connection, sock=sock, backlog=app1.SERVE_BACKLOG, limit=READ_CHUNK)
+    async with server:
+        await stop.wait()
+    app1.WORKER_POOL.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kalkulator di atas asyncio (server HTTP bawaan)")
+    parser.add_argument('--host', default=app1.SERVE_HOST)
+    parser.add_argument('--port', type=int, default=app1.SERVE_PORT)
+    parser.add_argument('--processes', type=int, default=1, help="jumlah proses event loop (fork, socket bersama)")
+    parser.add_argument('--no-warmup', action='store_true')
+    args = parser.parse_args(argv)
+
+    sock = socket.create_server((args.host, args.port), backlog=app1.SERVE_BACKLOG)
+    sock.setblocking(False)
+    if not args.no_warmup:
+        app1.logger.warning("Warm-up selesai dalam %s ms", app1.warm_up())
+    app1.logger.warning("Kalkulator (asyncio) melayani http://%s:%d dengan %d proses",
+                        args.host, args.port, args.processes)
+    if args.processes <= 1 or not hasattr(os, 'fork'):
+        asyncio.run(serve_socket(sock))
+        return
+
+    children = []
+    for _ in range(args.processes):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                asyncio.run(serve_socket(sock))
+            except BaseException:
+                app1.logger.exception("Proses %d berhenti karena error", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        children.append(pid)
+
+    def forward(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for pid in children:
+        while True:
+            try:
+                os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+            except ChildProcessError:
+                break
+    sock.close()
+
+if __name__ == '__main__':
+    main()
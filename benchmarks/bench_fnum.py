@@ -0,0 +1,68 @@
+"""
+Micro-benchmark fnum: formatter per tipe vs versi lama (evalf + bare except).
+
+    python benchmarks/bench_fnum.py [--number 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import sympy as sp
+
+import app1
+
+
+def fnum_lama(val):
+    """fnum sebelum formatter per tipe, sebagai pembanding"""
+    try:
+        if val is None:
+            return "Tidak ada"
+        val_float = float(val.evalf())
+        if abs(val_float - round(val_float)) < 1e-9:
+            return str(int(round(val_float)))
+        return f"{val_float:.2f}"
+    except:
+        return str(val)
+
+
+CASES = {
+    'int': 7,
+    'float': 44.4270040008057,
+    'numpy.float64': np.float64(3.25),
+    'sp.Integer': sp.Integer(12),
+    'sp.Float': sp.Float('2.5'),
+    'sp.Rational': sp.Rational(1, 3),
+    'sqrt(2)': sp.sqrt(2),
+    'sin(pi/7)': sp.sin(sp.pi / 7),
+}
+
+
+def per_call_us(fn, val, number):
+    return min(timeit.repeat(lambda: fn(val), number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'nilai':<16}{'lama (µs)':>12}{'baru (µs)':>12}{'speedup':>10}  hasil lama -> baru")
+    for name, val in CASES.items():
+        old = per_call_us(fnum_lama, val, args.number)
+        new = per_call_us(app1.fnum, val, args.number)
+        print(f"{name:<16}{old:>12.3f}{new:>12.3f}{old / new:>9.1f}x  {fnum_lama(val)!r} -> {app1.fnum(val)!r}")
+
+    arr = np.random.default_rng(0).uniform(-1000, 1000, 100_000)
+    arr[::7] = np.round(arr[::7])
+    loop = min(timeit.repeat(lambda: [app1.fnum(float(v)) for v in arr], number=1, repeat=3))
+    vec = min(timeit.repeat(lambda: app1.fnum_array(arr), number=1, repeat=3))
+    assert app1.fnum_array(arr) == [app1.fnum(float(v)) for v in arr]
+    print(f"\nfnum_array 100k float: {vec * 1000:.1f} ms (loop fnum: {loop * 1000:.1f} ms, {loop / vec:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
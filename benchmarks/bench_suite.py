@@ -0,0 +1,239 @@
+"""
+Benchmark seluruh jalur aplikasi: tiap (module, operation) di /compute lewat
+Flask test client, Plotter.create_triangle_image langsung, parser ekspresi (pengganti sympify),
+dan halaman index. Melaporkan p50/p95/p99 (ms) dan throughput (ops/s).
+
+    python benchmarks/bench_suite.py                           # jalankan & tampilkan
+    python benchmarks/bench_suite.py --save baseline.json      # simpan baseline
+    python benchmarks/bench_suite.py --compare baseline.json --threshold 0.25
+    python benchmarks/bench_suite.py --filter trig. --cold     # cache dikosongkan tiap iterasi
+
+--compare keluar dengan kode 1 jika ada kasus yang --metric-nya lebih lambat
+dari baseline × (1 + threshold). Baseline bergantung mesin, jadi simpan per mesin/CI.
+Overhead run_operation (trace, metrik, statistik) dibanding memanggil handler langsung
+diukur bersama kasus overhead.*; melebihi --overhead-budget (µs) juga keluar dengan kode 1.
+Default worker pool dimatikan (--workers 0) agar angka stabil dan mengukur
+hitungan, bukan IPC; gunakan --workers N untuk mengukur jalur produksi.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Payload contoh per operasi; operasi yang punya beberapa cabang diberi beberapa kasus
+COMPUTE_CASES = {
+    'geo.translasi': {'px': '2', 'py': '3', 'tx': '1', 'ty': '-2'},
+    'geo.translasi_homogen': {'px': '2', 'py': '3', 'tx': '1.5', 'ty': '2'},
+    'geo.refleksi': {'px': '2', 'py': '3', 'mode': 'yx'},
+    'geo.rotasi': {'px': '2', 'py': '3', 'angle': '90', 'cx': '0', 'cy': '0'},
+    'geo.rotasi:pusat': {'px': '2', 'py': '3', 'angle': '45', 'cx': '1', 'cy': '2'},
+    'geo.rotasi:simbolik': {'px': 'sqrt(2)', 'py': 'pi/3', 'angle': '30', 'cx': '0', 'cy': '0'},
+    'geo.dilatasi': {'px': '2', 'py': '3', 'factor': '2', 'dcx': '1', 'dcy': '-2'},
+    'geo.invers': {'inv_type': 'rot', 'param': '30'},
+    'geo.invers:dil': {'inv_type': 'dil', 'param': '2.5'},
+    'geo.pipeline': {'px': '1', 'py': '2', 'steps': [
+        {'operation': 'rotasi', 'angle': '90'},
+        {'operation': 'dilatasi', 'factor': '2', 'dcx': '1', 'dcy': '1'},
+        {'operation': 'translasi', 'tx': '3', 'ty': '-1'}]},
+    'trig.aturan_sinus': {'b': '5', 'A': '30', 'B': '45'},
+    'trig.aturan_sinus_ambigu': {'a': '5', 'b': '7', 'A': '30'},
+    'trig.aturan_cosinus': {'cari': 'sisi', 'a': '5', 'b': '6', 'C': '60'},
+    'trig.aturan_cosinus:sudut': {'cari': 'sudut', 'a': '5', 'b': '6', 'c': '7'},
+    'trig.luas_segitiga': {'a': '5', 'b': '6', 'C': '30'},
+}
+
+PARSE_CASES = ['2.5', 'sqrt(2)', 'pi/3 + 1/7', '2*sin(pi/7)**2 - cos(pi/5)']
+
+# Operasi murah untuk mengukur overhead pencatatan per request
+OVERHEAD_CASE = ('geo', 'translasi', {'px': 1, 'py': 2, 'tx': 3, 'ty': 4, 'detail': 'none'})
+
+
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def measure(fn, iterations, warmup, before=None):
+    for _ in range(warmup):
+        if before:
+            before()
+        fn()
+    samples = []
+    t_start = time.perf_counter()
+    for _ in range(iterations):
+        if before:
+            before()
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - t_start
+    samples.sort()
+    return {
+        'n': iterations,
+        'p50': percentile(samples, 0.50),
+        'p95': percentile(samples, 0.95),
+        'p99': percentile(samples, 0.99),
+        'mean': sum(samples) / len(samples),
+        'throughput': iterations / sum(samples) * 1000 if sum(samples) else 0.0,
+        'wall_s': wall,
+    }
+
+
+def build_cases(app1, image_format):
+    client = app1.app.test_client()
+    cases = {}
+
+    def post(payload):
+        def run():
+            resp = client.post('/compute', json=payload)
+            if resp.status_code != 200 or 'error' in resp.get_json():
+                raise RuntimeError(f"{payload.get('module')}.{payload.get('operation')}: {resp.get_json()}")
+        return run
+
+    for name, params in COMPUTE_CASES.items():
+        module, operation = name.split(':')[0].split('.')
+        payload = dict(params, module=module, operation=operation)
+        if module == 'trig':
+            payload['image_format'] = image_format
+        cases[f'compute.{name}'] = post(payload)
+        cases[f'compute.{name}:detail=none'] = post(dict(payload, detail='none'))
+
+    missing = {f'{m}.{o}' for m, o in app1.OPERATIONS} - {n.split(':')[0] for n in COMPUTE_CASES}
+    if missing:
+        raise SystemExit(f"Operasi tanpa kasus benchmark: {', '.join(sorted(missing))}")
+
+    # Plot dan parser diukur dua kali: cache hit, dan ':uncached' (cache-nya dikosongkan tiap iterasi)
+    plot = lambda: app1.Plotter.create_triangle_image(
+        5.0, 6.0, 7.0, 44.42, 57.12, 78.46, image_format=image_format)
+    cases['plot.create_triangle_image'] = plot
+    cases['plot.create_triangle_image:uncached'] = (plot, app1.PLOT_CACHE.clear)
+    for expr in PARSE_CASES:
+        parse = lambda expr=expr: app1.parse_input(expr)
+        cases[f'parse.{expr}'] = parse
+        cases[f'parse.{expr}:uncached'] = (parse, app1.EXPR_CACHE.clear)
+    cases['route.index'] = lambda: client.get('/', headers={'Accept-Encoding': 'gzip'})
+
+    module, operation, data = OVERHEAD_CASE
+    entry = app1.OPERATIONS[(module, operation)]
+    cases['overhead.execute_operation'] = lambda: app1.execute_operation(entry, app1.RequestParams(entry, data))
+    cases['overhead.run_operation'] = lambda: app1.run_operation(entry, data)
+    return cases
+
+
+def operation_overhead(app1, rounds=31, calls=300):
+    """
+    Overhead run_operation per request dalam µs: median selisih run_operation - execute_operation
+    per ronde. Keduanya diukur berselang-seling supaya noise mesin mengenai keduanya sama rata.
+    """
+    module, operation, data = OVERHEAD_CASE
+    entry = app1.OPERATIONS[(module, operation)]
+    bare = lambda: app1.execute_operation(entry, app1.RequestParams(entry, data))
+    full = lambda: app1.run_operation(entry, data)
+
+    def per_call(fn):
+        t0 = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        return (time.perf_counter() - t0) / calls
+
+    per_call(bare), per_call(full)  # warm-up
+    diffs = sorted(per_call(full) - per_call(bare) for _ in range(rounds))
+    return diffs[len(diffs) // 2] * 1e6
+
+
+def compare(results, baseline, metric, threshold):
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base.get(metric):
+            continue
+        ratio = res[metric] / base[metric]
+        if ratio > 1 + threshold:
+            regressions.append((name, base[metric], res[metric], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--filter', default='', help="hanya kasus yang namanya mengandung teks ini")
+    parser.add_argument('--cold', action='store_true', help="kosongkan semua cache sebelum tiap iterasi")
+    parser.add_argument('--image-format', default='png', choices=('png', 'svg', 'json-geometry'))
+    parser.add_argument('--workers', type=int, default=0, help="ukuran worker pool (0 = inline)")
+    parser.add_argument('--save', metavar='PATH', help="simpan hasil sebagai baseline JSON")
+    parser.add_argument('--compare', metavar='PATH', help="bandingkan dengan baseline JSON")
+    parser.add_argument('--metric', default='p50', choices=('p50', 'p95', 'p99', 'mean'))
+    parser.add_argument('--threshold', type=float, default=0.25, help="batas regresi relatif (0.25 = 25%%)")
+    parser.add_argument('--overhead-budget', type=float, default=5.0,
+                        help="batas overhead run_operation per request dalam µs (0 = tidak dicek)")
+    args = parser.parse_args()
+
+    # Konfigurasi dibaca saat import, jadi harus diset sebelum app1 dimuat
+    os.environ['KALKULATOR_WORKERS'] = str(args.workers)
+    # Payload yang sama diulang tiap iterasi: tanpa ini yang terukur hanya cache respons
+    os.environ['KALKULATOR_RESPONSE_CACHE_TTL'] = '0'
+    os.environ.pop('KALKULATOR_PLOT_CACHE_DIR', None)
+    import app1
+
+    cases = build_cases(app1, args.image_format)
+    clear_caches = (lambda: [c.clear() for c in app1.CACHE_REGISTRY.values()]) if args.cold else None
+
+    results = {}
+    print(f"{'kasus':<48}{'p50':>9}{'p95':>9}{'p99':>9}{'ops/s':>10}")
+    for name, case in cases.items():
+        if args.filter not in name:
+            continue
+        fn, before = case if isinstance(case, tuple) else (case, None)
+        res = measure(fn, args.iterations, args.warmup, clear_caches or before)
+        results[name] = res
+        print(f"{name:<48}{res['p50']:>9.3f}{res['p95']:>9.3f}{res['p99']:>9.3f}{res['throughput']:>10.0f}")
+
+    overhead_us = operation_overhead(app1) if any(name.startswith('overhead.') for name in results) else None
+    if overhead_us is not None:
+        print(f"\nOverhead run_operation: {overhead_us:.2f} µs (budget {args.overhead_budget:g} µs)")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'cold': args.cold,
+            'workers': args.workers,
+            'image_format': args.image_format,
+        },
+        'results': results,
+        'overhead_us': overhead_us,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nBaseline disimpan ke {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.metric, args.threshold)
+        if regressions:
+            print(f"\nREGRESI ({args.metric} > baseline × {1 + args.threshold:g}):")
+            for name, old, new, ratio in regressions:
+                print(f"  {name:<46}{old:>9.3f} -> {new:>9.3f} ms ({ratio:.2f}x)")
+            sys.exit(1)
+        print(f"\nTidak ada regresi {args.metric} di atas {args.threshold:.0%}")
+
+    if args.overhead_budget and overhead_us is not None and overhead_us > args.overhead_budget:
+        print(f"\nOVERHEAD run_operation {overhead_us:.2f} µs melebihi budget {args.overhead_budget:g} µs")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Konfigurasi dibaca saat import app1: hitung inline (tanpa spawn worker) agar tes cepat & deterministik
+os.environ.setdefault('KALKULATOR_WORKERS', '0')
+os.environ.setdefault('KALKULATOR_CACHE_BACKEND', 'memory')
+os.environ.pop('KALKULATOR_PLOT_CACHE_DIR', None)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pytest
+
+import app1
+
+
+@pytest.fixture
+def client():
+    return app1.app.test_client()
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+import app_async
+
+
+@pytest.mark.parametrize('headers', [
+    [(b'transfer-encoding', b'chunked'), (b'content-length', b'5')],
+    [(b'transfer-encoding', b'gzip')],
+    [(b'transfer-encoding', b'chunked'), (b'transfer-encoding', b'chunked')],
+    [(b'transfer-encoding', b'gzip'), (b'transfer-encoding', b'chunked')],
+    [(b'content-length', b'5'), (b'content-length', b'6')],
+    [(b'content-length', b'5, 6')],
+    [(b'content-length', b'-1')],
+    [(b'content-length', b'abc')],
+])
+def test_body_framing_rejects_ambiguous_requests(headers):
+    with pytest.raises(ValueError):
+        app_async.body_framing(headers)
+
+
+def test_body_framing():
+    assert app_async.body_framing([(b'transfer-encoding', b'gzip, chunked')]) == (True, 0)
+    assert app_async.body_framing([(b'content-length', b'12')]) == (False, 12)
+    assert app_async.body_framing([(b'content-length', b'12'), (b'content-length', b'12')]) == (False, 12)
+    assert app_async.body_framing([]) == (False, 0)
+
+
+def test_build_environ_drops_length_of_chunked_body():
+    scope = {'method': 'POST', 'path': '/compute', 'headers': [
+        (b'content-length', b'5'), (b'transfer-encoding', b'chunked')]}
+    environ = app_async.build_environ(scope, b'', True, None, None)
+    assert 'CONTENT_LENGTH' not in environ and 'HTTP_TRANSFER_ENCODING' not in environ
+    assert environ['wsgi.input_terminated'] is True
+
+
+def test_build_environ_joins_cookies_and_keeps_encoded_question_mark():
+    scope = {'method': 'GET', 'path': '/plot/a?b.png', 'raw_path': b'/plot/a%3Fb.png', 'query_string': b'x=1',
+             'headers': [(b'cookie', b'a=1'), (b'cookie', b'b=2'), (b'accept', b'text/html'), (b'accept', b'*/*')]}
+    environ = app_async.build_environ(scope, b'', False, None, None)
+    assert environ['HTTP_COOKIE'] == 'a=1; b=2'
+    assert environ['HTTP_ACCEPT'] == 'text/html,*/*'
+    assert environ['PATH_INFO'] == '/plot/a?b.png' and environ['QUERY_STRING'] == 'x=1'
+
+
+def exchange(request):
+    async def run():
+        server = await asyncio.start_server(app_async.handle_connection, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            data = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return data
+    return asyncio.run(run())
+
+
+def test_head_sends_no_body():
+    data = exchange(b'HEAD /metrics HTTP/1.1\r\nHost: x\r\n\r\n'
+                    b'GET /nope HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n')
+    head, rest = data.split(b'\r\n\r\n', 1)
+    assert head.startswith(b'HTTP/1.1 200') and rest.startswith(b'HTTP/1.1 404')
+
+
+def test_content_length_with_chunked_is_rejected():
+    data = exchange(b'POST /compute HTTP/1.1\r\nHost: x\r\nContent-Length: 5\r\n'
+                    b'Transfer-Encoding: chunked\r\n\r\n0\r\n\r\n')
+    assert data.startswith(b'HTTP/1.1 400')
+
+
+@pytest.mark.parametrize('framing', [
+    b'Content-Length: 5\r\nContent-Length: 0\r\n',
+    b'Transfer-Encoding: chunked\r\nTransfer-Encoding: chunked\r\n',
+    b'Transfer-Encoding: chunked, gzip\r\n',
+])
+def test_conflicting_framing_headers_are_rejected(framing):
+    data = exchange(b'POST /compute HTTP/1.1\r\nHost: x\r\n' + framing + b'\r\n0\r\n\r\n')
+    assert data.startswith(b'HTTP/1.1 400') and b'connection: close' in data
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+import app1
+
+
+def ndjson(resp):
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines() if line]
+
+
+def test_geo_batch_json(client):
+    resp = client.post('/compute/batch', json={'module': 'geo', 'operation': 'translasi',
+                                               'tx': '2', 'ty': '3', 'points': [[0, 0], [1, 1]]})
+    body = resp.get_json()
+    assert body['count'] == 2
+    assert body['points'] == [[2.0, 3.0], [3.0, 4.0]]
+
+
+def test_geo_batch_base64_roundtrip(client):
+    pts = app1.np.array([[1.0, 2.0], [-3.5, 4.25]])
+    payload = {'module': 'geo', 'operation': 'refleksi', 'mode': 'x', 'format': 'base64'}
+    payload.update(app1.encode_points(pts, 'base64'))
+    body = client.post('/compute/batch', json=payload).get_json()
+    assert body['shape'] == [2, 2]
+    assert app1.decode_points(body).tolist() == [[1.0, -2.0], [-3.5, -4.25]]
+
+
+def test_trig_batch_columns(client):
+    body = client.post('/compute/batch', json={'module': 'trig', 'operation': 'luas_segitiga',
+                                               'a': [3, 4], 'b': [4, 5], 'C': [90, 30]}).get_json()
+    assert body['valid_count'] == 2
+    assert round(body['columns']['luas'][0], 9) == 6.0
+    assert round(body['columns']['c'][0], 9) == 5.0
+
+
+def test_batch_unknown_operation(client):
+    body = client.post('/compute/batch', json={'module': 'geo', 'operation': 'putar'}).get_json()
+    assert body['error'] == "Operasi tidak valid"
+
+
+def test_batch_ndjson_stream(client):
+    lines = ['{"module": "geo", "operation": "translasi", "tx": "1", "ty": "0"}', '[0, 0]', '[1, 2]']
+    records = ndjson(client.post('/compute/batch', data="\n".join(lines),
+                                 content_type='application/x-ndjson'))
+    assert records[0]['type'] == 'header' and records[0]['columns'] == ['x', 'y']
+    assert records[1:3] == [[1.0, 0.0], [2.0, 2.0]]
+    assert records[3]['type'] == 'summary' and records[3]['count'] == 2
+
+
+def test_batch_json_stream_flag(client):
+    records = ndjson(client.post('/compute/batch', json={'module': 'geo', 'operation': 'translasi',
+                                                         'tx': '1', 'ty': '0', 'points': [[0, 0]],
+                                                         'stream': True}))
+    assert [r['type'] for r in (records[0], records[-1])] == ['header', 'summary']
+    assert records[1] == [1.0, 0.0]
+
+
+def test_geo_batch_rotation_matches_exact_pipeline(client):
+    points = [[3, 1], [2, 0], [-7, 5]]
+    for angle in ('90', '60', '180'):
+        batch = client.post('/compute/batch', json={'module': 'geo', 'operation': 'rotasi', 'angle': angle,
+                                                    'cx': '1', 'cy': '2', 'points': points}).get_json()
+        for (px, py), got in zip(points, batch['points']):
+            exact = client.post('/compute', json={'module': 'geo', 'operation': 'pipeline', 'px': px, 'py': py,
+                                                  'detail': 'none', 'steps': [{'operation': 'rotasi', 'angle': angle,
+                                                                               'cx': '1', 'cy': '2'}]}).get_json()
+            for g, e in zip(got, exact['values']):
+                # Nilai bulat harus sama persis, selebihnya cukup sampai galat pembulatan
+                assert g == e if float(e).is_integer() else g == pytest.approx(e, rel=1e-12)
+    body = client.post('/compute/batch', json={'module': 'geo', 'operation': 'rotasi', 'angle': '90',
+                                               'points': [[3, 1]]}).get_json()
+    assert body['points'] == [[-1.0, 3.0]] and body['matrix'][0][0] == 0.0
+
+
+def test_batch_rejects_bad_base64(client):
+    for value in ('!!!', 'AAAA', 5):
+        body = client.post('/compute/batch', json={'module': 'geo', 'operation': 'rotasi',
+                                                   'points_b64': value}).get_json()
+        assert body['error'].startswith("'points_b64' harus base64")
+    records = ndjson(client.post('/compute/batch', json={'module': 'trig', 'operation': 'luas_segitiga',
+                                                         'a_b64': '@@', 'b': 1, 'C': 30, 'stream': True}))
+    assert "'a_b64' harus base64" in records[-1]['error']
+
+
+def test_geo_batch_non_finite_values_become_null(client):
+    payload = {'module': 'geo', 'operation': 'dilatasi', 'factor': '1e300',
+               'points': [[1e300, 1], [float('inf'), 0], [float('nan'), 2]]}
+    raw = client.post('/compute/batch', json=payload).get_data(as_text=True)
+    assert 'NaN' not in raw and 'Infinity' not in raw
+    assert json.loads(raw)['points'] == [[None, 1e300], [None, None], [None, None]]
+    raw = client.post('/compute/batch', json=dict(payload, stream=True)).get_data(as_text=True)
+    assert 'NaN' not in raw and 'Infinity' not in raw
+    assert [json.loads(line) for line in raw.splitlines()][1:4] == [[None, 1e300], [None, None], [None, None]]
+
+
+# (operation, opsi, kolom hasil, nama input, baris); hasil rasional harus identik dengan /compute,
+# hasil irasional boleh berbeda beberapa ulp (SymPy membulatkan nilai eksak sekali saja)
+TRIG_PARITY_CASES = [
+    ('luas_segitiga', {}, 'luas', ('a', 'b', 'C'), [(5, 6, 30), (3, 4, 90), (10, 3, 150), (7, 8, 45)]),
+    ('aturan_cosinus', {'cari': 'sisi'}, 'c', ('a', 'b', 'C'), [(5, 6, 60), (3, 4, 90), (8, 8, 60), (2, 3, 45)]),
+    ('aturan_cosinus', {'cari': 'sudut'}, 'C', ('a', 'b', 'c'), [(3, 4, 5), (1, 1, 1), (5, 12, 13), (5, 6, 7)]),
+    ('aturan_sinus_ambigu', {}, 'B', ('a', 'b', 'A'), [(5, 7, 30), (7, 5, 30), (3.5, 7, 30), (1, 5, 30)]),
+]
+
+
+@pytest.mark.parametrize('operation, options, column, names, rows', TRIG_PARITY_CASES)
+def test_trig_batch_matches_scalar_compute(client, operation, options, column, names, rows):
+    payload = dict(options, module='trig', operation=operation)
+    payload.update({name: [row[i] for row in rows] for i, name in enumerate(names)})
+    columns = client.post('/compute/batch', json=payload).get_json()['columns']
+    for i, row in enumerate(rows):
+        scalar = client.post('/compute', json=dict(options, module='trig', operation=operation, detail='none',
+                                                   **{n: str(v) for n, v in zip(names, row)})).get_json()['values']
+        if column == 'B':
+            batch = [columns['B1'][i], columns['B2'][i]][:len(scalar)]
+        else:
+            batch = [columns[column][i]]
+        assert batch == pytest.approx(scalar, rel=1e-14, abs=0), row
+        for s, b in zip(scalar, batch):
+            if float(s) * 8 == int(float(s) * 8):
+                assert b == s, row
+
+
+def test_trig_batch_special_angles_are_exact(client):
+    body = client.post('/compute/batch', json={'module': 'trig', 'operation': 'luas_segitiga',
+                                               'a': [5, 10, 6], 'b': [6, 3, 6], 'C': [30, 150, 90]}).get_json()
+    assert body['columns']['luas'] == [7.5, 7.5, 18.0]
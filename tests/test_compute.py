@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import app1
+
+
+def test_every_registered_operation_is_routed(client):
+    for module, name in app1.OPERATIONS:
+        body = client.post('/compute', json={'module': module, 'operation': name, 'detail': 'none'}).get_json()
+        assert body.get('error') != "Operasi tidak valid"
+
+
+def test_unknown_operation(client):
+    assert client.post('/compute', json={'module': 'geo', 'operation': 'putar'}).get_json() == {
+        "error": "Operasi tidak valid"}
+
+
+@pytest.mark.parametrize('url', ['/compute', '/compute/batch'])
+@pytest.mark.parametrize('body', ['null', '[1, 2]', '"teks"', '{"module": '])
+def test_non_object_body_is_rejected(client, url, body):
+    resp = client.post(url, data=body, content_type='application/json')
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "Body request harus JSON object", "color": "#ef4444"}
+
+
+def test_ndjson_batch_header_must_be_object(client):
+    resp = client.post('/compute/batch', data='[1, 2]\n', content_type='application/x-ndjson')
+    assert resp.status_code == 400
+    assert resp.get_json()['error'] == "Baris pertama harus header JSON object"
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flights = app1.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return 'hasil'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do('k', slow, timeout=5)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)  # semua pemanggil sudah menunggu pemimpin
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(results) == [('hasil', False)] + [('hasil', True)] * 4
+    assert flights.stats() == {'in_flight': 0, 'coalesced': 4}
+
+
+def test_single_flight_follower_recomputes_when_leader_fails():
+    flights = app1.SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("gagal")
+
+    errors = []
+
+    def lead():
+        try:
+            flights.do('k', failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    follower = []
+    t = threading.Thread(target=lambda: follower.append(flights.do('k', lambda: 'sendiri', timeout=5)))
+    t.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    t.join()
+    assert errors == ['gagal'] and follower == [('sendiri', False)]
+
+
+def test_identical_compute_is_served_from_response_cache(client):
+    payload = {'module': 'geo', 'operation': 'translasi', 'px': '123.25', 'py': '2', 'tx': '1', 'ty': '1'}
+    first = client.post('/compute', json=payload)
+    again = client.post('/compute', json=dict(payload, px='123.250'))  # literal kanonik sama
+    assert first.headers['X-Kalkulator-Cache'] == 'miss'
+    assert again.headers['X-Kalkulator-Cache'] == 'hit'
+    assert again.get_json() == first.get_json()
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize('detail', ['result', 'steps', 'full'])
+def test_invers_returns_matrix_from_result_level(client, detail):
+    body = client.post('/compute', json={'module': 'geo', 'operation': 'invers', 'inv_type': 'rot',
+                                         'param': '90', 'detail': detail}).get_json()
+    assert body['matrix'].startswith('$$M^{-1} = ')
+    assert ('steps' in body) == (detail != 'result')
+
+
+def test_invers_detail_none_returns_values(client):
+    body = client.post('/compute', json={'module': 'geo', 'operation': 'invers', 'inv_type': 'rot',
+                                         'param': '90', 'detail': 'none'}).get_json()
+    assert body == {'values': [[0, 1], [-1, 0]]}
+
+
+def test_no_solution_step_formats_side_a(client):
+    body = client.post('/compute', json={'module': 'trig', 'operation': 'aturan_sinus_ambigu',
+                                         'a': '1/3', 'b': '5', 'A': '30', 'detail': 'steps'}).get_json()
+    assert body['steps'][-1]['desc'] == "Karena a < h (0.33 < 2.50), tidak ada segitiga"
@@ -0,0 +1,54 @@
+import pytest
+
+import app1
+
+POINTS = [[3, 4], [2, 0], [-7, 5], [0.5, -1.25]]
+CASES = [
+    ('rotasi', {'angle': '90'}),
+    ('rotasi', {'angle': '60', 'cx': '1', 'cy': '2'}),
+    ('rotasi', {'angle': '180', 'cx': '-3', 'cy': '0.5'}),
+    ('dilatasi', {'factor': '2'}),
+    ('dilatasi', {'factor': '0.5', 'dcx': '1', 'dcy': '1'}),
+    ('dilatasi', {'factor': '3', 'dcx': '-2', 'dcy': '4'}),
+]
+
+
+def same(a, b):
+    # Nilai bulat harus sama persis di semua jalur, selebihnya sampai galat pembulatan
+    return a == b if float(b).is_integer() else a == pytest.approx(b, rel=1e-12)
+
+
+@pytest.mark.parametrize('op, params', CASES)
+def test_scalar_pipeline_and_batch_routes_agree(client, op, params):
+    batch = client.post('/compute/batch', json=dict(module='geo', operation=op, points=POINTS, **params)).get_json()
+    for (px, py), batch_values in zip(POINTS, batch['points']):
+        scalar = client.post('/compute', json=dict(module='geo', operation=op, px=str(px), py=str(py),
+                                                   detail='none', **params)).get_json()['values']
+        pipeline = client.post('/compute', json={'module': 'geo', 'operation': 'pipeline', 'px': str(px),
+                                                 'py': str(py), 'detail': 'none',
+                                                 'steps': [dict(operation=op, **params)]}).get_json()['values']
+        for s, p, b in zip(scalar, pipeline, batch_values):
+            assert same(s, p) and same(b, p)
+
+
+def test_rotation_fast_path_has_no_round_off(client):
+    body = client.post('/compute', json={'module': 'geo', 'operation': 'rotasi', 'angle': '90',
+                                         'px': '3', 'py': '4', 'detail': 'none'}).get_json()
+    assert body['values'] == [-4.0, 3.0]
+
+
+def test_matrix_inverse_and_determinant_are_cached():
+    param = app1.sp.Integer(37)
+    for cache in (app1.MATRIX_CACHE, app1.INVERSE_CACHE, app1.DETERMINANT_CACHE):
+        cache.clear()
+    mat = app1.GeoEngine.get_matrix('rot', param)
+    inv = app1.GeoEngine.get_inverse('rot', param)
+    assert isinstance(mat, app1.sp.ImmutableMatrix)
+    assert app1.GeoEngine.get_matrix('rot', param) is mat
+    assert app1.GeoEngine.get_inverse('rot', param) is inv
+    assert app1.sp.simplify(mat * inv) == app1.sp.eye(2)
+    assert app1.sp.simplify(app1.GeoEngine.get_determinant('rot', param)) == 1
+    assert app1.MATRIX_CACHE.stats()['hits'] >= 2 and app1.INVERSE_CACHE.stats()['hits'] == 1
+    # Matriks singular juga di-cache (sebagai None), tidak dihitung ulang tiap request
+    assert app1.GeoEngine.get_inverse('dil', app1.sp.Integer(0)) is None
+    assert app1.INVERSE_CACHE.get(('dil', app1.sp.Integer(0)), 'kosong') is None
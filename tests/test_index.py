@@ -0,0 +1,82 @@
+import gzip
+import json
+import shutil
+import subprocess
+
+import pytest
+
+import app1
+
+
+def test_index_is_precompressed_with_etag(client):
+    plain = client.get('/')
+    assert plain.status_code == 200 and 'Content-Encoding' not in plain.headers
+    assert plain.data == app1.INDEX_PAGE.variants['identity'][0]
+    zipped = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip' and zipped.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(zipped.data) == plain.data
+    assert zipped.headers['ETag'] != plain.headers['ETag']
+
+
+def test_index_revalidates_with_304(client):
+    etag = client.get('/', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+    # ETag varian mana pun cocok: isi halamannya sama
+    resp = client.get('/', headers={'If-None-Match': etag})
+    assert resp.status_code == 304 and resp.data == b''
+    assert resp.headers['Cache-Control'].startswith('public, max-age=')
+
+
+def request_layer_js():
+    """Potongan JS 'REQUEST LAYER' dari halaman yang sudah dirender"""
+    html = app1.INDEX_PAGE.variants['identity'][0].decode('utf-8')
+    start = html.index('    const CACHE_VERSION')
+    return html[start:html.index('    function buildPayload', start)]
+
+
+def test_index_embeds_cache_version():
+    assert f"const CACHE_VERSION = '{app1.source_version()}';" in request_layer_js()
+
+
+# fetch palsu: hitung request, jawab setelah 20 ms, gagal dengan AbortError seperti fetch asli
+FRONTEND_HARNESS = """
+const calls = [];
+global.fetch = (url, opts) => {
+    calls.push(opts);
+    if (opts.signal.aborted) return Promise.reject(new DOMException('Aborted', 'AbortError'));
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => resolve({
+            ok: true, status: 200, headers: { get: () => null },
+            json: () => Promise.resolve({ result: JSON.parse(opts.body).px })
+        }), 20);
+        opts.signal.addEventListener('abort', () => {
+            clearTimeout(timer);
+            reject(new DOMException('Aborted', 'AbortError'));
+        });
+    });
+};
+%s
+(async () => {
+    const a = normalizePayload({ py: ' 2 ', px: '1', module: 'geo' });
+    const key = CACHE_VERSION + ':' + JSON.stringify(a);
+    const first = await requestCompute(key, a);
+    const again = await requestCompute(key, a);
+    const stale = requestCompute('k2', { px: 'lama' }).catch(e => e.name);
+    const fresh = await requestCompute('k3', { px: 'baru' });
+    console.log(JSON.stringify({
+        keys: Object.keys(a), py: a.py, first, again, fetches: calls.length,
+        aborted: calls[1].signal.aborted, stale: await stale, fresh
+    }));
+})();
+"""
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="butuh node")
+def test_frontend_dedups_caches_and_aborts_stale_requests(tmp_path):
+    script = tmp_path / 'frontend.js'
+    script.write_text(FRONTEND_HARNESS % request_layer_js())
+    out = json.loads(subprocess.run(['node', str(script)], capture_output=True, text=True, check=True).stdout)
+    assert out['keys'] == ['module', 'px', 'py'] and out['py'] == '2'
+    assert out['first'] == out['again'] == {'result': '1'}
+    assert out['fetches'] == 3  # payload sama dijawab dari cache memori
+    assert out['aborted'] is True and out['stale'] == 'AbortError'
+    assert out['fresh'] == {'result': 'baru'}
@@ -0,0 +1,35 @@
+import app1
+
+
+def test_metrics_renders_prometheus_text(client):
+    client.post('/compute', json={'module': 'trig', 'operation': 'luas_segitiga',
+                                  'a': '5', 'b': '6', 'C': '30', 'detail': 'none'})
+    resp = client.get('/metrics')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'text/plain'
+    body = resp.get_data(as_text=True)
+    assert 'kalkulator_operation_duration_seconds_bucket{module="trig",operation="luas_segitiga"' in body
+    assert '# TYPE kalkulator_requests_in_flight gauge' in body
+
+
+def test_metrics_survives_unmatched_route(client):
+    assert client.get('/metrics').status_code == 200
+    assert client.get('/favicon.ico').status_code == 404
+    resp = client.get('/metrics')
+    assert resp.status_code == 200
+    assert 'kalkulator_requests_in_flight{endpoint="unmatched"} 0' in resp.get_data(as_text=True)
+    assert None not in app1.METRICS.in_flight
+
+
+def test_debug_operations_reads_metrics():
+    key = ('geo', 'translasi')
+    before = app1.METRICS.operation_stats().get(key, {"count": 0, "errors": 0})
+    entry = app1.OPERATIONS[key]
+    app1.run_operation(entry, {'px': 1, 'py': 2, 'tx': 3, 'ty': 4, 'detail': 'none'})
+    app1.run_operation(entry, {'px': 'x(', 'py': 2, 'tx': 3, 'ty': 4, 'detail': 'none'})
+    stats = app1.METRICS.operation_stats()[key]
+    assert stats["count"] == before["count"] + 2
+    assert stats["errors"] == before["errors"] + 1
+    assert 0 < stats["max_ms"] <= stats["total_ms"]
+    with app1.app.test_client() as client:
+        assert client.get('/debug/operations').get_json()["geo.translasi"] == stats
@@ -0,0 +1,80 @@
+import ast
+import time
+
+import pytest
+
+import app1
+
+
+@pytest.mark.parametrize('raw, expected', [
+    (3, '3'),
+    ('42', '42'),
+    ('1.5', '1.50000000000000'),
+    ('2*pi', '2*pi'),
+    ('2^3', '8'),
+    ('sqrt(4) + x', 'x + 2'),
+])
+def test_parse_input_accepts(raw, expected):
+    assert str(app1.parse_input(raw)) == expected
+
+
+@pytest.mark.parametrize('raw, message', [
+    (None, 'Input harus angka atau ekspresi'),
+    ([1, 2], 'Input harus angka atau ekspresi'),
+    ('__import__("os")', 'Ekspresi tidak didukung'),
+    ('x' * 300, 'Ekspresi terlalu panjang'),
+    ('2**100000', 'Pangkat terlalu besar'),
+    ('-' * 40 + '1', 'Ekspresi terlalu dalam'),
+    ('sin(', 'Ekspresi tidak valid'),
+])
+def test_parse_input_rejects(raw, message):
+    with pytest.raises(ValueError, match=message):
+        app1.parse_input(raw)
+
+
+def test_compute_reports_invalid_input(client):
+    resp = client.post('/compute', json={'module': 'trig', 'operation': 'luas_segitiga',
+                                         'a': 'import os', 'b': '6', 'C': '30'})
+    assert 'error' in resp.get_json()
+
+
+def test_parse_pipeline_rejects_non_object_steps():
+    with pytest.raises(app1.InputError, match='Langkah pipeline ke-2 harus berupa object'):
+        app1.parse_pipeline([{'operation': 'refleksi'}, 5])
+
+
+def test_pipeline_reports_bad_step(client):
+    body = client.post('/compute', json={'module': 'geo', 'operation': 'pipeline', 'px': '1', 'py': '2',
+                                         'steps': [{'operation': 'rotasi'}, 'translasi']}).get_json()
+    assert body['error'].startswith('Langkah pipeline ke-2')
+
+
+def test_parse_budget_is_checked_per_node():
+    expired = app1._ExpressionBuilder('1 + 2', time.perf_counter() - 1)
+    with pytest.raises(ValueError, match='batas waktu'):
+        expired.build(ast.parse('1 + 2', mode='eval').body, 1)
+
+
+@pytest.mark.parametrize('module, operation, symbolic, literal', [
+    ('geo', 'rotasi', {'px': '1', 'py': '2', 'angle': 'pi/3'}, {'px': '1', 'py': '2', 'angle': '60'}),
+    ('geo', 'pipeline', {'px': '1', 'py': '2', 'steps': [{'operation': 'rotasi', 'angle': 'pi/3'}]},
+     {'px': '1', 'py': '2', 'steps': [{'operation': 'rotasi', 'angle': '60'}]}),
+    ('trig', 'luas_segitiga', {'a': 'sqrt(2)', 'b': '6', 'C': '30', 'detail': 'none'},
+     {'a': '2', 'b': '6', 'C': '30', 'detail': 'none'}),
+])
+def test_symbolic_input_is_parsed_under_worker_deadline(module, operation, symbolic, literal):
+    # Batas keras parse ekspresi = deadline worker, jadi input non-literal harus ke pool
+    entry = app1.OPERATIONS[(module, operation)]
+    assert entry.needs_worker(symbolic) and not entry.needs_worker(literal)
+
+
+@pytest.mark.parametrize('steps, message', [
+    ([], 'Pipeline butuh daftar langkah'),
+    ([{'operation': 'rotasi'}] * 100, 'langkah per pipeline'),
+    ([{'operation': 'putar'}], 'Langkah pipeline ke-1: Operasi pipeline tidak dikenal: putar'),
+    ([{'operation': 'refleksi'}, {'operation': 'rotasi', 'angle': 'sin('}], 'Langkah pipeline ke-2: Ekspresi tidak valid'),
+    ([{'operation': 'dilatasi', 'factor': [2]}], 'Langkah pipeline ke-1: Input harus angka'),
+])
+def test_parse_pipeline_raises_input_error(steps, message):
+    with pytest.raises(app1.InputError, match=message):
+        app1.parse_pipeline(steps)
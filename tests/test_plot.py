@@ -0,0 +1,44 @@
+import pytest
+
+import app1
+
+TRIANGLE = {'module': 'trig', 'operation': 'luas_segitiga', 'a': '5', 'b': '6', 'C': '30'}
+
+
+def test_svg_image_is_inline_markup(client):
+    body = client.post('/compute', json=dict(TRIANGLE, image_format='svg')).get_json()
+    assert body['image_format'] == 'svg'
+    assert body['image'].lstrip().startswith('<?xml') and '<svg' in body['image']
+    # Render ulang dari cache harus identik (id elemen SVG deterministik)
+    app1.PLOT_CACHE.clear()
+    assert client.post('/compute', json=dict(TRIANGLE, image_format='svg')).get_json()['image'] == body['image']
+
+
+def test_json_geometry_skips_rendering(client):
+    body = client.post('/compute', json=dict(TRIANGLE, image_format='json-geometry')).get_json()
+    geom = body['image']
+    assert len(geom['vertices']) == 3 and geom['vertices'][0] == [0.0, 0.0]
+    assert geom['angle_labels'][2] == 'C\n30°'
+    assert geom['title'] == 'Visualisasi Segitiga'
+
+
+def test_unknown_image_format_is_rejected(client):
+    body = client.post('/compute', json=dict(TRIANGLE, image_format='gif')).get_json()
+    assert 'error' in body
+
+
+def test_url_delivery_serves_cached_image(client):
+    body = client.post('/compute', json=dict(TRIANGLE, image_delivery='url')).get_json()
+    url = body['image']
+    assert body['image_delivery'] == 'url' and url.startswith('/plot/') and url.endswith('.png')
+    resp = client.get(url)
+    assert resp.status_code == 200 and resp.mimetype == 'image/png'
+    assert resp.data.startswith(b'\x89PNG')
+    assert 'immutable' in resp.headers['Cache-Control']
+    etag = resp.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+
+@pytest.mark.parametrize('url', ['/plot/' + '0' * 32 + '.png', '/plot/abc.png', '/plot/' + '0' * 32 + '.gif'])
+def test_unknown_plot_url_is_404(client, url):
+    assert client.get(url).status_code == 404
@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+import app1
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    prof = app1.SamplingProfiler(interval_ms=1, threshold_ms=20, rate=1.0, capacity=4)
+    monkeypatch.setattr(app1, 'PROFILER', prof)
+    return prof
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_slow_operation_is_sampled(profiler, client):
+    token = profiler.begin()
+    busy_wait(0.05)
+    profiler.end(token, 0.05, 'test.busy')
+    fast = profiler.begin()
+    profiler.end(fast, 0.001, 'test.fast')  # di bawah ambang: dibuang
+
+    listing = client.get('/debug/profiles').get_json()
+    assert listing['enabled'] and [p['operation'] for p in listing['profiles']] == ['test.busy']
+    record_id = listing['profiles'][0]['id']
+    assert listing['profiles'][0]['sample_count'] > 0
+
+    collapsed = client.get(f'/debug/profiles/{record_id}').get_data(as_text=True)
+    assert 'busy_wait (test_profiler.py:' in collapsed
+    speedscope = client.get(f'/debug/profiles/{record_id}?format=speedscope').get_json()
+    profile = speedscope['profiles'][0]
+    assert profile['type'] == 'sampled' and len(profile['samples']) == len(profile['weights'])
+    assert any(f['name'] == 'busy_wait' for f in speedscope['shared']['frames'])
+    assert client.get('/debug/profiles/999').status_code == 404
+
+
+def test_run_operation_records_operation_label(profiler):
+    profiler.threshold = 0
+    entry = app1.OPERATIONS[('geo', 'translasi')]
+    app1.run_operation(entry, {'px': 1, 'py': 2, 'tx': 3, 'ty': 4, 'detail': 'none'})
+    assert profiler.summary()[-1]['operation'] == 'geo.translasi'
+    assert not profiler._active
+
+
+def test_profiles_disabled_by_default(client, monkeypatch):
+    monkeypatch.setattr(app1, 'PROFILER', None)
+    assert client.get('/debug/profiles').get_json() == {'enabled': False}
@@ -0,0 +1,58 @@
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import app1
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def test_keepalive_handler_speaks_http11():
+    handler = app1.keepalive_handler(3.5)
+    assert handler.protocol_version == 'HTTP/1.1' and handler.timeout == 3.5
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, deadline=20):
+    end = time.monotonic() + deadline
+    while time.monotonic() < end:
+        try:
+            return socket.create_connection(('127.0.0.1', port), timeout=1).close()
+        except OSError:
+            time.sleep(0.1)
+    raise AssertionError("server tidak mulai melayani")
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="pre-fork butuh os.fork")
+def test_serve_prefork_keepalive_and_graceful_stop():
+    port = free_port()
+    env = dict(os.environ, KALKULATOR_WORKERS='0', KALKULATOR_CACHE_BACKEND='memory')
+    proc = subprocess.Popen([sys.executable, 'app1.py', 'serve', '--port', str(port), '--workers', '2',
+                             '--no-warmup'], cwd=ROOT, env=env, stderr=subprocess.PIPE, text=True)
+    try:
+        wait_for(port)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        for _ in range(2):  # dua request di satu koneksi keep-alive
+            conn.request('POST', '/compute', body='{"module": "geo", "operation": "translasi", "px": "1", '
+                         '"py": "2", "tx": "3", "ty": "4", "detail": "none"}',
+                         headers={'Content-Type': 'application/json'})
+            resp = conn.getresponse()
+            assert resp.status == 200 and resp.version == 11
+            assert resp.read() == b'{"values":[4,6]}\n'
+        conn.close()
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        _, err = proc.communicate(timeout=20)
+    assert proc.returncode == 0, err
+    assert 'dengan 2 worker' in err
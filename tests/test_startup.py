@@ -0,0 +1,28 @@
+import json
+import os
+import subprocess
+import sys
+
+import app1
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def test_import_and_index_do_not_load_heavy_modules():
+    code = ("import json, sys, app1; app1.app.test_client().get('/'); "
+            "print(json.dumps([m for m in ('sympy', 'numpy', 'matplotlib') if m in sys.modules]))")
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True,
+                         env=dict(os.environ, KALKULATOR_WORKERS='0', KALKULATOR_CACHE_BACKEND='memory'))
+    assert json.loads(out.stdout) == []
+
+
+def test_lazy_module_replaces_itself_on_first_use():
+    lazy = app1.LazyModule('colorsys', '_lazy_colorsys')
+    try:
+        assert lazy.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert app1._lazy_colorsys is sys.modules['colorsys']
+        assert 'colorsys' in app1.IMPORT_TIMINGS
+    finally:
+        del app1._lazy_colorsys
+        app1.IMPORT_TIMINGS.pop('colorsys', None)
+        app1._IMPORTED.pop('colorsys', None)
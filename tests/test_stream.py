@@ -0,0 +1,23 @@
+import json
+
+
+def post_ndjson(client, lines):
+    body = "\n".join(lines) + "\n"
+    resp = client.post('/compute', data=body, content_type='application/x-ndjson')
+    assert resp.status_code == 200
+    return [json.loads(line) for line in resp.get_data(as_text=True).splitlines() if line]
+
+
+def test_stream_compute_bad_line_only_fails_itself(client):
+    ok = json.dumps({'module': 'trig', 'operation': 'luas_segitiga',
+                     'a': '5', 'b': '6', 'C': '30', 'detail': 'none'})
+    records = post_ndjson(client, [ok, '{"module": "trig",', ok])
+    assert len(records) == 3
+    assert 'error' not in records[0] and 'error' not in records[2]
+    assert records[1]['line'] == 2
+    assert 'Baris 2' in records[1]['error']
+
+
+def test_stream_compute_unknown_operation_gets_a_record(client):
+    records = post_ndjson(client, [json.dumps({'module': 'trig', 'operation': 'tidak_ada'}), '[1, 2]', '7'])
+    assert [r['error'] for r in records] == ["Operasi tidak valid"] * 3
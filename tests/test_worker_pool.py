@@ -0,0 +1,24 @@
+import time
+
+import pytest
+
+import app1
+
+
+def test_timeout_retires_pool_without_killing_other_tasks():
+    pool = app1.WorkerPool(2, 8)
+    executor = pool._get_executor()
+    pool.warm()
+    try:
+        ok = executor.submit(time.sleep, 0.5)
+        stuck = executor.submit(time.sleep, 30)
+        pool._futures.update({ok: executor, stuck: executor})
+        time.sleep(0.2)
+        pool._restart(executor, stuck=stuck)
+        assert pool._get_executor() is not executor
+        assert ok.result(timeout=5) is None
+        with pytest.raises(app1.BrokenProcessPool):
+            stuck.result(timeout=5)
+        assert pool.restarts == 1
+    finally:
+        pool.close()